@@ -10,6 +10,7 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
+import ctypes
 import inspect
 import sys
 import os
@@ -54,6 +55,159 @@ else:
     MAXINT = sys.maxint
 
 
+if hasattr(os, 'pwrite'):
+    def pwrite(fileno, data, offset):
+        """Write all of the data to a file descriptor at a given offset
+
+        The file position of the file descriptor is not used or modified so
+        positional writes can be made to the same file descriptor from
+        multiple threads at once.
+
+        :param fileno: The file descriptor to write to
+        :param data: The bytes-like object to write
+        :param offset: The offset in the file to write the data to
+        """
+        view = memoryview(data)
+        while len(view):
+            written = os.pwrite(fileno, view, offset)
+            view = view[written:]
+            offset += written
+else:
+    # Positional writes are not available on this platform (i.e. Windows
+    # and python2). Callers should fall back to seeking and writing.
+    pwrite = None
+
+
+if hasattr(os, 'pread'):
+    def pread(fileno, size, offset):
+        """Read up to size bytes from a file descriptor at a given offset
+
+        Like pwrite(), the file position of the file descriptor is not used
+        or modified so positional reads can be made from the same file
+        descriptor from multiple threads at once. Fewer bytes are only
+        returned once the end of the file is reached.
+
+        :param fileno: The file descriptor to read from
+        :param size: The number of bytes to read
+        :param offset: The offset in the file to read the data from
+        """
+        data = os.pread(fileno, size, offset)
+        if len(data) == size or not data:
+            return data
+        chunks = [data]
+        remaining = size - len(data)
+        while remaining:
+            offset += len(data)
+            data = os.pread(fileno, remaining, offset)
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+        return b''.join(chunks)
+else:
+    # Positional reads are not available on this platform (i.e. Windows
+    # and python2). Callers should fall back to seeking and reading.
+    pread = None
+
+
+if hasattr(os, 'pwritev'):
+    try:
+        _IOV_MAX = os.sysconf('SC_IOV_MAX')
+    except (ValueError, OSError):
+        _IOV_MAX = 1024
+
+    def pwritev(fileno, buffers, offset):
+        """Write all of the buffers to a file descriptor at a given offset
+
+        The buffers are written one after another with as few system calls
+        as possible. Like pwrite(), the file position of the file descriptor
+        is not used or modified.
+
+        :param fileno: The file descriptor to write to
+        :param buffers: A list of bytes-like objects to write
+        :param offset: The offset in the file to write the first buffer to
+        """
+        views = [memoryview(buffer) for buffer in buffers if len(buffer)]
+        while views:
+            written = os.pwritev(fileno, views[:_IOV_MAX], offset)
+            offset += written
+            # Drop everything that was written, which may have ended
+            # part way through a buffer.
+            while written:
+                if written >= len(views[0]):
+                    written -= len(views.pop(0))
+                else:
+                    views[0] = views[0][written:]
+                    written = 0
+else:
+    # Vectored writes are not available on this platform (i.e. Windows,
+    # macOS and python2). Callers should fall back to writing each buffer.
+    pwritev = None
+
+
+if hasattr(os, 'posix_fallocate'):
+    posix_fallocate = os.posix_fallocate
+else:
+    # Preallocating disk space is not available on this platform (i.e.
+    # Windows, macOS and python2). Callers should fall back to truncating
+    # the file to the desired size.
+    posix_fallocate = None
+
+
+if hasattr(os, 'posix_fadvise'):
+    posix_fadvise = os.posix_fadvise
+else:
+    # Advising the kernel on file access patterns is not available on this
+    # platform (i.e. Windows, macOS and python2). Callers should skip
+    # giving the advice.
+    posix_fadvise = None
+
+
+def _get_libc_sync_file_range():
+    # The standard library does not expose sync_file_range() so it is
+    # looked up from the C library when running on Linux.
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).sync_file_range
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [
+        ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_uint]
+    func.restype = ctypes.c_int
+    return func
+
+
+_libc_sync_file_range = _get_libc_sync_file_range()
+SYNC_FILE_RANGE_WAIT_BEFORE = 1
+SYNC_FILE_RANGE_WRITE = 2
+SYNC_FILE_RANGE_WAIT_AFTER = 4
+
+
+if _libc_sync_file_range is not None:
+    def sync_file_range(fileno, offset, length):
+        """Write a range of a file to disk and wait for it to be written
+
+        Unlike fsync(), only the dirty pages in the range are written and
+        no file metadata is flushed.
+
+        :param fileno: The file descriptor of the file
+        :param offset: The offset in the file that the range starts at
+        :param length: The length of the range
+        """
+        flags = (
+            SYNC_FILE_RANGE_WAIT_BEFORE | SYNC_FILE_RANGE_WRITE |
+            SYNC_FILE_RANGE_WAIT_AFTER
+        )
+        if _libc_sync_file_range(fileno, offset, length, flags) != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+else:
+    # Writing out a range of a file is only available on Linux. Callers
+    # should skip writing out the range.
+    sync_file_range = None
+
+
 def seekable(fileobj):
     """Backwards compat function to determine if a fileobj is seekable
 
@@ -89,3 +243,28 @@ def readable(fileobj):
         return fileobj.readable()
 
     return hasattr(fileobj, 'read')
+
+
+def readinto(fileobj, buffer):
+    """Backwards compat function to read data directly into a buffer
+
+    :param fileobj: The file-like object to read from
+    :param buffer: A writable bytes-like object to read the data into
+
+    :returns: The number of bytes read into the buffer. Zero means that
+        the end of the file-like object has been reached.
+    """
+    # If the fileobj has a readinto attr, use it so the data does not
+    # need to be copied.
+    if hasattr(fileobj, 'readinto'):
+        try:
+            return fileobj.readinto(buffer)
+        except NotImplementedError:
+            # Subclasses of io.RawIOBase that only implement read() still
+            # have the readinto() they are expected to implement.
+            pass
+    # Otherwise read the data and copy it into the buffer.
+    view = memoryview(buffer)
+    data = fileobj.read(len(view))
+    view[:len(data)] = data
+    return len(data)
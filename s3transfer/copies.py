@@ -67,7 +67,7 @@ class CopySubmissionTask(SubmissionTask):
     ]
 
     def _submit(self, client, config, osutil, request_executor,
-                transfer_future):
+                transfer_future, part_size_planner=None):
         """
         :param client: The client associated with the transfer manager
 
@@ -85,6 +85,11 @@ class CopySubmissionTask(SubmissionTask):
         :type transfer_future: s3transfer.futures.TransferFuture
         :param transfer_future: The transfer future associated with the
             transfer request that tasks are being submitted for
+
+        :type part_size_planner: s3transfer.utils.UploadPartSizePlanner
+        :param part_size_planner: The planner to use to pick the size of
+            each part of a multipart copy. If not provided, the configured
+            multipart_chunksize is used.
         """
         # Determine the size if it was not provided
         if transfer_future.meta.size is None:
@@ -118,7 +123,8 @@ class CopySubmissionTask(SubmissionTask):
                 client, config, osutil, request_executor, transfer_future)
         else:
             self._submit_multipart_request(
-                client, config, osutil, request_executor, transfer_future)
+                client, config, osutil, request_executor, transfer_future,
+                part_size_planner)
 
     def _submit_copy_request(self, client, config, osutil, request_executor,
                              transfer_future):
@@ -146,7 +152,8 @@ class CopySubmissionTask(SubmissionTask):
         )
 
     def _submit_multipart_request(self, client, config, osutil,
-                                  request_executor, transfer_future):
+                                  request_executor, transfer_future,
+                                  part_size_planner=None):
         call_args = transfer_future.meta.call_args
 
         # Submit the request to create a multipart upload and make sure it
@@ -171,7 +178,12 @@ class CopySubmissionTask(SubmissionTask):
 
         # Determine how many parts are needed based on filesize and
         # desired chunksize.
-        part_size = config.multipart_chunksize
+        part_size = getattr(call_args, 'multipart_chunksize', None)
+        if part_size is None:
+            part_size = config.multipart_chunksize
+            if part_size_planner is not None:
+                part_size = part_size_planner.get_part_size(
+                    transfer_future.meta.size, config.max_request_concurrency)
         adjuster = ChunksizeAdjuster()
         part_size = adjuster.adjust_chunksize(
             part_size, transfer_future.meta.size)
@@ -10,23 +10,37 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
+import bisect
+import copy
+import functools
+import json
 import logging
 import os
 import socket
 import math
 import threading
+import time
 import heapq
+import collections
+import tempfile
 
 
 from botocore.compat import six
+from botocore.exceptions import ClientError
 from botocore.exceptions import IncompleteReadError
+from botocore.exceptions import ParamValidationError
 from botocore.vendored.requests.packages.urllib3.exceptions import \
     ReadTimeoutError
 
 from s3transfer.compat import SOCKET_ERROR
 from s3transfer.compat import seekable
+from s3transfer.compat import readinto
+from s3transfer.exceptions import DownloadIntegrityError
 from s3transfer.exceptions import RetriesExceededError
 from s3transfer.futures import IN_MEMORY_DOWNLOAD_TAG
+from s3transfer.futures import TransferFuture
+from s3transfer.futures import TransferMeta
+from s3transfer.subscribers import BaseSubscriber
 from s3transfer.utils import random_file_extension
 from s3transfer.utils import get_callbacks
 from s3transfer.utils import invoke_progress_callbacks
@@ -35,6 +49,7 @@ from s3transfer.utils import FunctionContainer
 from s3transfer.utils import CountCallbackInvoker
 from s3transfer.utils import StreamReaderProgress
 from s3transfer.utils import DeferredOpenFile
+from s3transfer.utils import ETagCalculator
 from s3transfer.tasks import Task
 from s3transfer.tasks import SubmissionTask
 
@@ -45,6 +60,8 @@ S3_RETRYABLE_ERRORS = (
     socket.timeout, SOCKET_ERROR, ReadTimeoutError, IncompleteReadError
 )
 
+RESUMABLE_DOWNLOAD_EXTENSION = 's3download'
+
 
 class DownloadOutputManager(object):
     """Base manager class for handling various types of files for downloads
@@ -59,10 +76,15 @@ class DownloadOutputManager(object):
     that may be accepted. All implementations must subclass and override
     public methods from this class.
     """
-    def __init__(self, osutil, transfer_coordinator, io_executor):
+    def __init__(self, osutil, transfer_coordinator, io_executor,
+                 max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
         self._osutil = osutil
         self._transfer_coordinator = transfer_coordinator
         self._io_executor = io_executor
+        self._max_coalesced_write_size = max_coalesced_write_size
+        self._max_in_memory_deferred_size = max_in_memory_deferred_size
+        self._window_planner = window_planner
 
     @classmethod
     def is_compatible(cls, download_target, osutil):
@@ -96,7 +118,7 @@ class DownloadOutputManager(object):
         """
         raise NotImplementedError('must implement get_fileobj_for_io_writes()')
 
-    def queue_file_io_task(self, fileobj, data, offset):
+    def queue_file_io_task(self, fileobj, data, offset, done_callbacks=None):
         """Queue IO write for submission to the IO executor.
 
         This method accepts an IO executor and information about the
@@ -104,13 +126,23 @@ class DownloadOutputManager(object):
 
         This method may defer submission to the IO executor if necessary.
 
+        :param done_callbacks: A list of callbacks to call once the data is
+            no longer needed (i.e. once it has been written). This allows
+            the buffer holding the data to be reused.
         """
-        self._transfer_coordinator.submit(
-            self._io_executor,
-            self.get_io_write_task(fileobj, data, offset)
-         )
-
-    def get_io_write_task(self, fileobj, data, offset):
+        try:
+            self._transfer_coordinator.submit(
+                self._io_executor,
+                self.get_io_write_task(fileobj, data, offset, done_callbacks)
+            )
+        except Exception:
+            # The write never got queued so nothing else will run the
+            # done callbacks.
+            for done_callback in done_callbacks or []:
+                done_callback()
+            raise
+
+    def get_io_write_task(self, fileobj, data, offset, done_callbacks=None):
         """Get an IO write task for the requested set of data
 
         This task can be ran immediately or be submitted to the IO executor
@@ -125,6 +157,10 @@ class DownloadOutputManager(object):
         :type offset: integer
         :param offset: The offset to write the data to in the file-like object
 
+        :type done_callbacks: list
+        :param done_callbacks: A list of callbacks to call once the task
+            has run
+
         :returns: An IO task to be used to write data to a file-like object
         """
         return IOWriteTask(
@@ -133,9 +169,99 @@ class DownloadOutputManager(object):
                 'fileobj': fileobj,
                 'data': data,
                 'offset': offset,
-            }
+            },
+            done_callbacks=done_callbacks
         )
 
+    def get_buffer_for_direct_writes(self, fileobj, offset):
+        """Get a buffer that downloaded data can be read directly into
+
+        If a buffer is returned, downloaded content is read straight into
+        it instead of being queued as IO write tasks.
+
+        :type fileobj: file-like object
+        :param fileobj: The file-like object returned from
+            get_fileobj_for_io_writes()
+
+        :type offset: integer
+        :param offset: The offset in the file-like object that the
+            downloaded data starts at
+
+        :returns: A writable buffer starting at the offset or None if data
+            must be written through queue_file_io_task()
+        """
+        return None
+
+    def get_writer_for_immediate_writes(self, fileobj):
+        """Get a function that writes downloaded data right away
+
+        Downloads whose data is written by the thread downloading it use
+        the function, if any, instead of creating an IO write task for
+        every chunk of data. The data given to the function may be a view
+        of a buffer that is reused once the function returns, so it must
+        not keep a reference to it.
+
+        :type fileobj: file-like object
+        :param fileobj: The file-like object returned from
+            get_fileobj_for_io_writes()
+
+        :returns: A function that takes the data and the offset to write
+            it to or None if data must be written through
+            get_io_write_task()
+        """
+        return None
+
+    def submit_ranges(self, fileobj, ranges, submit_range, finalize):
+        """Submit the ranged downloads of an object
+
+        By default, every range is submitted right away. Outputs that can
+        only hold so much data may instead submit ranges as there is room
+        for their data, so that a request thread never has to wait on the
+        output to make room for its data.
+
+        :type fileobj: file-like object
+        :param fileobj: The file-like object returned from
+            get_fileobj_for_io_writes()
+
+        :type ranges: list
+        :param ranges: A list of (start_index, range_parameter) tuples of
+            the ranges to download, in order of the object
+
+        :param submit_range: A function that submits the download of a
+            range. It takes the start index and range parameter of the
+            range, and optionally a list of callbacks to call once the
+            download of the range is done.
+
+        :param finalize: A function to call once every range that will be
+            downloaded has been submitted
+        """
+        for start_index, range_parameter in ranges:
+            submit_range(start_index, range_parameter)
+        finalize()
+
+    def get_downloaded_ranges(self):
+        """Get the byte ranges of the download that are already written
+
+        :rtype: list
+        :returns: A sorted list of (start, end) tuples, where end is
+            exclusive, of the ranges that do not need to be downloaded
+        """
+        return []
+
+    def record_downloaded_range(self, start, end):
+        """Record that all of the data for a range has been downloaded
+
+        This is called once all of the data for the range has been queued
+        to be written.
+
+        :type start: integer
+        :param start: The offset that the range starts at
+
+        :type end: integer
+        :param end: The offset that the range ends at (exclusive)
+        """
+        pass
+
     def get_final_io_task(self):
         """Get the final io task to complete the download
 
@@ -160,12 +286,23 @@ class DownloadOutputManager(object):
 
 
 class DownloadFilenameOutputManager(DownloadOutputManager):
-    def __init__(self, osutil, transfer_coordinator, io_executor):
+    def __init__(self, osutil, transfer_coordinator, io_executor,
+                 max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
         super(DownloadFilenameOutputManager, self).__init__(
-            osutil, transfer_coordinator, io_executor)
+            osutil, transfer_coordinator, io_executor,
+            max_coalesced_write_size, max_in_memory_deferred_size,
+            window_planner)
         self._final_filename = None
         self._temp_filename = None
         self._temp_fileobj = None
+        self._write_queue = None
+        if max_coalesced_write_size is not None:
+            self._write_queue = CoalescingWriteQueue(max_coalesced_write_size)
+            # Make sure any writes that never got written still have their
+            # done callbacks ran if the download fails.
+            self._transfer_coordinator.add_failure_cleanup(
+                self._write_queue.discard_writes)
 
     @classmethod
     def is_compatible(cls, download_target, osutil):
@@ -178,6 +315,54 @@ class DownloadFilenameOutputManager(DownloadOutputManager):
         self._temp_fileobj = self._get_temp_fileobj()
         return self._temp_fileobj
 
+    def queue_file_io_task(self, fileobj, data, offset, done_callbacks=None):
+        if self._write_queue is None:
+            return super(
+                DownloadFilenameOutputManager, self).queue_file_io_task(
+                    fileobj, data, offset, done_callbacks)
+        # Every write still gets its own task so that the size of the io
+        # queue continues to limit how much downloaded data is waiting to be
+        # written. However, each task writes all of the writes pending at
+        # the time it runs, so later tasks often have nothing left to do.
+        self._write_queue.queue_write(offset, data, done_callbacks)
+        try:
+            self._transfer_coordinator.submit(
+                self._io_executor,
+                IOCoalescedWriteTask(
+                    self._transfer_coordinator,
+                    main_kwargs={
+                        'fileobj': fileobj,
+                        'write_queue': self._write_queue,
+                        'osutil': self._osutil,
+                    }
+                )
+            )
+        except Exception:
+            self._write_queue.discard_writes()
+            raise
+
+    def get_io_write_task(self, fileobj, data, offset, done_callbacks=None):
+        # The temporary file is always a file that we opened ourselves so
+        # data can be written positionally to the underlying file descriptor
+        # instead of seeking and writing through a buffered file object.
+        return IOPositionalWriteTask(
+            self._transfer_coordinator,
+            main_kwargs={
+                'fileobj': fileobj,
+                'data': data,
+                'offset': offset,
+                'osutil': self._osutil,
+            },
+            done_callbacks=done_callbacks
+        )
+
+    def get_writer_for_immediate_writes(self, fileobj):
+        return functools.partial(self._write_positionally, fileobj)
+
+    def _write_positionally(self, fileobj, data, offset):
+        fileobj.pwrite(data, offset)
+        self._osutil.release_written_pages(fileobj, offset, len(data))
+
     def get_final_io_task(self):
         # A task to rename the file from the temporary file to its final
         # location is needed. This should be the last task needed to complete
@@ -199,6 +384,206 @@ class DownloadFilenameOutputManager(DownloadOutputManager):
         return f
 
 
+class DownloadResumableFilenameOutputManager(DownloadFilenameOutputManager):
+    """Manager for downloading to a temporary file that can be resumed
+
+    Content is written to a temporary file with a predictable name that is
+    kept if the download fails. A journal of the byte ranges written to
+    the temporary file is kept next to it, so downloading the same version
+    of the object to the same filename again only downloads the ranges
+    that are missing. The journal is saved each time a ranged download
+    completes and when the download fails.
+    """
+    def __init__(self, osutil, transfer_coordinator, io_executor,
+                 max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
+        super(DownloadResumableFilenameOutputManager, self).__init__(
+            osutil, transfer_coordinator, io_executor,
+            max_coalesced_write_size, max_in_memory_deferred_size,
+            window_planner)
+        self._journal = None
+
+    def get_fileobj_for_io_writes(self, transfer_future):
+        fileobj = transfer_future.meta.call_args.fileobj
+        self._final_filename = fileobj
+        self._temp_filename = \
+            fileobj + os.extsep + RESUMABLE_DOWNLOAD_EXTENSION
+        self._journal = self._get_journal(transfer_future)
+        self._temp_fileobj = JournaledFile(
+            self._get_temp_fileobj(), self._journal)
+        # Save whatever was written if anything goes wrong so that the
+        # download can be resumed from there.
+        self._transfer_coordinator.add_failure_cleanup(self._journal.save)
+        return self._temp_fileobj
+
+    def get_downloaded_ranges(self):
+        return self._journal.downloaded_ranges
+
+    def record_downloaded_range(self, start, end):
+        # The journal is saved from the io executor so that it includes
+        # the writes queued for the range.
+        self._transfer_coordinator.submit(
+            self._io_executor,
+            IOSaveDownloadJournalTask(
+                self._transfer_coordinator,
+                main_kwargs={'journal': self._journal}
+            )
+        )
+
+    def get_final_io_task(self):
+        return IOCompleteResumableDownloadTask(
+            transfer_coordinator=self._transfer_coordinator,
+            main_kwargs={
+                'fileobj': self._temp_fileobj,
+                'final_filename': self._final_filename,
+                'osutil': self._osutil,
+                'journal': self._journal
+            },
+            is_final=True
+        )
+
+    def _get_journal(self, transfer_future):
+        call_args = transfer_future.meta.call_args
+        journal_filename = self._temp_filename + os.extsep + 'journal'
+        identity = {
+            'bucket': call_args.bucket,
+            'key': call_args.key,
+            'etag': transfer_future.meta.etag,
+            'version_id': call_args.extra_args.get('VersionId'),
+            'size': transfer_future.meta.size,
+        }
+        journal = DownloadJournal.load(
+            journal_filename, identity, self._osutil)
+        if journal is not None and self._is_temp_file_complete(journal):
+            logger.debug(
+                'Resuming download to %s with downloaded ranges: %s',
+                self._temp_filename, journal.downloaded_ranges)
+            return journal
+        # Start the download over. Saving the empty journal right away
+        # makes sure that the stale journal can never be paired with the
+        # new content of the temporary file.
+        journal = DownloadJournal(journal_filename, identity, self._osutil)
+        journal.save()
+        return journal
+
+    def _is_temp_file_complete(self, journal):
+        downloaded_ranges = journal.downloaded_ranges
+        if not downloaded_ranges:
+            return True
+        try:
+            size = self._osutil.get_file_size(self._temp_filename)
+        except (IOError, OSError):
+            return False
+        return downloaded_ranges[-1][1] <= size
+
+    def _get_temp_fileobj(self):
+        mode = 'wb'
+        if self._journal.downloaded_ranges:
+            # Keep the content that has already been downloaded.
+            mode = 'r+b'
+        f = DeferredOpenFile(
+            self._temp_filename, mode=mode, open_function=self._osutil.open)
+        # Only close the file if anything goes wrong. The temporary file
+        # and its journal are kept so that the download can be resumed.
+        self._transfer_coordinator.add_failure_cleanup(f.close)
+        return f
+
+
+class DownloadMappedFilenameOutputManager(DownloadFilenameOutputManager):
+    """Manager for downloading to a memory mapped temporary file
+
+    The temporary file is preallocated to the size of the object and mapped
+    into memory, so each ranged GetObject can read its part directly into
+    its slice of the file without going through the IO executor.
+    """
+    def __init__(self, osutil, transfer_coordinator, io_executor,
+                 max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
+        super(DownloadMappedFilenameOutputManager, self).__init__(
+            osutil, transfer_coordinator, io_executor,
+            max_coalesced_write_size, max_in_memory_deferred_size,
+            window_planner)
+        self._size = None
+
+    def get_fileobj_for_io_writes(self, transfer_future):
+        self._size = transfer_future.meta.size
+        return super(
+            DownloadMappedFilenameOutputManager,
+            self).get_fileobj_for_io_writes(transfer_future)
+
+    def get_buffer_for_direct_writes(self, fileobj, offset):
+        return fileobj.get_buffer(offset)
+
+    def _get_temp_fileobj(self):
+        try:
+            f = self._osutil.open_mapped_file(self._temp_filename, self._size)
+        except Exception:
+            self._osutil.remove_file(self._temp_filename)
+            raise
+        self._transfer_coordinator.add_failure_cleanup(f.close)
+        self._transfer_coordinator.add_failure_cleanup(
+            self._osutil.remove_file, self._temp_filename)
+        return f
+
+
+class DownloadBufferOutputManager(DownloadOutputManager):
+    """Manager for downloading directly into a writable buffer
+
+    Each GetObject reads its content straight into its slice of the buffer
+    when it can. Data that cannot be read straight into the buffer, such as
+    that of downloads of several byte ranges, is copied into it by IO
+    write tasks.
+    """
+    @classmethod
+    def is_compatible(cls, download_target, osutil):
+        # File-like objects that happen to support the buffer protocol
+        # (e.g. mmap objects) are left to the file-like managers.
+        if hasattr(download_target, 'write'):
+            return False
+        try:
+            view = memoryview(download_target)
+        except TypeError:
+            return False
+        return not view.readonly
+
+    def get_fileobj_for_io_writes(self, transfer_future):
+        buffer = transfer_future.meta.call_args.fileobj
+        size = transfer_future.meta.size
+        if isinstance(buffer, bytearray) and len(buffer) < size:
+            # Grow the bytearray so that it can hold the entire object.
+            buffer.extend(bytearray(size - len(buffer)))
+        view = memoryview(buffer)
+        if hasattr(view, 'cast') and (view.ndim != 1 or view.format != 'B'):
+            # Downloaded content is written by byte offsets so the buffer
+            # needs to be viewed as a flat sequence of bytes.
+            view = view.cast('B')
+        if len(view) < size:
+            raise ValueError(
+                'Buffer of size %s is too small to download an object of '
+                'size %s into.' % (len(view), size))
+        return view
+
+    def get_buffer_for_direct_writes(self, fileobj, offset):
+        return fileobj[offset:]
+
+    def get_io_write_task(self, fileobj, data, offset, done_callbacks=None):
+        # The buffer has no file position to seek, so data is assigned
+        # straight to its slice of the buffer.
+        return IOBufferWriteTask(
+            self._transfer_coordinator,
+            main_kwargs={
+                'fileobj': fileobj,
+                'data': data,
+                'offset': offset,
+            },
+            done_callbacks=done_callbacks
+        )
+
+    def get_final_io_task(self):
+        return CompleteDownloadNOOPTask(
+            transfer_coordinator=self._transfer_coordinator)
+
+
 class DownloadSeekableOutputManager(DownloadOutputManager):
     @classmethod
     def is_compatible(cls, download_target, osutil):
@@ -208,6 +593,16 @@ class DownloadSeekableOutputManager(DownloadOutputManager):
         # Return the fileobj provided to the future.
         return transfer_future.meta.call_args.fileobj
 
+    def get_writer_for_immediate_writes(self, fileobj):
+        return functools.partial(self._seek_and_write, fileobj)
+
+    def _seek_and_write(self, fileobj, data, offset):
+        fileobj.seek(offset)
+        # The data may be a view of a buffer that gets reused once this
+        # returns, so the caller's fileobj is given its own copy in case
+        # it holds on to what it is given.
+        fileobj.write(bytes(data))
+
     def get_final_io_task(self):
         # This task will serve the purpose of signaling when all of the io
         # writes have finished so done callbacks can be called.
@@ -217,11 +612,18 @@ class DownloadSeekableOutputManager(DownloadOutputManager):
 
 class DownloadNonSeekableOutputManager(DownloadOutputManager):
     def __init__(self, osutil, transfer_coordinator, io_executor,
-                 defer_queue=None):
+                 defer_queue=None, max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
         super(DownloadNonSeekableOutputManager, self).__init__(
-            osutil, transfer_coordinator, io_executor)
+            osutil, transfer_coordinator, io_executor,
+            max_coalesced_write_size, max_in_memory_deferred_size,
+            window_planner)
         if defer_queue is None:
-            defer_queue = DeferQueue()
+            defer_queue = DeferQueue(max_in_memory_deferred_size)
+            # Make sure any data spilled to disk is cleaned up if the
+            # download fails before all of it gets written.
+            self._transfer_coordinator.add_failure_cleanup(
+                defer_queue.close)
         self._defer_queue = defer_queue
         self._io_submit_lock = threading.Lock()
 
@@ -239,32 +641,93 @@ class DownloadNonSeekableOutputManager(DownloadOutputManager):
         return CompleteDownloadNOOPTask(
             transfer_coordinator=self._transfer_coordinator)
 
-    def queue_file_io_task(self, fileobj, data, offset):
+    def queue_file_io_task(self, fileobj, data, offset, done_callbacks=None):
         with self._io_submit_lock:
-            writes = self._defer_queue.request_writes(offset, data)
+            writes = self._request_writes(offset, data, done_callbacks)
+            if self._max_coalesced_write_size is not None:
+                writes = self._coalesce_writes(writes)
             for write in writes:
-                data = write['data']
                 logger.debug("Queueing IO offset %s for fileobj: %s",
                              write['offset'], fileobj)
                 super(
                     DownloadNonSeekableOutputManager, self).queue_file_io_task(
-                        fileobj, data, offset)
+                        fileobj, write['data'], write['offset'],
+                        write.get('done_callbacks'))
+
+    def _request_writes(self, offset, data, done_callbacks):
+        if done_callbacks and offset != self._defer_queue.next_offset:
+            # Data may sit in the defer queue until all of the data before
+            # it has been downloaded. Copy it so the buffer it came from
+            # can be reused right away instead of potentially waiting on
+            # downloads that need that buffer to make progress.
+            data = memoryview(data).tobytes()
+            self._run_callbacks(done_callbacks)
+            done_callbacks = None
+        try:
+            writes = self._defer_queue.request_writes(offset, data)
+        except Exception:
+            self._run_callbacks(done_callbacks or [])
+            raise
+        if done_callbacks:
+            # The data is written next, so it is written straight from the
+            # buffer it came from, which is reused once it is written.
+            writes[0]['done_callbacks'] = done_callbacks
+        return writes
 
-    def get_io_write_task(self, fileobj, data, offset):
+    def _coalesce_writes(self, writes):
+        # The writes released from the defer queue are contiguous, so they
+        # can be joined together into as few writes as the max size allows.
+        coalesced_writes = []
+        pending = []
+        pending_size = 0
+        for write in writes:
+            size = len(write['data'])
+            if pending and \
+                    pending_size + size > self._max_coalesced_write_size:
+                coalesced_writes.append(
+                    self._join_writes(pending))
+                pending = []
+                pending_size = 0
+            pending.append(write)
+            pending_size += size
+        if pending:
+            coalesced_writes.append(self._join_writes(pending))
+        return coalesced_writes
+
+    def _join_writes(self, writes):
+        if len(writes) == 1:
+            return writes[0]
+        data = b''.join(write['data'] for write in writes)
+        # The joined data is a copy, so the buffers of the writes can be
+        # reused right away.
+        for write in writes:
+            self._run_callbacks(write.get('done_callbacks', []))
+        return {'offset': writes[0]['offset'], 'data': data}
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            callback()
+
+    def get_io_write_task(self, fileobj, data, offset, done_callbacks=None):
         return IOStreamingWriteTask(
             self._transfer_coordinator,
             main_kwargs={
                 'fileobj': fileobj,
                 'data': data,
-            }
+                'window_planner': self._window_planner,
+            },
+            done_callbacks=done_callbacks
         )
 
 
 class DownloadSpecialFilenameOutputManager(DownloadNonSeekableOutputManager):
     def __init__(self, osutil, transfer_coordinator, io_executor,
-                 defer_queue=None):
+                 defer_queue=None, max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
         super(DownloadSpecialFilenameOutputManager, self).__init__(
-            osutil, transfer_coordinator, io_executor, defer_queue)
+            osutil, transfer_coordinator, io_executor, defer_queue,
+            max_coalesced_write_size, max_in_memory_deferred_size,
+            window_planner)
         self._fileobj = None
 
     @classmethod
@@ -285,6 +748,309 @@ class DownloadSpecialFilenameOutputManager(DownloadNonSeekableOutputManager):
             main_kwargs={'fileobj': self._fileobj})
 
 
+class DownloadStreamOutputManager(DownloadOutputManager):
+    """Manager for downloading to a DownloadStream
+
+    Downloaded data is handed straight to the stream, which reorders it
+    and holds it until it is read. Data read into pooled buffers keeps its
+    buffer until it is read, unless it has to wait for the data before
+    it, in which case it is copied. Ranged downloads are only submitted
+    once the data they download starts within the readahead window of the
+    stream, so requests never wait on the stream to be read. The ranges
+    past the window are submitted by the reader of the stream as reading
+    moves the window, so no thread waits on the stream either.
+    """
+    @classmethod
+    def is_compatible(cls, download_target, osutil):
+        return isinstance(download_target, DownloadStream)
+
+    def get_fileobj_for_io_writes(self, transfer_future):
+        return transfer_future.meta.call_args.fileobj
+
+    def queue_file_io_task(self, fileobj, data, offset, done_callbacks=None):
+        # There is no io to do so the data is handed to the stream from
+        # the current thread instead of going through the io executor.
+        self.get_io_write_task(fileobj, data, offset, done_callbacks)()
+
+    def get_io_write_task(self, fileobj, data, offset, done_callbacks=None):
+        main_kwargs = {
+            'stream': fileobj,
+            'data': data,
+            'offset': offset,
+        }
+        task_done_callbacks = None
+        if done_callbacks:
+            # The stream may hold on to the data until it is read, so the
+            # done callbacks are only called once both the task is done
+            # and the stream no longer needs the data.
+            done_invoker = CountCallbackInvoker(
+                FunctionContainer(self._run_callbacks, done_callbacks))
+            main_kwargs['done_invoker'] = done_invoker
+            task_done_callbacks = [done_invoker.finalize]
+        return DownloadStreamWriteTask(
+            self._transfer_coordinator,
+            main_kwargs=main_kwargs,
+            done_callbacks=task_done_callbacks
+        )
+
+    def get_final_io_task(self):
+        return CompleteDownloadNOOPTask(
+            transfer_coordinator=self._transfer_coordinator)
+
+    def submit_ranges(self, fileobj, ranges, submit_range, finalize):
+        # The readahead window of the stream bounds the data held for it,
+        # so its downloads are not tagged as in-memory downloads. Otherwise
+        # the reader could end up waiting on other downloads to submit the
+        # next range.
+        submitter = DownloadStreamRangeSubmitter(
+            fileobj, self._transfer_coordinator, ranges, submit_range,
+            finalize)
+        fileobj.add_window_callback(submitter.submit)
+        self._transfer_coordinator.add_cancel_callback(submitter.submit)
+        submitter.submit()
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            callback()
+
+
+class DownloadTeeOutputManager(DownloadOutputManager):
+    """Manager for downloading to several targets at once
+
+    The object is only downloaded once. Each downloaded chunk is handed
+    to the output manager of every target, so each target receives the
+    entire content of the object. Targets can be any filename or
+    file-like object that can be downloaded to on its own.
+    """
+    def __init__(self, osutil, transfer_coordinator, io_executor,
+                 max_coalesced_write_size=None,
+                 max_in_memory_deferred_size=None, window_planner=None):
+        super(DownloadTeeOutputManager, self).__init__(
+            osutil, transfer_coordinator, io_executor,
+            max_coalesced_write_size, max_in_memory_deferred_size,
+            window_planner)
+        self._target_managers = []
+
+    @classmethod
+    def is_compatible(cls, download_target, osutil):
+        return isinstance(download_target, (list, tuple)) and \
+            len(download_target) > 0
+
+    def get_download_task_tag(self):
+        for target_manager in self._target_managers:
+            tag = target_manager.get_download_task_tag()
+            if tag is not None:
+                return tag
+        return None
+
+    def get_fileobj_for_io_writes(self, transfer_future):
+        # The target managers only ever complete their part of the
+        # transfer. The transfer itself is completed by the final task of
+        # this manager once all of the targets are complete.
+        target_coordinator = TeeTargetTransferCoordinator(
+            self._transfer_coordinator)
+        fileobjs = []
+        for target in transfer_future.meta.call_args.fileobj:
+            target_manager_cls = self._get_target_manager_cls(target)
+            target_manager = target_manager_cls(
+                self._osutil, target_coordinator, self._io_executor,
+                max_coalesced_write_size=self._max_coalesced_write_size,
+                max_in_memory_deferred_size=(
+                    self._max_in_memory_deferred_size),
+                window_planner=self._window_planner)
+            self._target_managers.append(target_manager)
+            fileobjs.append(target_manager.get_fileobj_for_io_writes(
+                self._get_target_future(transfer_future, target)))
+        return fileobjs
+
+    def queue_file_io_task(self, fileobj, data, offset, done_callbacks=None):
+        # The data is only done with once every target has written it.
+        done_invoker = CountCallbackInvoker(
+            FunctionContainer(self._run_callbacks, done_callbacks or []))
+        try:
+            for target_manager, target_fileobj in zip(
+                    self._target_managers, fileobj):
+                done_invoker.increment()
+                target_manager.queue_file_io_task(
+                    target_fileobj, data, offset, [done_invoker.decrement])
+        finally:
+            done_invoker.finalize()
+
+    def get_io_write_task(self, fileobj, data, offset, done_callbacks=None):
+        write_tasks = [
+            target_manager.get_io_write_task(target_fileobj, data, offset)
+            for target_manager, target_fileobj in zip(
+                self._target_managers, fileobj)
+        ]
+        return IOTeeWriteTask(
+            self._transfer_coordinator,
+            main_kwargs={'write_tasks': write_tasks},
+            done_callbacks=done_callbacks
+        )
+
+    def get_final_io_task(self):
+        return CompleteTeeDownloadTask(
+            transfer_coordinator=self._transfer_coordinator,
+            main_kwargs={
+                'final_tasks': [
+                    target_manager.get_final_io_task()
+                    for target_manager in self._target_managers
+                ]
+            }
+        )
+
+    def _get_target_manager_cls(self, target):
+        # Memory mapped, resumable and buffer downloads rely on
+        # reading directly into their target, which cannot be shared, so
+        # only the managers that write through io tasks can be used.
+        target_manager_resolver_chain = [
+            DownloadSpecialFilenameOutputManager,
+            DownloadFilenameOutputManager,
+            DownloadSeekableOutputManager,
+            DownloadNonSeekableOutputManager,
+        ]
+        for target_manager_cls in target_manager_resolver_chain:
+            if target_manager_cls.is_compatible(target, self._osutil):
+                return target_manager_cls
+        raise RuntimeError(
+            'Output %s of type: %s is not supported for downloading to '
+            'several targets.' % (target, type(target)))
+
+    def _get_target_future(self, transfer_future, target):
+        call_args = copy.copy(transfer_future.meta.call_args)
+        call_args.fileobj = target
+        meta = TransferMeta(
+            call_args, transfer_id=transfer_future.meta.transfer_id)
+        meta.provide_transfer_size(transfer_future.meta.size)
+        meta.provide_object_etag(transfer_future.meta.etag)
+        return TransferFuture(meta, self._transfer_coordinator)
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            callback()
+
+
+class TeeTargetTransferCoordinator(object):
+    """Coordinator for one of the targets of a download to several targets
+
+    Everything is handled by the coordinator of the transfer, except that
+    the final task of a target cannot complete the transfer because the
+    other targets may still have work left to do.
+    """
+    def __init__(self, transfer_coordinator):
+        """
+        :type transfer_coordinator: s3transfer.futures.TransferCoordinator
+        :param transfer_coordinator: The coordinator of the transfer
+        """
+        self._transfer_coordinator = transfer_coordinator
+
+    def __getattr__(self, name):
+        return getattr(self._transfer_coordinator, name)
+
+    def set_result(self, result):
+        pass
+
+    def announce_done(self):
+        pass
+
+
+class DownloadRangesOutputManager(object):
+    """Wraps an output manager to download byte ranges of an object
+
+    Downloaded data is handed to this manager at its offset in the object.
+    The parts of it that belong to the requested ranges are handed to the
+    wrapped manager at their offset in the output, and any data in the gaps
+    between the requested ranges is dropped.
+    """
+    def __init__(self, download_output_manager, requested_ranges,
+                 progress_callbacks=None):
+        """
+        :type download_output_manager: DownloadOutputManager
+        :param download_output_manager: The manager of the output
+
+        :param requested_ranges: A list of (start, end, output_offset)
+            tuples, where end is exclusive, of the ranges of the object to
+            write and where each one goes in the output
+
+        :param progress_callbacks: The progress callbacks of the download.
+            Progress is reported for the data written to the output, so
+            progress for dropped data is taken back and data written for
+            several ranges is counted for each of them.
+        """
+        self._download_output_manager = download_output_manager
+        self._requested_ranges = sorted(requested_ranges)
+        self._progress_callbacks = progress_callbacks or []
+        self._starts = [start for start, _, _ in self._requested_ranges]
+        # Ranges may overlap, so the largest end seen so far is used to
+        # find the first range that can contain an offset.
+        self._max_ends = []
+        max_end = 0
+        for _, end, _ in self._requested_ranges:
+            max_end = max(max_end, end)
+            self._max_ends.append(max_end)
+
+    def get_download_task_tag(self):
+        return self._download_output_manager.get_download_task_tag()
+
+    def get_buffer_for_direct_writes(self, fileobj, offset):
+        # Data can only be read straight into the output if there are no
+        # gaps to drop from it.
+        if len(self._requested_ranges) != 1:
+            return None
+        start, _, output_offset = self._requested_ranges[0]
+        return self._download_output_manager.get_buffer_for_direct_writes(
+            fileobj, output_offset + offset - start)
+
+    def queue_file_io_task(self, fileobj, data, offset, done_callbacks=None):
+        data = memoryview(data)
+        data_end = offset + len(data)
+        # The data is only done with once every part of it is written.
+        done_invoker = CountCallbackInvoker(
+            FunctionContainer(self._run_callbacks, done_callbacks or []))
+        written = 0
+        try:
+            first = bisect.bisect_right(self._max_ends, offset)
+            last = bisect.bisect_left(self._starts, data_end)
+            for start, end, output_offset in \
+                    self._requested_ranges[first:last]:
+                part_start = max(start, offset)
+                part_end = min(end, data_end)
+                if part_start >= part_end:
+                    continue
+                # Data that is part of several ranges is written, and
+                # counted towards the size of the transfer, once for each.
+                written += part_end - part_start
+                part_done_callbacks = None
+                if done_callbacks:
+                    done_invoker.increment()
+                    part_done_callbacks = [done_invoker.decrement]
+                self._download_output_manager.queue_file_io_task(
+                    fileobj, data[part_start - offset:part_end - offset],
+                    output_offset + part_start - start, part_done_callbacks)
+        finally:
+            done_invoker.finalize()
+        invoke_progress_callbacks(
+            self._progress_callbacks, written - len(data))
+
+    def submit_ranges(self, fileobj, ranges, submit_range, finalize):
+        # The ranges are requested in the order of the object rather than
+        # of the output, so waiting on room in the output could end up
+        # waiting on data that has not been requested yet.
+        for start_index, range_parameter in ranges:
+            submit_range(start_index, range_parameter)
+        finalize()
+
+    def record_downloaded_range(self, start, end):
+        pass
+
+    def get_final_io_task(self):
+        return self._download_output_manager.get_final_io_task()
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            callback()
+
+
 class DownloadSubmissionTask(SubmissionTask):
     """Task for submitting tasks to execute a download"""
 
@@ -302,8 +1068,11 @@ class DownloadSubmissionTask(SubmissionTask):
             input for downloads.
         """
         download_manager_resolver_chain = [
+            DownloadTeeOutputManager,
+            DownloadStreamOutputManager,
             DownloadSpecialFilenameOutputManager,
             DownloadFilenameOutputManager,
+            DownloadBufferOutputManager,
             DownloadSeekableOutputManager,
             DownloadNonSeekableOutputManager,
         ]
@@ -317,7 +1086,8 @@ class DownloadSubmissionTask(SubmissionTask):
                 fileobj, type(fileobj)))
 
     def _submit(self, client, config, osutil, request_executor, io_executor,
-                transfer_future, bandwidth_limiter=None):
+                transfer_future, bandwidth_limiter=None, buffer_pool=None,
+                part_size_planner=None, window_planner=None):
         """
         :param client: The client associated with the transfer manager
 
@@ -343,38 +1113,250 @@ class DownloadSubmissionTask(SubmissionTask):
         :type bandwidth_limiter: s3transfer.bandwidth.BandwidthLimiter
         :param bandwidth_limiter: The bandwidth limiter to use when
             downloading streams
+
+        :type buffer_pool: s3transfer.utils.BufferPool
+        :param buffer_pool: The pool of buffers to read downloaded streams
+            into
+
+        :type part_size_planner: s3transfer.utils.DownloadPartSizePlanner
+        :param part_size_planner: The planner to use to pick the size of
+            each ranged request. If not provided, the configured
+            multipart_chunksize is used.
+
+        :type window_planner: s3transfer.utils.DownloadWindowPlanner
+        :param window_planner: The planner to record the duration of
+            ranged requests and how fast downloaded content is written with
+            so it can resize the window of in memory chunks.
         """
-        if transfer_future.meta.size is None:
+        download_output_manager_cls = self._get_download_output_manager_cls(
+            transfer_future, osutil)
+        byte_ranges = getattr(
+            transfer_future.meta.call_args, 'byte_ranges', None)
+        # Resumable downloads need the ETag of the object to know whether
+        # a previously downloaded temporary file can be reused.
+        needs_etag = (
+            config.resumable_downloads and
+            byte_ranges is None and
+            download_output_manager_cls is DownloadFilenameOutputManager and
+            transfer_future.meta.etag is None
+        )
+        # Verifying a download needs the ETag of the object and whether
+        # it is encrypted, which is in the response for the object.
+        verify = config.verify_downloads and byte_ranges is None
+        first_response = None
+        if transfer_future.meta.size is None and not needs_etag and \
+                byte_ranges is None and config.skip_download_head_object:
+            # Learn the size from the first ranged GetObject instead of
+            # making a separate HeadObject request.
+            first_response = self._get_first_range(
+                client, config, transfer_future)
+        object_response = first_response
+        if transfer_future.meta.size is None or needs_etag or \
+                (verify and object_response is None):
             # If a size was not provided figure out the size for the
             # user.
-            response = client.head_object(
+            object_response = client.head_object(
                 Bucket=transfer_future.meta.call_args.bucket,
                 Key=transfer_future.meta.call_args.key,
                 **transfer_future.meta.call_args.extra_args
             )
             transfer_future.meta.provide_transfer_size(
-                response['ContentLength'])
-
-        download_output_manager = self._get_download_output_manager_cls(
-            transfer_future, osutil)(osutil, self._transfer_coordinator,
-                                     io_executor)
-
+                object_response['ContentLength'])
+            transfer_future.meta.provide_object_etag(
+                object_response.get('ETag'))
+
+        requested_ranges = None
+        if byte_ranges is not None:
+            # The size known so far is the size of the object. The size of
+            # the transfer is the size of the content of all of the ranges.
+            requested_ranges = self._get_requested_ranges(
+                byte_ranges, transfer_future.meta.size)
+            transfer_future.meta.provide_transfer_size(
+                sum(end - start for start, end, _ in requested_ranges))
+
+        if self._should_use_resumable_file(
+                config, transfer_future, download_output_manager_cls):
+            download_output_manager_cls = \
+                DownloadResumableFilenameOutputManager
+        elif self._should_use_mapped_file(
+                config, transfer_future, download_output_manager_cls):
+            download_output_manager_cls = DownloadMappedFilenameOutputManager
+        download_output_manager = download_output_manager_cls(
+            osutil, self._transfer_coordinator, io_executor,
+            max_coalesced_write_size=config.max_coalesced_write_size,
+            max_in_memory_deferred_size=(
+                config.max_in_memory_deferred_download_size),
+            window_planner=window_planner)
+
+        etag_calculator = None
+        if verify:
+            etag_calculator = self._get_etag_calculator(
+                client, config, transfer_future, object_response)
+
+        if requested_ranges is not None:
+            self._submit_byte_ranges_download_request(
+                client, config, osutil, request_executor, io_executor,
+                download_output_manager, transfer_future, bandwidth_limiter,
+                buffer_pool, part_size_planner, requested_ranges,
+                window_planner)
+        elif first_response is not None:
+            # The first range has already been requested, so if it covers
+            # the whole object there is nothing else to download.
+            if transfer_future.meta.size <= config.multipart_chunksize:
+                self._submit_download_request(
+                    client, config, osutil, request_executor, io_executor,
+                    download_output_manager, transfer_future,
+                    bandwidth_limiter, buffer_pool, first_response,
+                    etag_calculator)
+            else:
+                self._submit_ranged_download_request(
+                    client, config, osutil, request_executor, io_executor,
+                    download_output_manager, transfer_future,
+                    bandwidth_limiter, buffer_pool, part_size_planner,
+                    first_response, etag_calculator, window_planner)
         # If it is greater than threshold do a ranged download, otherwise
         # do a regular GetObject download.
-        if transfer_future.meta.size < config.multipart_threshold:
+        elif transfer_future.meta.size < config.multipart_threshold:
             self._submit_download_request(
                 client, config, osutil, request_executor, io_executor,
-                download_output_manager, transfer_future, bandwidth_limiter)
+                download_output_manager, transfer_future, bandwidth_limiter,
+                buffer_pool, etag_calculator=etag_calculator)
         else:
             self._submit_ranged_download_request(
                 client, config, osutil, request_executor, io_executor,
-                download_output_manager, transfer_future, bandwidth_limiter)
+                download_output_manager, transfer_future, bandwidth_limiter,
+                buffer_pool, part_size_planner,
+                etag_calculator=etag_calculator,
+                window_planner=window_planner)
+
+    def _get_etag_calculator(self, client, config, transfer_future,
+                             object_response):
+        call_args = transfer_future.meta.call_args
+        etag = transfer_future.meta.etag
+        if etag is None:
+            logger.debug('Not verifying download without an ETag.')
+            return None
+        # The ETag of objects encrypted with KMS or a customer provided
+        # key is not the MD5 of their content.
+        encryption = object_response.get('ServerSideEncryption', '')
+        if object_response.get('SSECustomerAlgorithm') or \
+                encryption.startswith('aws:kms'):
+            logger.debug('Not verifying download of an encrypted object.')
+            return None
+        size = transfer_future.meta.size
+        etag = etag.strip('"')
+        if '-' not in etag:
+            return self._create_etag_calculator(config, size)
+        # The ETag of a multipart upload is the MD5 of the MD5 of each of
+        # its parts. The size of the first part is assumed to be the size
+        # of every part but the last one.
+        num_parts = int(etag.split('-', 1)[1])
+        try:
+            part_size = client.head_object(
+                Bucket=call_args.bucket, Key=call_args.key, PartNumber=1,
+                **call_args.extra_args
+            )['ContentLength']
+        except (ParamValidationError, ClientError) as e:
+            # Older versions of botocore do not know about PartNumber, and
+            # not every S3 compatible service supports it.
+            logger.debug(
+                'Not verifying download of a multipart object whose part '
+                'size could not be found: %s', e)
+            return None
+        if not part_size or \
+                int(math.ceil(size / float(part_size))) != num_parts:
+            logger.debug(
+                'Not verifying download of an object whose parts are not '
+                'all the same size.')
+            return None
+        return self._create_etag_calculator(config, size, part_size)
+
+    def _create_etag_calculator(self, config, size, part_size=None):
+        # Content that has to wait to be hashed is limited to what the io
+        # queue could hold if no limit was configured for deferred content.
+        max_in_memory_size = config.max_in_memory_deferred_download_size
+        if max_in_memory_size is None:
+            max_in_memory_size = \
+                config.max_io_queue_size * config.io_chunksize
+        etag_calculator = ETagCalculator(
+            size, part_size, max_in_memory_size=max_in_memory_size)
+        # Make sure any content spilled to disk is cleaned up if the
+        # download fails before all of it gets hashed.
+        self._transfer_coordinator.add_failure_cleanup(etag_calculator.close)
+        return etag_calculator
+
+    def _get_first_range(self, client, config, transfer_future):
+        call_args = transfer_future.meta.call_args
+        try:
+            response = client.get_object(
+                Bucket=call_args.bucket, Key=call_args.key,
+                Range=self._get_first_range_param(config),
+                **call_args.extra_args
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'InvalidRange':
+                raise
+            # There is no range to get from an empty object.
+            transfer_future.meta.provide_transfer_size(0)
+            return None
+        # The body is only read once its GetObject task runs, so make sure
+        # its connection is released if the download fails before that.
+        self._transfer_coordinator.add_failure_cleanup(response['Body'].close)
+        transfer_future.meta.provide_transfer_size(
+            self._get_size_from_response(response))
+        transfer_future.meta.provide_object_etag(response.get('ETag'))
+        return response
+
+    def _get_first_range_param(self, config):
+        return 'bytes=0-%s' % (config.multipart_chunksize - 1)
+
+    def _get_size_from_response(self, response):
+        # The Content-Range is of the form: bytes <start>-<end>/<size>
+        content_range = response.get('ContentRange')
+        if content_range is None:
+            # The entire object was returned.
+            return response['ContentLength']
+        return int(content_range.split('/')[-1])
+
+    def _should_use_resumable_file(self, config, transfer_future,
+                                   download_output_manager_cls):
+        # Only ranged downloads to regular files are resumed and only if
+        # there is an ETag to make sure the object has not changed.
+        return (
+            config.resumable_downloads and
+            download_output_manager_cls is DownloadFilenameOutputManager and
+            getattr(transfer_future.meta.call_args, 'byte_ranges', None)
+            is None and
+            transfer_future.meta.etag is not None and
+            transfer_future.meta.size >= config.multipart_threshold
+        )
+
+    def _should_use_mapped_file(self, config, transfer_future,
+                                download_output_manager_cls):
+        # Memory mapping is only used for ranged downloads of non-empty
+        # objects to regular files and only if it was requested. Downloads
+        # of byte ranges write their data through io tasks, which cannot
+        # write to a memory mapped file.
+        return (
+            config.use_mmap_downloads and
+            download_output_manager_cls is DownloadFilenameOutputManager and
+            getattr(transfer_future.meta.call_args, 'byte_ranges', None)
+            is None and
+            transfer_future.meta.size > 0 and
+            transfer_future.meta.size >= config.multipart_threshold
+        )
 
     def _submit_download_request(self, client, config, osutil,
                                  request_executor, io_executor,
                                  download_output_manager, transfer_future,
-                                 bandwidth_limiter):
+                                 bandwidth_limiter, buffer_pool=None,
+                                 first_response=None, etag_calculator=None):
         call_args = transfer_future.meta.call_args
+        extra_args = call_args.extra_args
+        if first_response is not None:
+            # Any retries need to request the same range.
+            extra_args = dict(
+                extra_args, Range=self._get_first_range_param(config))
 
         # Get a handle to the file that will be used for writing downloaded
         # contents
@@ -388,7 +1370,8 @@ class DownloadSubmissionTask(SubmissionTask):
         get_object_tag = download_output_manager.get_download_task_tag()
 
         # Get the final io task to run once the download is complete.
-        final_task = download_output_manager.get_final_io_task()
+        final_task = self._get_final_io_task(
+            download_output_manager, transfer_future, etag_calculator)
 
         # Submit the task to download the object.
         self._transfer_coordinator.submit(
@@ -400,12 +1383,15 @@ class DownloadSubmissionTask(SubmissionTask):
                     'bucket': call_args.bucket,
                     'key': call_args.key,
                     'fileobj': fileobj,
-                    'extra_args': call_args.extra_args,
+                    'extra_args': extra_args,
                     'callbacks': progress_callbacks,
                     'max_attempts': config.num_download_attempts,
                     'download_output_manager': download_output_manager,
                     'io_chunksize': config.io_chunksize,
-                    'bandwidth_limiter': bandwidth_limiter
+                    'bandwidth_limiter': bandwidth_limiter,
+                    'buffer_pool': buffer_pool,
+                    'response': first_response,
+                    'etag_calculator': etag_calculator
                 },
                 done_callbacks=[final_task]
             ),
@@ -416,7 +1402,11 @@ class DownloadSubmissionTask(SubmissionTask):
                                         request_executor, io_executor,
                                         download_output_manager,
                                         transfer_future,
-                                        bandwidth_limiter):
+                                        bandwidth_limiter, buffer_pool=None,
+                                        part_size_planner=None,
+                                        first_response=None,
+                                        etag_calculator=None,
+                                        window_planner=None):
         call_args = transfer_future.meta.call_args
 
         # Get the needed progress callbacks for the task
@@ -429,8 +1419,155 @@ class DownloadSubmissionTask(SubmissionTask):
 
         # Determine the number of parts
         part_size = config.multipart_chunksize
-        num_parts = int(
-            math.ceil(transfer_future.meta.size / float(part_size)))
+        if part_size_planner is not None:
+            part_size = part_size_planner.get_part_size(
+                transfer_future.meta.size, config.max_request_concurrency)
+        downloaded_ranges = download_output_manager.get_downloaded_ranges()
+        if downloaded_ranges and etag_calculator is not None:
+            # Content downloaded by a previous attempt is not downloaded
+            # again, so it cannot be hashed.
+            logger.debug('Not verifying resumed download.')
+            etag_calculator = None
+        if etag_calculator is not None and \
+                etag_calculator.part_size is not None:
+            # Each request only downloads whole parts of the object, so the
+            # content of each part is always provided in order.
+            etag_part_size = etag_calculator.part_size
+            part_size = etag_part_size * max(part_size // etag_part_size, 1)
+        if first_response is not None:
+            # Split up everything after the range that was already
+            # requested.
+            first_range = (0, self._get_first_range_param(config))
+            ranges = [first_range] + self._get_ranges_to_download(
+                transfer_future.meta.size, part_size,
+                [(0, config.multipart_chunksize)])
+        else:
+            ranges = self._get_ranges_to_download(
+                transfer_future.meta.size, part_size, downloaded_ranges)
+        # Account for any content that was downloaded by a previous
+        # attempt at the download.
+        invoke_progress_callbacks(
+            progress_callbacks,
+            sum(end - start for start, end in downloaded_ranges))
+
+        get_object_args = dict(call_args.extra_args)
+        if isinstance(download_output_manager,
+                      DownloadResumableFilenameOutputManager):
+            # Make sure content from a different version of the object
+            # never ends up in the same file.
+            get_object_args['IfMatch'] = transfer_future.meta.etag
+
+        hash_executor = None
+        if etag_calculator is not None and \
+                not self._is_aligned_to_etag_parts(ranges, etag_calculator):
+            # Content of a part that is downloaded by several requests can
+            # arrive out of order and wait to be hashed, so it is hashed on
+            # the io executor instead of holding up the requests.
+            hash_executor = io_executor
+
+        self._submit_ranged_get_object_tasks(
+            client, config, request_executor, io_executor,
+            download_output_manager, transfer_future, fileobj, ranges,
+            get_object_args, progress_callbacks, bandwidth_limiter,
+            buffer_pool, part_size_planner, first_response, etag_calculator,
+            window_planner, hash_executor)
+
+    def _is_aligned_to_etag_parts(self, ranges, etag_calculator):
+        # The ranges cover the object one after another, so they only
+        # download whole parts if each of them starts at a part.
+        if etag_calculator.part_size is None:
+            return len(ranges) <= 1
+        return all(
+            start_index % etag_calculator.part_size == 0
+            for start_index, _ in ranges
+        )
+
+    def _submit_byte_ranges_download_request(self, client, config, osutil,
+                                             request_executor, io_executor,
+                                             download_output_manager,
+                                             transfer_future,
+                                             bandwidth_limiter, buffer_pool,
+                                             part_size_planner,
+                                             requested_ranges,
+                                             window_planner=None):
+        call_args = transfer_future.meta.call_args
+        progress_callbacks = get_callbacks(transfer_future, 'progress')
+        fileobj = download_output_manager.get_fileobj_for_io_writes(
+            transfer_future)
+        if not transfer_future.meta.size and \
+                download_output_manager.get_buffer_for_direct_writes(
+                    fileobj, 0) is None:
+            # There is nothing to download, but the output still needs to
+            # be created.
+            download_output_manager.queue_file_io_task(fileobj, b'', 0)
+
+        # The content of each request is written through a manager that
+        # places the requested parts of it in the output and drops the
+        # rest.
+        download_output_manager = DownloadRangesOutputManager(
+            download_output_manager, requested_ranges, progress_callbacks)
+        merged_ranges = self._merge_requested_ranges(
+            requested_ranges, config.max_download_range_gap_size)
+        part_size = config.multipart_chunksize
+        if part_size_planner is not None:
+            part_size = part_size_planner.get_part_size(
+                sum(end - start for start, end in merged_ranges),
+                config.max_request_concurrency)
+        ranges = []
+        for start, end in merged_ranges:
+            for part_start in range(start, end, part_size):
+                part_end = min(part_start + part_size, end)
+                ranges.append(
+                    (part_start, 'bytes=%s-%s' % (part_start, part_end - 1)))
+
+        self._submit_ranged_get_object_tasks(
+            client, config, request_executor, io_executor,
+            download_output_manager, transfer_future, fileobj, ranges,
+            dict(call_args.extra_args), progress_callbacks,
+            bandwidth_limiter, buffer_pool, part_size_planner,
+            window_planner=window_planner)
+
+    def _get_requested_ranges(self, byte_ranges, size):
+        # Returns a list of (start, end, output_offset) tuples of the parts
+        # of the object to download and where they go in the output.
+        requested_ranges = []
+        output_offset = 0
+        for offset, length in byte_ranges:
+            start = min(offset, size)
+            end = size
+            if length is not None:
+                end = min(offset + length, size)
+            requested_ranges.append((start, end, output_offset))
+            output_offset += end - start
+        return requested_ranges
+
+    def _merge_requested_ranges(self, requested_ranges, max_gap_size):
+        # Returns a sorted list of (start, end) tuples of the parts of the
+        # object to request.
+        max_gap_size = max_gap_size or 0
+        merged_ranges = []
+        for start, end, _ in sorted(requested_ranges):
+            if start == end:
+                continue
+            if merged_ranges and \
+                    start <= merged_ranges[-1][1] + max_gap_size:
+                merged_ranges[-1][1] = max(merged_ranges[-1][1], end)
+            else:
+                merged_ranges.append([start, end])
+        return [(start, end) for start, end in merged_ranges]
+
+    def _submit_ranged_get_object_tasks(self, client, config,
+                                        request_executor, io_executor,
+                                        download_output_manager,
+                                        transfer_future, fileobj, ranges,
+                                        get_object_args, progress_callbacks,
+                                        bandwidth_limiter, buffer_pool,
+                                        part_size_planner,
+                                        first_response=None,
+                                        etag_calculator=None,
+                                        window_planner=None,
+                                        hash_executor=None):
+        call_args = transfer_future.meta.call_args
 
         # Get any associated tags for the get object task.
         get_object_tag = download_output_manager.get_download_task_tag()
@@ -439,49 +1576,117 @@ class DownloadSubmissionTask(SubmissionTask):
         # are complete.
         finalize_download_invoker = CountCallbackInvoker(
             self._get_final_io_task_submission_callback(
-                download_output_manager, io_executor
+                download_output_manager, io_executor, transfer_future,
+                etag_calculator
             )
         )
-        for i in range(num_parts):
-            # Calculate the range parameter
-            range_parameter = calculate_range_parameter(
-                part_size, i, num_parts)
-
-            # Inject the Range parameter to the parameters to be passed in
-            # as extra args
-            extra_args = {'Range': range_parameter}
-            extra_args.update(call_args.extra_args)
-            finalize_download_invoker.increment()
-            # Submit the ranged downloads
+        get_object_kwargs = {
+            'client': client,
+            'bucket': call_args.bucket,
+            'key': call_args.key,
+            'fileobj': fileobj,
+            'callbacks': progress_callbacks,
+            'max_attempts': config.num_download_attempts,
+            'download_output_manager': download_output_manager,
+            'io_chunksize': config.io_chunksize,
+            'bandwidth_limiter': bandwidth_limiter,
+            'buffer_pool': buffer_pool,
+            'part_size_planner': part_size_planner,
+            'window_planner': window_planner,
+            'etag_calculator': etag_calculator,
+            'hash_executor': hash_executor
+        }
+        submit_range = functools.partial(
+            self._submit_ranged_get_object_task, request_executor,
+            get_object_tag, get_object_kwargs, get_object_args,
+            first_response, finalize_download_invoker)
+        # The output manager decides when each range is submitted.
+        download_output_manager.submit_ranges(
+            fileobj, ranges, submit_range,
+            finalize_download_invoker.finalize)
+
+    def _submit_ranged_get_object_task(self, request_executor,
+                                       get_object_tag, get_object_kwargs,
+                                       get_object_args, first_response,
+                                       finalize_download_invoker,
+                                       start_index, range_parameter,
+                                       done_callbacks=None):
+        # Inject the Range parameter to the parameters to be passed in
+        # as extra args
+        extra_args = {'Range': range_parameter}
+        extra_args.update(get_object_args)
+        main_kwargs = dict(get_object_kwargs)
+        main_kwargs.update({
+            'extra_args': extra_args,
+            'start_index': start_index,
+            # Only the first range may have already been requested.
+            'response': first_response if start_index == 0 else None,
+        })
+        finalize_download_invoker.increment()
+        try:
+            # Submit the ranged download
             self._transfer_coordinator.submit(
                 request_executor,
                 GetObjectTask(
                     transfer_coordinator=self._transfer_coordinator,
-                    main_kwargs={
-                        'client': client,
-                        'bucket': call_args.bucket,
-                        'key': call_args.key,
-                        'fileobj': fileobj,
-                        'extra_args': extra_args,
-                        'callbacks': progress_callbacks,
-                        'max_attempts': config.num_download_attempts,
-                        'start_index': i * part_size,
-                        'download_output_manager': download_output_manager,
-                        'io_chunksize': config.io_chunksize,
-                        'bandwidth_limiter': bandwidth_limiter
-                    },
-                    done_callbacks=[finalize_download_invoker.decrement]
+                    main_kwargs=main_kwargs,
+                    done_callbacks=(done_callbacks or []) + [
+                        finalize_download_invoker.decrement]
                 ),
                 tag=get_object_tag
             )
-        finalize_download_invoker.finalize()
+        except Exception:
+            # The download was never submitted, so it will never be done.
+            finalize_download_invoker.decrement()
+            raise
+
+    def _get_ranges_to_download(self, size, part_size, downloaded_ranges):
+        # Returns a list of (start_index, range_parameter) tuples.
+        if not downloaded_ranges:
+            num_parts = int(math.ceil(size / float(part_size)))
+            return [
+                (i * part_size,
+                 calculate_range_parameter(part_size, i, num_parts))
+                for i in range(num_parts)
+            ]
+        # Split up each of the gaps between the downloaded ranges.
+        ranges = []
+        position = 0
+        for start, end in downloaded_ranges + [(size, size)]:
+            while position < start:
+                range_end = min(position + part_size, start)
+                ranges.append(
+                    (position, 'bytes=%s-%s' % (position, range_end - 1)))
+                position = range_end
+            position = max(position, end)
+        return ranges
 
     def _get_final_io_task_submission_callback(self, download_manager,
-                                               io_executor):
-        final_task = download_manager.get_final_io_task()
+                                               io_executor,
+                                               transfer_future=None,
+                                               etag_calculator=None):
+        final_task = self._get_final_io_task(
+            download_manager, transfer_future, etag_calculator)
         return FunctionContainer(
             self._transfer_coordinator.submit, io_executor, final_task)
 
+    def _get_final_io_task(self, download_manager, transfer_future,
+                           etag_calculator):
+        final_task = download_manager.get_final_io_task()
+        if etag_calculator is None:
+            return final_task
+        # The download is verified before the final task runs, which only
+        # completes the download if the verification succeeded.
+        return IOVerifyDownloadTask(
+            transfer_coordinator=self._transfer_coordinator,
+            main_kwargs={
+                'etag_calculator': etag_calculator,
+                'expected_etag': transfer_future.meta.etag,
+                'transfer_meta': transfer_future.meta,
+                'final_task': final_task
+            }
+        )
+
     def _calculate_range_param(self, part_size, part_index, num_parts):
         # Used to calculate the Range parameter
         start_range = part_index * part_size
@@ -496,7 +1701,9 @@ class DownloadSubmissionTask(SubmissionTask):
 class GetObjectTask(Task):
     def _main(self, client, bucket, key, fileobj, extra_args, callbacks,
               max_attempts, download_output_manager, io_chunksize,
-              start_index=0, bandwidth_limiter=None):
+              start_index=0, bandwidth_limiter=None, buffer_pool=None,
+              part_size_planner=None, response=None, etag_calculator=None,
+              window_planner=None, hash_executor=None):
         """Downloads an object and places content into io queue
 
         :param client: The client to use when calling GetObject
@@ -514,12 +1721,50 @@ class GetObjectTask(Task):
             content of the key to.
         :param bandwidth_limiter: The bandwidth limiter to use when throttling
             the downloading of data in streams.
+        :param buffer_pool: The pool of buffers to read the download stream
+            into. If not provided, a new chunk is allocated for each read.
+        :param part_size_planner: The planner to record the throughput of
+            the download with, if any.
+        :param response: A GetObject response that was already received
+            for the request. If provided, its body is streamed instead of
+            making the first GetObject request.
+        :param etag_calculator: The ETagCalculator to provide the
+            downloaded content to, if the download is verified.
+        :param window_planner: The planner to record the duration of the
+            request with, if any.
+        :param hash_executor: The executor to hash the downloaded content
+            on. If not provided, the content is hashed as it is downloaded.
         """
         last_exception = None
+        current_index = start_index
+        get_object_args = extra_args
+        etag = None
         for i in range(max_attempts):
             try:
-                response = client.get_object(
-                    Bucket=bucket, Key=key, **extra_args)
+                start_time = time.time()
+                attempt_start_index = current_index
+                resuming = get_object_args is not extra_args
+                if resuming and self._is_range_exhausted(get_object_args):
+                    # Everything was already downloaded before the retry
+                    # so there is nothing left to resume.
+                    download_output_manager.record_downloaded_range(
+                        start_index, current_index)
+                    return
+                if response is None or i > 0:
+                    try:
+                        response = client.get_object(
+                            Bucket=bucket, Key=key, **get_object_args)
+                    except ClientError as e:
+                        if not resuming or \
+                                not self._is_invalid_range_error(e):
+                            raise
+                        # The resumed range starts at the end of the
+                        # object, so everything was already downloaded.
+                        download_output_manager.record_downloaded_range(
+                            start_index, current_index)
+                        return
+                if etag is None:
+                    etag = response.get('ETag')
                 streaming_body = StreamReaderProgress(
                     response['Body'], callbacks)
                 if bandwidth_limiter:
@@ -527,36 +1772,162 @@ class GetObjectTask(Task):
                         bandwidth_limiter.get_bandwith_limited_stream(
                             streaming_body, self._transfer_coordinator)
 
-                current_index = start_index
-                chunks = DownloadChunkIterator(streaming_body, io_chunksize)
+                direct_buffer = \
+                    download_output_manager.get_buffer_for_direct_writes(
+                        fileobj, current_index)
+                use_buffer_pool = \
+                    direct_buffer is None and buffer_pool is not None
+                chunks = self._get_chunks(
+                    response, streaming_body, direct_buffer, buffer_pool,
+                    io_chunksize)
                 for chunk in chunks:
+                    done_callbacks = []
+                    if use_buffer_pool:
+                        # Return the buffer to the pool once its chunk
+                        # has been written.
+                        buffer, chunk = chunk
+                        done_callbacks.append(
+                            FunctionContainer(buffer_pool.release, buffer))
                     # If the transfer is done because of a cancellation
                     # or error somewhere else, stop trying to submit more
                     # data to be written and break out of the download.
                     if not self._transfer_coordinator.done():
-                        self._handle_io(
-                            download_output_manager, fileobj, chunk,
-                            current_index
-                        )
+                        # The chunk is hashed, or queued to be hashed,
+                        # before it is handed off as a pooled buffer can be
+                        # reused once it is written. Both run the done
+                        # callbacks themselves if they fail, so the buffer
+                        # still makes it back to the pool.
+                        if etag_calculator is not None:
+                            done_callbacks = self._hash_chunk(
+                                etag_calculator, hash_executor, chunk,
+                                current_index, done_callbacks)
+                        # Chunks read into a direct buffer are already
+                        # written to their final location.
+                        if direct_buffer is None:
+                            self._handle_io(
+                                download_output_manager, fileobj, chunk,
+                                current_index, done_callbacks
+                            )
                         current_index += len(chunk)
                     else:
+                        for done_callback in done_callbacks:
+                            done_callback()
                         return
+                if part_size_planner is not None:
+                    part_size_planner.record_throughput(
+                        current_index - attempt_start_index,
+                        time.time() - start_time)
+                if window_planner is not None:
+                    window_planner.record_request(
+                        current_index - attempt_start_index,
+                        time.time() - start_time)
+                download_output_manager.record_downloaded_range(
+                    start_index, current_index)
                 return
             except S3_RETRYABLE_ERRORS as e:
                 logger.debug("Retrying exception caught (%s), "
                              "retrying request, (attempt %s / %s)", e, i,
                              max_attempts, exc_info=True)
                 last_exception = e
+                resume_args = self._get_resume_args(
+                    extra_args, etag, start_index, current_index)
+                if resume_args is not None:
+                    # Only request the rest of the range, keeping what
+                    # was already downloaded.
+                    get_object_args = resume_args
+                    continue
                 # Also invoke the progress callbacks to indicate that we
                 # are trying to download the stream again and all progress
                 # for this GetObject has been lost.
                 invoke_progress_callbacks(
                     callbacks, start_index - current_index)
+                current_index = start_index
                 continue
         raise RetriesExceededError(last_exception)
 
-    def _handle_io(self, download_output_manager, fileobj, chunk, index):
-        download_output_manager.queue_file_io_task(fileobj, chunk, index)
+    def _get_chunks(self, response, streaming_body, direct_buffer,
+                    buffer_pool, io_chunksize):
+        if direct_buffer is not None:
+            return DownloadBufferChunkIterator(
+                streaming_body, direct_buffer, io_chunksize)
+        if buffer_pool is not None:
+            return PooledDownloadChunkIterator(streaming_body, buffer_pool)
+        return DownloadChunkIterator(streaming_body, io_chunksize)
+
+    def _get_resume_args(self, extra_args, etag, start_index, current_index):
+        # The If-Match makes sure the rest of the range comes from the same
+        # version of the object as what was already downloaded.
+        if etag is None:
+            return None
+        range_start, range_end = '0', ''
+        if 'Range' in extra_args:
+            range_start, range_end = \
+                extra_args['Range'][len('bytes='):].split('-', 1)
+        if not range_start:
+            # Suffix ranges cannot be resumed from an offset.
+            return None
+        resume_start = int(range_start) + current_index - start_index
+        resume_args = dict(extra_args)
+        resume_args['Range'] = 'bytes=%s-%s' % (resume_start, range_end)
+        resume_args['IfMatch'] = etag
+        return resume_args
+
+    def _is_range_exhausted(self, get_object_args):
+        range_start, range_end = \
+            get_object_args['Range'][len('bytes='):].split('-', 1)
+        return bool(range_end) and int(range_start) > int(range_end)
+
+    def _is_invalid_range_error(self, error):
+        return error.response.get('Error', {}).get('Code') == 'InvalidRange'
+
+    def _hash_chunk(self, etag_calculator, hash_executor, chunk, index,
+                    done_callbacks):
+        # Returns the callbacks to run once the chunk is written. If the
+        # chunk cannot be hashed, the callbacks are ran before raising so
+        # that a pooled buffer is not lost.
+        if hash_executor is None:
+            try:
+                etag_calculator.update(index, chunk)
+            except Exception:
+                self._run_callbacks(done_callbacks)
+                raise
+            return done_callbacks
+        # A pooled buffer can only be reused once its chunk is both hashed
+        # and written.
+        done_invoker = CountCallbackInvoker(
+            FunctionContainer(self._run_callbacks, done_callbacks))
+        try:
+            done_invoker.increment()
+            try:
+                self._transfer_coordinator.submit(
+                    hash_executor,
+                    IOHashTask(
+                        transfer_coordinator=self._transfer_coordinator,
+                        main_kwargs={
+                            'etag_calculator': etag_calculator,
+                            'data': chunk,
+                            'offset': index
+                        },
+                        done_callbacks=[done_invoker.decrement]
+                    )
+                )
+            except Exception:
+                # The hash task will never run to release its hold.
+                done_invoker.decrement()
+                raise
+            done_invoker.increment()
+        finally:
+            done_invoker.finalize()
+        return [done_invoker.decrement]
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            callback()
+
+    def _handle_io(self, download_output_manager, fileobj, chunk, index,
+                   done_callbacks=None):
+        download_output_manager.queue_file_io_task(
+            fileobj, chunk, index, done_callbacks)
 
 
 class ImmediatelyWriteIOGetObjectTask(GetObjectTask):
@@ -565,10 +1936,54 @@ class ImmediatelyWriteIOGetObjectTask(GetObjectTask):
     This is useful for downloads where it is known only one thread is
     downloading the object so there is no reason to go through the
     overhead of using an IO queue and executor.
+
+    If the output manager can write data right away, the stream is read
+    into a single buffer that is written out after every read, instead
+    of creating a chunk and an IO write task for every read.
     """
-    def _handle_io(self, download_output_manager, fileobj, chunk, index):
-        task = download_output_manager.get_io_write_task(fileobj, chunk, index)
-        task()
+    def _main(self, download_output_manager, fileobj, io_chunksize,
+              buffer_pool=None, **kwargs):
+        self._write = download_output_manager.get_writer_for_immediate_writes(
+            fileobj)
+        if self._write is not None:
+            # The data is written before the next read, so the same buffer
+            # is reused for every read instead of pooled buffers.
+            buffer_pool = None
+        return super(ImmediatelyWriteIOGetObjectTask, self)._main(
+            download_output_manager=download_output_manager,
+            fileobj=fileobj, io_chunksize=io_chunksize,
+            buffer_pool=buffer_pool, **kwargs)
+
+    def _get_chunks(self, response, streaming_body, direct_buffer,
+                    buffer_pool, io_chunksize):
+        if self._write is None or direct_buffer is not None:
+            return super(ImmediatelyWriteIOGetObjectTask, self)._get_chunks(
+                response, streaming_body, direct_buffer, buffer_pool,
+                io_chunksize)
+        # There is no need for a buffer larger than the response.
+        buffer_size = io_chunksize
+        content_length = response.get('ContentLength')
+        if content_length is not None:
+            buffer_size = max(min(content_length, buffer_size), 1)
+        return ReusedBufferChunkIterator(
+            streaming_body, bytearray(buffer_size))
+
+    def _handle_io(self, download_output_manager, fileobj, chunk, index,
+                   done_callbacks=None):
+        if self._write is None:
+            task = download_output_manager.get_io_write_task(
+                fileobj, chunk, index, done_callbacks)
+            task()
+            return
+        try:
+            self._write(chunk, index)
+        except Exception as e:
+            # Like a failed IO write task, a failed write fails the
+            # transfer instead of being retried as a failed download.
+            self._log_and_set_exception(e)
+        finally:
+            for done_callback in done_callbacks or []:
+                done_callback()
 
 
 class IOWriteTask(Task):
@@ -583,10 +1998,131 @@ class IOWriteTask(Task):
         fileobj.write(data)
 
 
+class IOPositionalWriteTask(IOWriteTask):
+    """Task for writing data to an offset without relying on file position
+
+    Because no shared file position is involved, these tasks can be ran
+    concurrently against the same file.
+    """
+    def _main(self, fileobj, data, offset, osutil=None):
+        """Write data to an offset in a fileobj
+
+        :param fileobj: The fileobj to write content to. It must provide
+            a ``pwrite(data, offset)`` method.
+        :param data: The data to write
+        :param offset: The offset to write the data to.
+        :param osutil: If provided, the OSUtils used to release the page
+            cache of the data once it is written.
+        """
+        fileobj.pwrite(data, offset)
+        if osutil is not None:
+            osutil.release_written_pages(fileobj, offset, len(data))
+
+
+class IOBufferWriteTask(IOWriteTask):
+    """Task for writing data to an offset in a writable buffer"""
+    def _main(self, fileobj, data, offset):
+        """Copy data into a buffer at an offset
+
+        :param fileobj: The memoryview of the buffer to write content to
+        :param data: The data to write
+        :param offset: The offset to write the data to.
+        """
+        fileobj[offset:offset + len(data)] = data
+
+
+class IOCoalescedWriteTask(Task):
+    """Task for writing all of the pending writes for a file
+
+    Pending writes that are adjacent to each other are written with a
+    single vectored write.
+    """
+    def _main(self, fileobj, write_queue, osutil=None):
+        """Write all pending writes in a write queue to a fileobj
+
+        :param fileobj: The fileobj to write content to. It must provide
+            a ``pwritev(buffers, offset)`` method.
+        :param write_queue: The CoalescingWriteQueue holding the writes
+        :param osutil: If provided, the OSUtils used to release the page
+            cache of the data once it is written.
+        """
+        writes = write_queue.request_writes()
+        try:
+            for write in writes:
+                fileobj.pwritev(write['data'], write['offset'])
+                if osutil is not None:
+                    osutil.release_written_pages(
+                        fileobj, write['offset'],
+                        sum(len(data) for data in write['data']))
+        finally:
+            for write in writes:
+                for done_callback in write['done_callbacks']:
+                    done_callback()
+
+
+class IOTeeWriteTask(Task):
+    """Task for writing the same data to each target of a download"""
+
+    def _main(self, write_tasks):
+        """
+        :param write_tasks: The io write task of each target
+        """
+        for write_task in write_tasks:
+            write_task()
+
+
+class CompleteTeeDownloadTask(Task):
+    """Task to complete a download to several targets
+
+    The final task of every target is ran in order and then the download
+    is completed. Note that the default for is_final is set to True because
+    this should always be the last task.
+    """
+    def __init__(self, transfer_coordinator, main_kwargs=None,
+                 pending_main_kwargs=None, done_callbacks=None,
+                 is_final=True):
+        super(CompleteTeeDownloadTask, self).__init__(
+            transfer_coordinator=transfer_coordinator,
+            main_kwargs=main_kwargs,
+            pending_main_kwargs=pending_main_kwargs,
+            done_callbacks=done_callbacks,
+            is_final=is_final
+        )
+
+    def _main(self, final_tasks):
+        """
+        :param final_tasks: The final io task of each target
+        """
+        for final_task in final_tasks:
+            final_task()
+        # A failed task only records its exception on the transfer, so it
+        # needs to be raised to keep the transfer from being completed.
+        if self._transfer_coordinator.exception is not None:
+            raise self._transfer_coordinator.exception
+
+
+class DownloadStreamWriteTask(Task):
+    """Task for handing downloaded data to a DownloadStream"""
+
+    def _main(self, stream, data, offset, done_invoker=None):
+        """
+        :param stream: The DownloadStream to hand the data to
+        :param data: The data downloaded
+        :param offset: The offset in the object that the data starts at
+        :param done_invoker: The CountCallbackInvoker to hold on to for as
+            long as the stream needs the data, if any.
+        """
+        done_callbacks = None
+        if done_invoker is not None:
+            done_invoker.increment()
+            done_callbacks = [done_invoker.decrement]
+        stream.queue_write(offset, data, done_callbacks)
+
+
 class IOStreamingWriteTask(Task):
     """Task for writing data to a non-seekable stream."""
 
-    def _main(self, fileobj, data):
+    def _main(self, fileobj, data, window_planner=None):
         """Write data to a fileobj.
 
         Data will be written directly to the fileboj without
@@ -594,9 +2130,68 @@ class IOStreamingWriteTask(Task):
 
         :param fileobj: The fileobj to write content to
         :param data: The data to write
+        :param window_planner: The planner to record how fast the fileobj
+            is written to with, if any.
 
         """
+        start_time = time.time()
         fileobj.write(data)
+        if window_planner is not None:
+            window_planner.record_drain(len(data), time.time() - start_time)
+
+
+class IOHashTask(Task):
+    """Task for hashing downloaded content to verify a download with"""
+
+    def _main(self, etag_calculator, data, offset):
+        """
+        :param etag_calculator: The ETagCalculator to provide the content to
+        :param data: The downloaded content
+        :param offset: The offset of the content in the object
+        """
+        etag_calculator.update(offset, data)
+
+
+class IOVerifyDownloadTask(Task):
+    """Task for verifying the content of a download against its ETag
+
+    The final task of the download is ran once the download is verified,
+    which only completes the download if the verification succeeded. Note
+    that the default for is_final is set to True because this should
+    always be the last task.
+    """
+    def __init__(self, transfer_coordinator, main_kwargs=None,
+                 pending_main_kwargs=None, done_callbacks=None,
+                 is_final=True):
+        super(IOVerifyDownloadTask, self).__init__(
+            transfer_coordinator=transfer_coordinator,
+            main_kwargs=main_kwargs,
+            pending_main_kwargs=pending_main_kwargs,
+            done_callbacks=done_callbacks,
+            is_final=is_final
+        )
+
+    def _main(self, etag_calculator, expected_etag, transfer_meta,
+              final_task):
+        """
+        :param etag_calculator: The ETagCalculator that was provided all of
+            the downloaded content
+        :param expected_etag: The ETag of the object
+        :param transfer_meta: The TransferMeta of the download to provide
+            the calculated ETag to
+        :param final_task: The final io task of the download
+        """
+        digest = etag_calculator.get_etag()
+        transfer_meta.provide_digest(digest)
+        if digest != expected_etag.strip('"'):
+            self._transfer_coordinator.set_exception(DownloadIntegrityError(
+                'Downloaded content has an ETag of %s but the ETag of the '
+                'object is %s.' % (digest, expected_etag)))
+        final_task()
+        # A failed task only records its exception on the transfer, so it
+        # needs to be raised to keep the transfer from being completed.
+        if self._transfer_coordinator.exception is not None:
+            raise self._transfer_coordinator.exception
 
 
 class IORenameFileTask(Task):
@@ -612,6 +2207,29 @@ class IORenameFileTask(Task):
         osutil.rename_file(fileobj.name, final_filename)
 
 
+class IOCompleteResumableDownloadTask(IORenameFileTask):
+    """A task to rename the temporary file of a resumable download
+
+    Once the file is renamed, the journal of the download is removed as
+    there is nothing left to resume.
+
+    :param journal: The DownloadJournal of the download
+    """
+    def _main(self, fileobj, final_filename, osutil, journal):
+        super(IOCompleteResumableDownloadTask, self)._main(
+            fileobj, final_filename, osutil)
+        journal.remove()
+
+
+class IOSaveDownloadJournalTask(Task):
+    """A task to save the journal of a resumable download
+
+    :param journal: The DownloadJournal to save
+    """
+    def _main(self, journal):
+        journal.save()
+
+
 class IOCloseTask(Task):
     """A task to close out a file once the download is complete.
 
@@ -672,6 +2290,199 @@ class DownloadChunkIterator(object):
     next = __next__
 
 
+class DownloadBufferChunkIterator(object):
+    def __init__(self, body, buffer, chunksize):
+        """Iterator to read a downloaded S3 stream directly into a buffer
+
+        Each iteration reads the next chunk of the stream into the next
+        unfilled portion of the buffer and returns a view of what was read.
+        If the stream still has data once the buffer is full, a
+        DownloadIntegrityError is raised instead of dropping the data.
+
+        :param body: A readable file-like object
+        :param buffer: A writable bytes-like object to read the stream into
+        :param chunksize: The maximum amount to read each time
+        """
+        self._body = body
+        self._buffer = memoryview(buffer)
+        self._chunksize = chunksize
+        self._position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._position >= len(self._buffer):
+            self._check_body_exhausted()
+            raise StopIteration()
+        chunk = self._buffer[self._position:self._position + self._chunksize]
+        amount_read = readinto(self._body, chunk)
+        if not amount_read:
+            raise StopIteration()
+        self._position += amount_read
+        return chunk[:amount_read]
+
+    next = __next__
+
+    def _check_body_exhausted(self):
+        # The buffer is sized to the content expected, so more content
+        # means the object changed while it was being downloaded.
+        if self._body.read(1):
+            raise DownloadIntegrityError(
+                'Downloaded content is larger than the %s bytes expected.'
+                % len(self._buffer))
+
+
+class ReusedBufferChunkIterator(object):
+    def __init__(self, body, buffer):
+        """Iterator to read a downloaded S3 stream into a reused buffer
+
+        Each iteration reads the next chunk of the stream into the start
+        of the buffer and returns a view of what was read, so each chunk
+        must no longer be needed by the time the next one is read.
+
+        :param body: A readable file-like object
+        :param buffer: A writable bytes-like object to read the stream into
+        """
+        self._body = body
+        self._buffer = memoryview(buffer)
+        self._num_reads = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        amount_read = readinto(self._body, self._buffer)
+        self._num_reads += 1
+        if amount_read or self._num_reads == 1:
+            # Like DownloadChunkIterator, an empty chunk is returned for
+            # the initial read to account for empty objects.
+            return self._buffer[:amount_read]
+        raise StopIteration()
+
+    next = __next__
+
+
+class PooledDownloadChunkIterator(object):
+    def __init__(self, body, buffer_pool):
+        """Iterator to chunk out a downloaded S3 stream into pooled buffers
+
+        Each chunk is read directly into a buffer acquired from the pool.
+        Each iteration returns a tuple of the buffer and a memoryview of the
+        data read into it. The buffer must be released back to the pool
+        once the chunk is no longer needed.
+
+        :param body: A readable file-like object
+        :param buffer_pool: The s3transfer.utils.BufferPool to read into
+        """
+        self._body = body
+        self._buffer_pool = buffer_pool
+        self._num_reads = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        buffer = self._buffer_pool.acquire()
+        try:
+            amount_read = self._fill(buffer)
+        except Exception:
+            self._buffer_pool.release(buffer)
+            raise
+        self._num_reads += 1
+        if amount_read or self._num_reads == 1:
+            # Like DownloadChunkIterator, an empty chunk is returned for
+            # the initial read to account for empty objects.
+            return buffer, memoryview(buffer)[:amount_read]
+        self._buffer_pool.release(buffer)
+        raise StopIteration()
+
+    next = __next__
+
+    def _fill(self, buffer):
+        # Keep reading until the buffer is full so that each chunk is
+        # as large as possible even if the stream returns short reads.
+        view = memoryview(buffer)
+        amount_read = 0
+        while amount_read < len(view):
+            amount = readinto(self._body, view[amount_read:])
+            if not amount:
+                break
+            amount_read += amount
+        return amount_read
+
+
+class CoalescingWriteQueue(object):
+    """IO queue that groups adjacent pending writes together.
+
+    This class is used to track IO data for a *single* fileobj.
+
+    Writes are held until they are requested, at which point all of the
+    pending writes are sorted and any writes that are adjacent to each
+    other are grouped so they can be written with a single vectored write.
+    """
+    def __init__(self, max_write_size):
+        """
+        :param max_write_size: The maximum combined size of the data in a
+            group of writes. A single write larger than this is never
+            split up.
+        """
+        self._max_write_size = max_write_size
+        self._writes = []
+        self._lock = threading.Lock()
+
+    def queue_write(self, offset, data, done_callbacks=None):
+        """Queue data to be written
+
+        :param offset: The offset to write the data to
+        :param data: The data to write
+        :param done_callbacks: A list of callbacks to call once the data
+            has been written or discarded
+        """
+        with self._lock:
+            self._writes.append((offset, data, done_callbacks or []))
+
+    def request_writes(self):
+        """Request all of the pending writes
+
+        :returns: A list of dictionaries, each representing a group of
+            adjacent writes, with the keys ``offset`` (where to start
+            writing), ``data`` (a list of the data to write one after
+            another) and ``done_callbacks`` (callbacks to call once the
+            group has been written).
+        """
+        with self._lock:
+            pending_writes = self._writes
+            self._writes = []
+        pending_writes.sort(key=lambda write: write[0])
+        writes = []
+        current = None
+        for offset, data, done_callbacks in pending_writes:
+            if current is None or \
+                    offset != current['offset'] + current['size'] or \
+                    current['size'] + len(data) > self._max_write_size:
+                current = {
+                    'offset': offset, 'size': 0, 'data': [],
+                    'done_callbacks': []
+                }
+                writes.append(current)
+            current['data'].append(data)
+            current['size'] += len(data)
+            current['done_callbacks'].extend(done_callbacks)
+        for write in writes:
+            del write['size']
+        return writes
+
+    def discard_writes(self):
+        """Discard all pending writes and call their done callbacks"""
+        with self._lock:
+            pending_writes = self._writes
+            self._writes = []
+        for _, _, done_callbacks in pending_writes:
+            for done_callback in done_callbacks:
+                done_callback()
+
+
 class DeferQueue(object):
     """IO queue that defers write requests until they are queued sequentially.
 
@@ -680,11 +2491,37 @@ class DeferQueue(object):
     You can send data to this queue, and it will defer any IO write requests
     until it has the next contiguous block available (starting at 0).
 
+    Deferred data can optionally be spilled to a temporary file once the
+    amount of it held in memory passes a threshold. Spilled data is read
+    back once it can be written.
+
     """
-    def __init__(self):
+    def __init__(self, max_in_memory_size=None, spill_file_factory=None):
+        """
+        :param max_in_memory_size: The maximum number of bytes of deferred
+            data to hold in memory. Any other deferred data is spilled to
+            a temporary file. If not provided, all deferred data is held
+            in memory.
+        :param spill_file_factory: A callable that returns the file-like
+            object to spill deferred data to. It is called whenever data
+            first needs to be spilled. Defaults to creating an anonymous
+            temporary file.
+        """
         self._writes = []
         self._pending_offsets = set()
         self._next_offset = 0
+        self._max_in_memory_size = max_in_memory_size
+        self._in_memory_size = 0
+        if spill_file_factory is None:
+            spill_file_factory = tempfile.TemporaryFile
+        self._spill_file_factory = spill_file_factory
+        self._spill_file = None
+        self._num_spilled = 0
+
+    @property
+    def next_offset(self):
+        """The offset of the data that can be written next"""
+        return self._next_offset
 
     def request_writes(self, offset, data):
         """Request any available writes given new incoming data.
@@ -711,11 +2548,486 @@ class DeferQueue(object):
             # a duplicate.  In this case we should ignore
             # this request and prefer what's already queued.
             return []
-        heapq.heappush(self._writes, (offset, data))
-        self._pending_offsets.add(offset)
+        if offset == self._next_offset:
+            writes.append({'offset': offset, 'data': data})
+            self._next_offset += len(data)
+        else:
+            # The data has to wait for the data before it.
+            data, spill_location = self._defer(data)
+            heapq.heappush(self._writes, (offset, data, spill_location))
+            self._pending_offsets.add(offset)
         while self._writes and self._writes[0][0] == self._next_offset:
-            next_write = heapq.heappop(self._writes)
-            writes.append({'offset': next_write[0], 'data': next_write[1]})
-            self._pending_offsets.remove(next_write[0])
-            self._next_offset += len(next_write[1])
+            offset, data, spill_location = heapq.heappop(self._writes)
+            data = self._undefer(data, spill_location)
+            writes.append({'offset': offset, 'data': data})
+            self._pending_offsets.remove(offset)
+            self._next_offset += len(data)
         return writes
+
+    def close(self):
+        """Discard any data spilled to the temporary file"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _defer(self, data):
+        # Returns the data to keep in memory and where it was spilled to
+        # if it was spilled.
+        if self._max_in_memory_size is None or \
+                self._in_memory_size + len(data) <= self._max_in_memory_size:
+            self._in_memory_size += len(data)
+            return data, None
+        if self._spill_file is None:
+            self._spill_file = self._spill_file_factory()
+        self._spill_file.seek(0, 2)
+        position = self._spill_file.tell()
+        self._spill_file.write(data)
+        self._num_spilled += 1
+        return None, (position, len(data))
+
+    def _undefer(self, data, spill_location):
+        if spill_location is None:
+            self._in_memory_size -= len(data)
+            return data
+        position, size = spill_location
+        self._spill_file.seek(position)
+        data = self._spill_file.read(size)
+        self._num_spilled -= 1
+        if not self._num_spilled:
+            # Nothing is left in the temporary file so it can be closed
+            # instead of growing with each spilled write.
+            self.close()
+        return data
+
+
+class DownloadJournal(object):
+    """Journal of the byte ranges of a download that have been written
+
+    The journal is stored as a small JSON document next to the temporary
+    file of a resumable download. It includes an identity of the object
+    being downloaded so that the temporary file is only ever reused for
+    the same version of the same object.
+    """
+    def __init__(self, filename, identity, osutil, downloaded_ranges=None):
+        """
+        :param filename: The name of the file to store the journal in
+        :param identity: A JSON serializable dictionary identifying the
+            object being downloaded (e.g. its bucket, key and ETag)
+        :param osutil: The os utility to use to store the journal
+        :param downloaded_ranges: A list of (start, end) tuples, where end
+            is exclusive, of the ranges that have already been written
+        """
+        self._filename = filename
+        self._identity = identity
+        self._osutil = osutil
+        self._downloaded_ranges = []
+        self._lock = threading.Lock()
+        for start, end in downloaded_ranges or []:
+            self._add_range(start, end)
+
+    @classmethod
+    def load(cls, filename, identity, osutil):
+        """Load the journal stored for an object
+
+        :returns: The stored journal or None if there is no journal or
+            the journal was stored for a different object
+        """
+        try:
+            with osutil.open(filename, 'r') as f:
+                contents = json.load(f)
+            if contents['identity'] != identity:
+                return None
+            downloaded_ranges = [
+                (int(start), int(end))
+                for start, end in contents['downloaded_ranges']
+            ]
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            logger.debug(
+                'Unable to load download journal %s', filename, exc_info=True)
+            return None
+        return cls(filename, identity, osutil, downloaded_ranges)
+
+    @property
+    def downloaded_ranges(self):
+        """A sorted list of the (start, end) ranges that have been written"""
+        with self._lock:
+            return list(self._downloaded_ranges)
+
+    def add_range(self, start, end):
+        """Record that a range has been written
+
+        The range is not stored until the journal is saved.
+        """
+        with self._lock:
+            self._add_range(start, end)
+
+    def save(self):
+        """Store the journal"""
+        with self._lock:
+            contents = {
+                'identity': self._identity,
+                'downloaded_ranges': [
+                    list(r) for r in self._downloaded_ranges],
+            }
+            # Write to a temporary file first so the journal is replaced
+            # atomically and is never left partially written.
+            temp_filename = \
+                self._filename + os.extsep + random_file_extension()
+            with self._osutil.open(temp_filename, 'w') as f:
+                json.dump(contents, f)
+            self._osutil.rename_file(temp_filename, self._filename)
+
+    def remove(self):
+        """Remove the stored journal"""
+        self._osutil.remove_file(self._filename)
+
+    def _add_range(self, start, end):
+        if start >= end:
+            return
+        merged_ranges = []
+        for current in sorted(self._downloaded_ranges + [(start, end)]):
+            if merged_ranges and current[0] <= merged_ranges[-1][1]:
+                merged_ranges[-1] = (
+                    merged_ranges[-1][0], max(merged_ranges[-1][1], current[1])
+                )
+            else:
+                merged_ranges.append(current)
+        self._downloaded_ranges = merged_ranges
+
+
+class JournaledFile(object):
+    """Wraps a file to record every positional write in a DownloadJournal
+
+    A range is only recorded once it has actually been written, so the
+    journal never claims content that is missing from the file.
+    """
+    def __init__(self, fileobj, journal):
+        """
+        :param fileobj: The file to write to. It must provide the
+            ``pwrite()`` and ``pwritev()`` methods.
+        :param journal: The DownloadJournal to record the writes in
+        """
+        self._fileobj = fileobj
+        self._journal = journal
+
+    @property
+    def name(self):
+        return self._fileobj.name
+
+    def pwrite(self, data, offset):
+        self._fileobj.pwrite(data, offset)
+        self._journal.add_range(offset, offset + len(data))
+
+    def pwritev(self, buffers, offset):
+        self._fileobj.pwritev(buffers, offset)
+        self._journal.add_range(
+            offset, offset + sum(len(buffer) for buffer in buffers))
+
+    def fileno(self):
+        return self._fileobj.fileno()
+
+    def close(self):
+        self._fileobj.close()
+
+
+class DownloadStreamRangeSubmitter(object):
+    def __init__(self, stream, transfer_coordinator, ranges, submit_range,
+                 finalize):
+        """Submits the ranged downloads of a stream as its window moves
+
+        A range is only submitted once it starts within the readahead
+        window of the stream. Submitting never waits on the stream, so it
+        is done from whichever thread moved the window, usually the one
+        reading the stream.
+
+        :type stream: DownloadStream
+        :param stream: The stream being downloaded to
+
+        :type transfer_coordinator: s3transfer.futures.TransferCoordinator
+        :param transfer_coordinator: The coordinator of the download
+
+        :param ranges: A list of (start_index, range_parameter) tuples of
+            the ranges to download, in order of the object
+
+        :param submit_range: A function that submits the download of a
+            range. It takes the start index and range parameter of the
+            range and a list of callbacks to call once it is done.
+
+        :param finalize: A function to call once every range that will be
+            downloaded has been submitted
+        """
+        self._stream = stream
+        self._transfer_coordinator = transfer_coordinator
+        self._pending_ranges = collections.deque(ranges)
+        self._submit_range = submit_range
+        self._finalize = finalize
+        self._num_submitting = 0
+        self._finalized = False
+        self._lock = threading.Lock()
+
+    def submit(self):
+        """Submit the pending ranges that are within the readahead window
+
+        Once the transfer is done, the rest of the ranges are dropped
+        instead, as their data would never be read.
+        """
+        while True:
+            with self._lock:
+                if self._transfer_coordinator.done():
+                    self._pending_ranges.clear()
+                if not self._pending_ranges or \
+                        not self._stream.is_in_readahead_window(
+                            self._pending_ranges[0][0]):
+                    break
+                start_index, range_parameter = \
+                    self._pending_ranges.popleft()
+                self._num_submitting += 1
+            try:
+                self._submit_range(
+                    start_index, range_parameter, [self._submit_if_done])
+            except Exception as e:
+                # Whichever thread moved the window is not the one that
+                # owns the transfer, so the failure is set on the transfer.
+                logger.debug(
+                    'Exception raised submitting range %s.', range_parameter,
+                    exc_info=True)
+                self._transfer_coordinator.set_exception(e)
+            finally:
+                with self._lock:
+                    self._num_submitting -= 1
+        self._finalize_if_all_submitted()
+
+    def _submit_if_done(self):
+        # If a download fails, the rest of the ranges are dropped right
+        # away instead of once the window moves, which may never happen.
+        # While the transfer is not done, nothing is submitted from here
+        # so that the request threads never wait to submit more requests.
+        if self._transfer_coordinator.done():
+            self.submit()
+
+    def _finalize_if_all_submitted(self):
+        with self._lock:
+            if self._finalized or self._pending_ranges or \
+                    self._num_submitting:
+                return
+            self._finalized = True
+        self._finalize()
+
+
+class DownloadStream(object):
+    """A readable stream of the content of an object being downloaded
+
+    Downloaded data is reordered so that it can be read sequentially while
+    the object is downloaded with ranged requests in parallel. To bound
+    memory usage, ranged requests are only made for data that starts
+    within ``max_readahead_size`` bytes of what has been read so far. The
+    requests for the rest of the data are made as it is read.
+
+    Closing the stream before all of the data is read cancels the
+    download.
+    """
+    def __init__(self, max_readahead_size):
+        """
+        :param max_readahead_size: The maximum number of bytes past what
+            has been read that requested data may start at.
+        """
+        self._max_readahead_size = max_readahead_size
+        self._defer_queue = DeferQueue()
+        self._chunks = collections.deque()
+        self._read_position = 0
+        self._finished = False
+        self._exception = None
+        self._closed = False
+        self._future = None
+        self._window_callbacks = []
+        self._condition = threading.Condition()
+
+    @property
+    def future(self):
+        """The TransferFuture of the download"""
+        return self._future
+
+    def set_future(self, future):
+        """Associates the stream with the future of its download"""
+        self._future = future
+
+    def readable(self):
+        return True
+
+    def is_in_readahead_window(self, offset):
+        """Whether data at an offset is within the readahead window
+
+        :param offset: The offset in the object that the data starts at
+        """
+        with self._condition:
+            return self._read_position + self._max_readahead_size > offset
+
+    def add_window_callback(self, callback):
+        """Add a callback to call whenever the readahead window moves
+
+        The callback is called with no arguments from the thread reading
+        the stream every time data is read, and when the stream is closed.
+        It must not wait on the stream.
+        """
+        with self._condition:
+            self._window_callbacks.append(callback)
+
+    def queue_write(self, offset, data, done_callbacks=None):
+        """Queue downloaded data to be read
+
+        :param offset: The offset in the object that the data starts at
+        :param data: The data downloaded
+        :param done_callbacks: A list of callbacks to call once the data is
+            no longer needed. Data that can be read next is held until it
+            is read, while any other data is copied so that the callbacks
+            can be called right away.
+        """
+        done_callbacks = done_callbacks or []
+        with self._condition:
+            if not self._closed:
+                chunk_done_callbacks = []
+                if offset == self._defer_queue.next_offset:
+                    chunk_done_callbacks = done_callbacks
+                    done_callbacks = []
+                elif done_callbacks:
+                    # Data that has to wait for the data before it is
+                    # copied so the buffer it came from is not held by the
+                    # stream while downloads may need it to make progress.
+                    data = memoryview(data).tobytes()
+                writes = self._defer_queue.request_writes(offset, data)
+                for write in writes:
+                    self._chunks.append((write['data'], chunk_done_callbacks))
+                    chunk_done_callbacks = []
+                self._condition.notify_all()
+        # The data was either copied or will never be read.
+        self._run_callbacks(done_callbacks)
+
+    def finish(self):
+        """Indicate that all of the data has been queued"""
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+
+    def set_exception(self, exception):
+        """Indicate that the download failed
+
+        Any data queued before the failure can still be read. Reading
+        past it raises the exception.
+        """
+        with self._condition:
+            self._exception = exception
+            self._condition.notify_all()
+
+    def read(self, amount=None):
+        """Read data from the stream
+
+        This blocks until the amount requested is available or the end of
+        the stream is reached.
+
+        :param amount: The maximum amount of data to read. If not provided
+            or negative, the rest of the stream is read.
+        """
+        if amount is not None and amount < 0:
+            amount = None
+        chunks = []
+        done_callbacks = []
+        amount_read = 0
+        try:
+            while amount is None or amount_read < amount:
+                remaining = None
+                if amount is not None:
+                    remaining = amount - amount_read
+                chunk, chunk_done_callbacks = self._read_chunk(remaining)
+                done_callbacks.extend(chunk_done_callbacks)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                amount_read += len(chunk)
+            # Joining copies the data out of any buffers it was held in.
+            return b''.join(chunks)
+        finally:
+            self._run_callbacks(done_callbacks)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Return data as soon as any of it is available.
+        chunk, done_callbacks = self._read_chunk()
+        try:
+            if not chunk:
+                raise StopIteration()
+            return bytes(chunk)
+        finally:
+            self._run_callbacks(done_callbacks)
+
+    next = __next__
+
+    def close(self):
+        """Close the stream, cancelling the download if not already done"""
+        with self._condition:
+            self._closed = True
+            chunks = list(self._chunks)
+            self._chunks.clear()
+            self._condition.notify_all()
+        for _, done_callbacks in chunks:
+            self._run_callbacks(done_callbacks)
+        if self._future is not None and not self._future.done():
+            self._future.cancel()
+        self._run_window_callbacks()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def _read_chunk(self, amount=None):
+        with self._condition:
+            while not (self._chunks or self._finished or
+                       self._exception is not None or self._closed):
+                self._condition.wait()
+            if self._closed:
+                raise ValueError('I/O operation on closed stream.')
+            if not self._chunks:
+                if self._exception is not None:
+                    raise self._exception
+                return b'', []
+            chunk, done_callbacks = self._chunks.popleft()
+            if amount is not None and len(chunk) > amount:
+                # The rest of the chunk is in the same buffer, so the
+                # buffer is only done with once the rest is read.
+                self._chunks.appendleft((chunk[amount:], done_callbacks))
+                chunk, done_callbacks = chunk[:amount], []
+            self._read_position += len(chunk)
+        # Reading moved the readahead window, so more data may now be
+        # requested.
+        self._run_window_callbacks()
+        return chunk, done_callbacks
+
+    def _run_window_callbacks(self):
+        with self._condition:
+            window_callbacks = list(self._window_callbacks)
+        self._run_callbacks(window_callbacks)
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            callback()
+
+
+class DownloadStreamSubscriber(BaseSubscriber):
+    """Subscriber that lets a DownloadStream know when its download is done
+    """
+    def __init__(self, stream):
+        """
+        :param stream: The DownloadStream being downloaded to
+        """
+        self._stream = stream
+
+    def on_done(self, future, **kwargs):
+        try:
+            future.result()
+        except Exception as e:
+            self._stream.set_exception(e)
+        else:
+            self._stream.finish()
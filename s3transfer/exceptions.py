@@ -23,6 +23,10 @@ class S3UploadFailedError(Exception):
     pass
 
 
+class DownloadIntegrityError(Exception):
+    pass
+
+
 class InvalidSubscriberMethodError(Exception):
     pass
 
@@ -11,6 +11,7 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 from concurrent import futures
+from collections import deque
 from collections import namedtuple
 import copy
 import logging
@@ -94,6 +95,8 @@ class TransferMeta(object):
         self._call_args = call_args
         self._transfer_id = transfer_id
         self._size = None
+        self._etag = None
+        self._digest = None
         self._user_context = {}
 
     @property
@@ -111,6 +114,20 @@ class TransferMeta(object):
         """The size of the transfer request if known"""
         return self._size
 
+    @property
+    def etag(self):
+        """The ETag of the object being transferred if known"""
+        return self._etag
+
+    @property
+    def digest(self):
+        """The ETag calculated from the content of a verified download
+
+        This is None unless the download was verified, which happens once
+        all of its content is downloaded.
+        """
+        return self._digest
+
     @property
     def user_context(self):
         """A dictionary that requesters can store data in"""
@@ -125,22 +142,37 @@ class TransferMeta(object):
         """
         self._size = size
 
+    def provide_object_etag(self, etag):
+        """A method to provide the ETag of the object being transferred
+
+        This is used to make sure that a transfer only ever uses content
+        from a single version of an object.
+        """
+        self._etag = etag
+
+    def provide_digest(self, digest):
+        """A method to provide the ETag calculated from downloaded content"""
+        self._digest = digest
+
 
 class TransferCoordinator(object):
     """A helper class for managing TransferFuture"""
-    def __init__(self, transfer_id=None):
+    def __init__(self, transfer_id=None, priority=0):
         self.transfer_id = transfer_id
+        self.priority = priority
         self._status = 'not-started'
         self._result = None
         self._exception = None
         self._associated_futures = set()
         self._failure_cleanups = []
         self._done_callbacks = []
+        self._cancel_callbacks = []
         self._done_event = threading.Event()
         self._lock = threading.Lock()
         self._associated_futures_lock = threading.Lock()
         self._done_callbacks_lock = threading.Lock()
         self._failure_cleanups_lock = threading.Lock()
+        self._cancel_callbacks_lock = threading.Lock()
 
     def __repr__(self):
         return '%s(transfer_id=%s)' % (
@@ -239,6 +271,7 @@ class TransferCoordinator(object):
         :param msg: The message to attach to the cancellation
         :param exc_type: The type of exception to set for the cancellation
         """
+        should_run_cancel_callbacks = False
         with self._lock:
             if not self.done():
                 should_announce_done = False
@@ -249,6 +282,12 @@ class TransferCoordinator(object):
                 self._status = 'cancelled'
                 if should_announce_done:
                     self.announce_done()
+                else:
+                    should_run_cancel_callbacks = True
+        # The callbacks are ran outside of the lock as they may check on
+        # or wait for the state of the transfer.
+        if should_run_cancel_callbacks:
+            self._run_cancel_callbacks()
 
     def set_status_to_queued(self):
         """Sets the TransferFutrue's status to running"""
@@ -266,7 +305,7 @@ class TransferCoordinator(object):
                     'state %s.' % (self.status, desired_state))
             self._status = desired_state
 
-    def submit(self, executor, task, tag=None):
+    def submit(self, executor, task, tag=None, block=True):
         """Submits a task to a provided executor
 
         :type executor: s3transfer.futures.BoundedExecutor
@@ -278,6 +317,11 @@ class TransferCoordinator(object):
         :type tag: s3transfer.futures.TaskTag
         :param tag: A tag to associate to the submitted task
 
+        :type block: boolean
+        :param block: True if to wait till it is possible to submit the
+            task. False, if not to wait and raise NoResourcesAvailable if
+            the task cannot be submitted right away.
+
         :rtype: concurrent.futures.Future
         :returns: A future representing the submitted task
         """
@@ -285,7 +329,7 @@ class TransferCoordinator(object):
             "Submitting task %s to executor %s for transfer request: %s." % (
                 task, executor, self.transfer_id)
         )
-        future = executor.submit(task, tag=tag)
+        future = executor.submit(task, tag=tag, block=block)
         # Add this created future to the list of associated future just
         # in case it is needed during cleanups.
         self.add_associated_future(future)
@@ -324,6 +368,17 @@ class TransferCoordinator(object):
             self._failure_cleanups.append(
                 FunctionContainer(function, *args, **kwargs))
 
+    def add_cancel_callback(self, function, *args, **kwargs):
+        """Add a callback to be invoked if the transfer is cancelled
+
+        The callback is invoked when an in-progress transfer is cancelled.
+        This lets work that is not waiting on any task, such as requests
+        that are only made once a consumer reads, know to stop.
+        """
+        with self._cancel_callbacks_lock:
+            self._cancel_callbacks.append(
+                FunctionContainer(function, *args, **kwargs))
+
     def announce_done(self):
         """Announce that future is done running and run associated callbacks
 
@@ -334,6 +389,9 @@ class TransferCoordinator(object):
         """
         if self.status != 'success':
             self._run_failure_cleanups()
+        with self._cancel_callbacks_lock:
+            # The transfer can no longer be cancelled.
+            self._cancel_callbacks = []
         self._done_event.set()
         self._run_done_callbacks()
 
@@ -345,6 +403,12 @@ class TransferCoordinator(object):
             self._run_callbacks(self._done_callbacks)
             self._done_callbacks = []
 
+    def _run_cancel_callbacks(self):
+        with self._cancel_callbacks_lock:
+            cancel_callbacks = self._cancel_callbacks
+            self._cancel_callbacks = []
+        self._run_callbacks(cancel_callbacks)
+
     def _run_failure_cleanups(self):
         # Run the cleanup callbacks and remove the callbacks from the internal
         # list so they do not get ran again if done is announced more than
@@ -432,7 +496,8 @@ class BoundedExecutor(object):
         release_callback = FunctionContainer(
             semaphore.release, task.transfer_id, acquire_token)
         # Submit the task to the underlying executor.
-        future = ExecutorFuture(self._executor.submit(task))
+        executor = self._get_executor_for_task(task)
+        future = ExecutorFuture(executor.submit(task))
         # Add the Semaphore.release() callback to the future such that
         # it is invoked once the future completes.
         future.add_done_callback(release_callback)
@@ -441,6 +506,159 @@ class BoundedExecutor(object):
     def shutdown(self, wait=True):
         self._executor.shutdown(wait)
 
+    def _get_executor_for_task(self, task):
+        return self._executor
+
+
+class ShardedBoundedExecutor(BoundedExecutor):
+    def __init__(self, max_size, max_num_shards, tag_semaphores=None,
+                 executor_cls=None):
+        """A bounded executor that partitions tasks into ordered shards
+
+        Each shard is backed by its own single threaded executor and all of
+        the tasks associated to a transfer are always submitted to the same
+        shard. This means that tasks for a single transfer are ran in the
+        order they were submitted, while tasks for different transfers can
+        run in parallel on different shards.
+
+        :params max_size: The maximum number of inflight futures across
+            all of the shards.
+
+        :params max_num_shards: The number of shards to use. Each shard
+            uses a single thread.
+
+        :type tag_semaphores: dict
+        :params tag_semaphores: A dictionary where the key is the name of the
+            tag and the value is the semaphore to use when limiting the
+            number of tasks the executor is processing at a time.
+
+        :type executor_cls: BaseExecutor
+        :param executor_cls: The executor class to use for each shard. If
+            None is provided, the concurrent.futures.ThreadPoolExecutor class
+            is used.
+        """
+        self._max_num_threads = max_num_shards
+        if executor_cls is None:
+            executor_cls = self.EXECUTOR_CLS
+        self._shards = [
+            executor_cls(max_workers=1) for _ in range(max_num_shards)
+        ]
+        self._schedulers = [
+            PrioritizedTaskScheduler(shard) for shard in self._shards
+        ]
+        self._semaphore = TaskSemaphore(max_size)
+        self._tag_semaphores = tag_semaphores
+
+    def shutdown(self, wait=True):
+        for shard in self._shards:
+            shard.shutdown(wait)
+
+    def _get_executor_for_task(self, task):
+        return self._schedulers[hash(task.transfer_id) % len(self._shards)]
+
+
+class PrioritizedTaskScheduler(object):
+    # The number of tasks that can be ran ahead of a transfer with pending
+    # tasks before the priority of that transfer is raised by one.
+    AGING_INTERVAL = 16
+
+    def __init__(self, executor, aging_interval=None):
+        """Runs tasks submitted to a single threaded executor by priority
+
+        Tasks of the same transfer are always ran in the order they were
+        submitted, but which transfer gets to run its next task is picked
+        in the following order:
+
+            * Transfers whose next task is their final task, as it is
+              usually cheap and is all that is left to complete them.
+            * Transfers with a higher priority
+            * Transfers that have gone the longest without running a task
+
+        So transfers of the same priority take turns instead of being ran
+        in the order their tasks were submitted. The priority of a transfer
+        is raised by one for every ``aging_interval`` tasks that are ran
+        while it waits, so lower priority transfers are never starved.
+
+        :type executor: BaseExecutor
+        :param executor: The single threaded executor to run the tasks on.
+
+        :type aging_interval: int
+        :param aging_interval: The number of tasks that can be ran while
+            a transfer waits before its priority is raised by one.
+        """
+        self._executor = executor
+        self._aging_interval = aging_interval
+        if aging_interval is None:
+            self._aging_interval = self.AGING_INTERVAL
+        self._pending = {}
+        self._last_run = {}
+        self._num_run = 0
+        self._lock = threading.Lock()
+
+    def submit(self, task):
+        """Submit a task to be ran
+
+        :type task: s3transfer.tasks.Task
+        :param task: The task to run
+
+        :rtype: concurrent.futures.Future
+        :returns: The future associated to the submitted task
+        """
+        future = futures.Future()
+        entry = (task, future)
+        with self._lock:
+            transfer_id = task.transfer_id
+            if transfer_id not in self._pending:
+                self._pending[transfer_id] = deque()
+                self._last_run[transfer_id] = self._num_run
+            self._pending[transfer_id].append(entry)
+        try:
+            # Every submission hands the executor one call to run the next
+            # task, which is not necessarily the task that was just
+            # submitted.
+            self._executor.submit(self._run_next_task)
+        except Exception:
+            with self._lock:
+                self._remove_entry(transfer_id, entry)
+            raise
+        return future
+
+    def _run_next_task(self):
+        with self._lock:
+            task, future = self._pop_next_entry()
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = task()
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def _pop_next_entry(self):
+        transfer_id = max(self._pending, key=self._get_sort_key)
+        pending = self._pending[transfer_id]
+        entry = pending.popleft()
+        self._num_run += 1
+        self._last_run[transfer_id] = self._num_run
+        if not pending:
+            del self._pending[transfer_id]
+            del self._last_run[transfer_id]
+        return entry
+
+    def _get_sort_key(self, transfer_id):
+        task = self._pending[transfer_id][0][0]
+        last_run = self._last_run[transfer_id]
+        age = (self._num_run - last_run) // self._aging_interval
+        return task.is_final, task.priority + age, -last_run
+
+    def _remove_entry(self, transfer_id, entry):
+        pending = self._pending[transfer_id]
+        pending.remove(entry)
+        if not pending:
+            del self._pending[transfer_id]
+            del self._last_run[transfer_id]
+
 
 class ExecutorFuture(object):
     def __init__(self, future):
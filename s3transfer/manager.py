@@ -23,14 +23,22 @@ from s3transfer.utils import CallArgs
 from s3transfer.utils import OSUtils
 from s3transfer.utils import TaskSemaphore
 from s3transfer.utils import SlidingWindowSemaphore
+from s3transfer.utils import DownloadWindowPlanner
+from s3transfer.utils import BufferPool
+from s3transfer.utils import DownloadPartSizePlanner
+from s3transfer.utils import UploadPartSizePlanner
 from s3transfer.exceptions import CancelledError
 from s3transfer.exceptions import FatalError
 from s3transfer.futures import IN_MEMORY_DOWNLOAD_TAG
 from s3transfer.futures import IN_MEMORY_UPLOAD_TAG
 from s3transfer.futures import BoundedExecutor
+from s3transfer.futures import ShardedBoundedExecutor
 from s3transfer.futures import TransferFuture
 from s3transfer.futures import TransferMeta
 from s3transfer.futures import TransferCoordinator
+from s3transfer.download import DownloadBufferOutputManager
+from s3transfer.download import DownloadStream
+from s3transfer.download import DownloadStreamSubscriber
 from s3transfer.download import DownloadSubmissionTask
 from s3transfer.upload import UploadSubmissionTask
 from s3transfer.copies import CopySubmissionTask
@@ -56,7 +64,21 @@ class TransferConfig(object):
                  num_download_attempts=5,
                  max_in_memory_upload_chunks=10,
                  max_in_memory_download_chunks=10,
-                 max_bandwidth=None):
+                 max_bandwidth=None,
+                 max_io_concurrency=1,
+                 use_mmap_downloads=False,
+                 download_buffer_pool_size=None,
+                 max_coalesced_write_size=None,
+                 adaptive_download_part_size=False,
+                 resumable_downloads=False,
+                 skip_download_head_object=False,
+                 max_in_memory_deferred_download_size=None,
+                 max_download_range_gap_size=1 * MB,
+                 verify_downloads=False,
+                 adaptive_download_window=False,
+                 max_in_memory_upload_readahead_size=None,
+                 adaptive_multipart_chunksize=False,
+                 resumable_uploads=False):
         """Configurations for the transfer mangager
 
         :param multipart_threshold: The threshold for which multipart
@@ -117,7 +139,9 @@ class TransferConfig(object):
             for each thread pulling data off of a file-like object, they may
             be waiting with a single read chunk to be submitted for upload
             because the ``max_in_memory_upload_chunks`` value has been reached
-            by the threads making the upload request.
+            by the threads making the upload request. Chunks read from
+            file-like objects that cannot seek are read into a pool of
+            reusable buffers bounded by this footprint.
 
         :param max_in_memory_download_chunks: The number of chunks that can
             be buffered in memory and **not** in the io queue at a time for all
@@ -130,6 +154,138 @@ class TransferConfig(object):
         :param max_bandwidth: The maximum bandwidth that will be consumed
             in uploading and downloading file content. The value is in terms of
             bytes per second.
+
+        :param max_io_concurrency: The maximum number of threads writing
+            downloaded content to its destination. Writes for a single
+            download are always handled by the same thread so they remain
+            ordered, but writes for different downloads may happen in
+            parallel when this value is greater than one.
+
+        :param use_mmap_downloads: If True, multipart downloads to a
+            filename preallocate the temporary file and map it into memory.
+            Each ranged download then reads its content directly into the
+            file instead of queueing chunks to be written by the io threads.
+            Downloads of byte ranges are not memory mapped.
+
+        :param download_buffer_pool_size: The number of ``io_chunksize``
+            buffers that downloaded streams are read into. If set, the
+            buffers are reused once their content has been written instead
+            of allocating new memory for every read, and the total memory
+            footprint of downloaded chunks waiting to be written is bounded
+            by roughly:
+
+                download_buffer_pool_size * io_chunksize
+
+            If not set, no pooling of buffers is done.
+
+        :param max_coalesced_write_size: The maximum size in bytes of a
+            single write of downloaded content. If set, downloaded chunks
+            that are adjacent to each other and waiting to be written are
+            combined into a single write of up to this size. If not set,
+            each chunk is written separately.
+
+        :param adaptive_download_part_size: If True, the size of each ranged
+            request of a multipart download is picked based on the size of
+            the object, ``max_request_concurrency`` and the throughput
+            observed for previous requests instead of using
+            ``multipart_chunksize``. Objects are split into roughly four
+            parts per concurrent request.
+
+        :param resumable_downloads: If True, multipart downloads to a
+            filename write to a temporary file named after the filename
+            with a ``.s3download`` extension, along with a journal of the
+            ranges that have been written to it. If the download fails,
+            both are kept so that downloading the same version of the
+            object to the same filename again only downloads the missing
+            ranges. The ETag of the object is used to make sure that the
+            object has not changed.
+
+        :param skip_download_head_object: If True, downloads of an object
+            of unknown size do not make a HeadObject request to determine
+            its size. Instead, the first ``multipart_chunksize`` bytes of
+            the object are requested right away and the size is learned
+            from that response. If the object fits in that first range,
+            the download needs no other request. Otherwise, the rest of
+            the object is downloaded with ranged requests. This does not
+            apply to resumable downloads, which still use HeadObject.
+
+        :param max_in_memory_deferred_download_size: The maximum number of
+            bytes of downloaded content that a download to a non-seekable
+            stream holds in memory while waiting for the content before it
+            to be downloaded. Any other content waiting to be written is
+            spilled to a temporary file and read back once it can be
+            written. If not set, all of it is held in memory.
+
+        :param max_download_range_gap_size: The largest number of bytes
+            between two byte ranges of the same download that are still
+            requested together. The bytes in between are downloaded and
+            thrown away, which is usually cheaper than another request for
+            ranges that are close together. If not set, only ranges that
+            overlap or are adjacent are requested together.
+
+        :param verify_downloads: If True, the content of a download is
+            hashed as it is downloaded and the download fails if the hash
+            does not match the ETag of the object. The calculated ETag is
+            provided as ``future.meta.digest``. Downloads of byte ranges,
+            downloads that resume from a previous attempt, and objects
+            whose ETag is not an MD5 of their content (e.g. objects
+            encrypted with KMS or a customer provided key) are not
+            verified. Ranged downloads of objects uploaded in parts only
+            request whole parts, so each part is hashed as it is downloaded.
+            Otherwise, content downloaded out of order is hashed on the io
+            executor once the content before it is downloaded. Content
+            waiting to be hashed is held in memory up to
+            ``max_in_memory_deferred_download_size`` bytes, or
+            ``max_io_queue_size`` io chunks if that is not set, and is
+            spilled to a temporary file after that.
+
+        :param adaptive_download_window: If True, the number of chunks
+            that can be buffered in memory for downloads to file-like
+            objects that cannot be seeked is adjusted as downloads happen
+            instead of being fixed at ``max_in_memory_download_chunks``.
+            Enough chunks are requested ahead to cover the rate that
+            content is written to the file-like objects during the time it
+            takes to download a chunk, so a slow consumer holds fewer
+            chunks in memory and a fast one waits less on requests. The
+            chunks buffered in memory never add up to more than:
+
+                max_in_memory_download_chunks * multipart_chunksize
+
+        :param max_in_memory_upload_readahead_size: The maximum number of
+            bytes of parts that an upload from a file-like object reads
+            ahead while it waits for the ``max_in_memory_upload_chunks``
+            parts already in memory to be uploaded. This keeps reading from
+            the file-like object and sending parts happening at the same
+            time, so a fast non-seekable stream can keep all of the
+            request threads busy. At least one part is always read ahead
+            if this is set. If not set, a part is only read once there is
+            room for it to be uploaded.
+
+        :param adaptive_multipart_chunksize: If True, the size of each part
+            of a multipart upload or copy is picked based on the size of
+            the object and ``max_request_concurrency`` instead of using
+            ``multipart_chunksize``. Objects are split into roughly four
+            parts per concurrent request, with parts of at least 5 MiB and
+            at most 256 MiB unless larger parts are needed to stay within
+            10,000 parts. Uploads of file-like objects hold whole parts in
+            memory, so larger parts use more memory. Uploads from streams
+            of unknown size still use ``multipart_chunksize``.
+
+        :param resumable_uploads: If True, multipart uploads of filenames
+            keep a journal of the multipart upload and the parts that have
+            been uploaded next to the file, named after the filename with
+            a ``.s3upload.journal`` extension. If the upload fails, the
+            multipart upload is not aborted, so uploading the same file to
+            the same key again only uploads the parts that are missing.
+            The parts are checked against the multipart upload with
+            ListParts before any of them are skipped. The size and
+            modification time of the file are used to make sure that the
+            file has not changed, and the upload is only resumed with the
+            same ``extra_args`` it was started with. Multipart uploads that
+            are never resumed
+            are kept, and billed for, until they are aborted, so it is
+            recommended to configure a lifecycle rule to abort incomplete
+            multipart uploads on the bucket.
         """
         self.multipart_threshold = multipart_threshold
         self.multipart_chunksize = multipart_chunksize
@@ -143,10 +299,29 @@ class TransferConfig(object):
         self.max_in_memory_upload_chunks = max_in_memory_upload_chunks
         self.max_in_memory_download_chunks = max_in_memory_download_chunks
         self.max_bandwidth = max_bandwidth
+        self.max_io_concurrency = max_io_concurrency
+        self.use_mmap_downloads = use_mmap_downloads
+        self.download_buffer_pool_size = download_buffer_pool_size
+        self.max_coalesced_write_size = max_coalesced_write_size
+        self.adaptive_download_part_size = adaptive_download_part_size
+        self.resumable_downloads = resumable_downloads
+        self.skip_download_head_object = skip_download_head_object
+        self.max_in_memory_deferred_download_size = \
+            max_in_memory_deferred_download_size
+        self.max_download_range_gap_size = max_download_range_gap_size
+        self.verify_downloads = verify_downloads
+        self.adaptive_download_window = adaptive_download_window
+        self.max_in_memory_upload_readahead_size = \
+            max_in_memory_upload_readahead_size
+        self.adaptive_multipart_chunksize = adaptive_multipart_chunksize
+        self.resumable_uploads = resumable_uploads
         self._validate_attrs_are_nonzero()
 
     def _validate_attrs_are_nonzero(self):
         for attr, attr_val, in self.__dict__.items():
+            # Flags that toggle behavior are allowed to be False.
+            if isinstance(attr_val, bool):
+                continue
             if attr_val is not None and attr_val <= 0:
                 raise ValueError(
                     'Provided parameter %s of value %s must be greater than '
@@ -222,6 +397,8 @@ class TransferManager(object):
         if osutil is None:
             self._osutil = OSUtils()
         self._coordinator_controller = TransferCoordinatorController()
+        self._download_window_semaphore = SlidingWindowSemaphore(
+            self._config.max_in_memory_download_chunks)
         # A counter to create unique id's for each transfer submitted.
         self._id_counter = 0
 
@@ -232,8 +409,7 @@ class TransferManager(object):
             tag_semaphores={
                 IN_MEMORY_UPLOAD_TAG: TaskSemaphore(
                     self._config.max_in_memory_upload_chunks),
-                IN_MEMORY_DOWNLOAD_TAG: SlidingWindowSemaphore(
-                    self._config.max_in_memory_download_chunks)
+                IN_MEMORY_DOWNLOAD_TAG: self._download_window_semaphore
             },
             executor_cls=executor_cls
         )
@@ -247,11 +423,14 @@ class TransferManager(object):
 
         )
 
-        # There is one thread available for writing to disk. It will handle
-        # downloads for all files.
-        self._io_executor = BoundedExecutor(
+        # The executor responsible for writing downloaded content. All of
+        # the writes for a single download are handled by the same thread,
+        # but writes for different downloads can be spread out across
+        # max_io_concurrency threads. Downloads sharing a thread have their
+        # writes ran by priority rather than in the order they were queued.
+        self._io_executor = ShardedBoundedExecutor(
             max_size=self._config.max_io_queue_size,
-            max_num_threads=1,
+            max_num_shards=self._config.max_io_concurrency,
             executor_cls=executor_cls
         )
 
@@ -264,15 +443,73 @@ class TransferManager(object):
             leaky_bucket = LeakyBucket(self._config.max_bandwidth)
             self._bandwidth_limiter = BandwidthLimiter(leaky_bucket)
 
+        # The pool of buffers that downloaded content is read into if it is
+        # configured.
+        self._download_buffer_pool = None
+        if self._config.download_buffer_pool_size is not None:
+            self._download_buffer_pool = BufferPool(
+                buffer_size=self._config.io_chunksize,
+                max_buffers=self._config.download_buffer_pool_size
+            )
+
+        # The pool of buffers that parts of uploads from non-seekable
+        # file-like objects are read into. It holds as many parts as can be
+        # in memory at a time: the parts waiting to be uploaded plus the
+        # parts each submission thread may have read ahead.
+        readahead_parts = 1
+        if self._config.max_in_memory_upload_readahead_size is not None:
+            readahead_parts = max(
+                1,
+                self._config.max_in_memory_upload_readahead_size //
+                self._config.multipart_chunksize
+            )
+        self._upload_buffer_pool = BufferPool(
+            buffer_size=self._config.multipart_chunksize,
+            max_buffers=(
+                self._config.max_in_memory_upload_chunks +
+                self._config.max_submission_concurrency * readahead_parts
+            )
+        )
+
+        # The planner used to size ranged downloads if it is configured. It
+        # is shared across downloads so what is learned about request
+        # throughput carries over to later downloads.
+        self._download_part_size_planner = None
+        if self._config.adaptive_download_part_size:
+            self._download_part_size_planner = DownloadPartSizePlanner()
+
+        # The planner used to resize the window of chunks buffered in
+        # memory for downloads to non-seekable streams if it is configured.
+        self._download_window_planner = None
+        if self._config.adaptive_download_window:
+            self._download_window_planner = DownloadWindowPlanner(
+                self._download_window_semaphore,
+                max_size=(
+                    self._config.max_in_memory_download_chunks *
+                    self._config.multipart_chunksize
+                )
+            )
+
+        # The planner used to size the parts of multipart uploads and
+        # copies if it is configured.
+        self._upload_part_size_planner = None
+        if self._config.adaptive_multipart_chunksize:
+            self._upload_part_size_planner = UploadPartSizePlanner()
+
         self._register_handlers()
 
-    def upload(self, fileobj, bucket, key, extra_args=None, subscribers=None):
+    def upload(self, fileobj, bucket, key, extra_args=None, subscribers=None,
+               multipart_chunksize=None):
         """Uploads a file to S3
 
-        :type fileobj: str or seekable file-like object
-        :param fileobj: The name of a file to upload or a seekable file-like
-            object to upload. It is recommended to use a filename because
-            file-like objects may result in higher memory usage.
+        :type fileobj: str, file-like object or bytes-like object
+        :param fileobj: The name of a file to upload, a file-like object to
+            upload or a bytes-like object (e.g. bytes, bytearray or
+            memoryview) holding the content to upload. It is recommended to
+            use a filename or a bytes-like object because file-like objects
+            may result in higher memory usage. The parts of a bytes-like
+            object are uploaded straight from it without being copied, so
+            it must not be modified until the upload is done.
 
         :type bucket: str
         :param bucket: The name of the bucket to upload to
@@ -289,6 +526,12 @@ class TransferManager(object):
             order provided based on the event emit during the process of
             the transfer request.
 
+        :type multipart_chunksize: int
+        :param multipart_chunksize: The size of each part if the upload is
+            a multipart upload. If provided, this is used instead of the
+            part size from the transfer config. It is still adjusted to
+            fit within the limits of S3.
+
         :rtype: s3transfer.futures.TransferFuture
         :returns: Transfer future representing the upload
         """
@@ -297,18 +540,22 @@ class TransferManager(object):
         if subscribers is None:
             subscribers = []
         self._validate_all_known_args(extra_args, self.ALLOWED_UPLOAD_ARGS)
+        self._validate_multipart_chunksize(multipart_chunksize)
         call_args = CallArgs(
             fileobj=fileobj, bucket=bucket, key=key, extra_args=extra_args,
-            subscribers=subscribers
+            subscribers=subscribers, multipart_chunksize=multipart_chunksize
         )
-        extra_main_kwargs = {}
+        extra_main_kwargs = {'buffer_pool': self._upload_buffer_pool}
         if self._bandwidth_limiter:
             extra_main_kwargs['bandwidth_limiter'] = self._bandwidth_limiter
+        if self._upload_part_size_planner:
+            extra_main_kwargs['part_size_planner'] = \
+                self._upload_part_size_planner
         return self._submit_transfer(
             call_args, UploadSubmissionTask, extra_main_kwargs)
 
     def download(self, bucket, key, fileobj, extra_args=None,
-                 subscribers=None):
+                 subscribers=None, byte_range=None, priority=0):
         """Downloads a file from S3
 
         :type bucket: str
@@ -317,8 +564,84 @@ class TransferManager(object):
         :type key: str
         :param key: The name of the key to download from
 
-        :type fileobj: str
-        :param fileobj: The name of a file to download to.
+        :type fileobj: str, file-like object, writable bytes-like object
+            or list
+        :param fileobj: The name of a file to download to, a file-like
+            object to download to or a buffer to download into. See
+            ``download_into()`` for how buffers are downloaded into. A
+            list of filenames and file-like objects can also be provided
+            to download the object once and write its content to each of
+            them.
+
+        :type extra_args: dict
+        :param extra_args: Extra arguments that may be passed to the
+            client operation
+
+        :type subscribers: list(s3transfer.subscribers.BaseSubscriber)
+        :param subscribers: The list of subscribers to be invoked in the
+            order provided based on the event emit during the process of
+            the transfer request.
+
+        :type byte_range: tuple
+        :param byte_range: A ``(start, end)`` tuple of the byte range of the
+            object to download, where ``end`` is exclusive. An ``end`` of
+            None downloads up to the end of the object. If provided, only
+            this range is downloaded, with ranged requests in parallel if
+            it is above the multipart threshold, and it is written to the
+            start of ``fileobj``. Any part of the range past the end of
+            the object is ignored.
+
+        :type priority: int
+        :param priority: The priority of writing the downloaded content
+            compared to other downloads. Content of downloads with a higher
+            priority is written first, while downloads of the same priority
+            take turns. Downloads with a lower priority still make
+            progress, just more slowly.
+
+        :rtype: s3transfer.futures.TransferFuture
+        :returns: Transfer future representing the download
+        """
+        byte_ranges = None
+        if byte_range is not None:
+            start, end = byte_range
+            if start < 0 or (end is not None and end < start):
+                raise ValueError(
+                    'Invalid byte_range %s, it must be a (start, end) tuple '
+                    'with 0 <= start <= end.' % (byte_range,))
+            length = None
+            if end is not None:
+                length = end - start
+            byte_ranges = [(start, length)]
+        return self._download(
+            bucket, key, fileobj, extra_args, subscribers, byte_ranges,
+            priority)
+
+    def download_ranges(self, bucket, key, ranges, fileobj, extra_args=None,
+                        subscribers=None, priority=0):
+        """Downloads several byte ranges of a file from S3
+
+        The ranges are written to ``fileobj`` one after another in the
+        order they are provided. Ranges that overlap or are close to each
+        other (see ``max_download_range_gap_size``) are downloaded with the
+        same requests, and large ranges are split into ranged requests of
+        ``multipart_chunksize`` that are made in parallel.
+
+        :type bucket: str
+        :param bucket: The name of the bucket to download from
+
+        :type key: str
+        :param key: The name of the key to download from
+
+        :type ranges: list
+        :param ranges: A list of ``(offset, length)`` tuples of the byte
+            ranges of the object to download. Any part of a range past the
+            end of the object is ignored, so the content written for that
+            range is shorter than its length.
+
+        :type fileobj: str, file-like object, writable bytes-like object
+            or list
+        :param fileobj: Where to write the content of the ranges to. See
+            ``download()`` for what is supported.
 
         :type extra_args: dict
         :param extra_args: Extra arguments that may be passed to the
@@ -329,9 +652,24 @@ class TransferManager(object):
             order provided based on the event emit during the process of
             the transfer request.
 
+        :type priority: int
+        :param priority: The priority of writing the downloaded content
+            compared to other downloads. See ``download()``.
+
         :rtype: s3transfer.futures.TransferFuture
         :returns: Transfer future representing the download
         """
+        ranges = list(ranges)
+        for offset, length in ranges:
+            if offset < 0 or length < 0:
+                raise ValueError(
+                    'Invalid range (%s, %s), the offset and length must not '
+                    'be negative.' % (offset, length))
+        return self._download(
+            bucket, key, fileobj, extra_args, subscribers, ranges, priority)
+
+    def _download(self, bucket, key, fileobj, extra_args, subscribers,
+                  byte_ranges, priority=0):
         if extra_args is None:
             extra_args = {}
         if subscribers is None:
@@ -339,16 +677,115 @@ class TransferManager(object):
         self._validate_all_known_args(extra_args, self.ALLOWED_DOWNLOAD_ARGS)
         call_args = CallArgs(
             bucket=bucket, key=key, fileobj=fileobj, extra_args=extra_args,
-            subscribers=subscribers
+            subscribers=subscribers, byte_ranges=byte_ranges,
+            priority=priority
         )
         extra_main_kwargs = {'io_executor': self._io_executor}
         if self._bandwidth_limiter:
             extra_main_kwargs['bandwidth_limiter'] = self._bandwidth_limiter
+        if self._download_buffer_pool:
+            extra_main_kwargs['buffer_pool'] = self._download_buffer_pool
+        if self._download_part_size_planner:
+            extra_main_kwargs['part_size_planner'] = \
+                self._download_part_size_planner
+        if self._download_window_planner:
+            extra_main_kwargs['window_planner'] = \
+                self._download_window_planner
         return self._submit_transfer(
             call_args, DownloadSubmissionTask, extra_main_kwargs)
 
+    def download_into(self, bucket, key, buffer, extra_args=None,
+                      subscribers=None):
+        """Downloads a file from S3 directly into a buffer
+
+        Downloaded content is read straight into the buffer without going
+        through any intermediate file-like object or io thread.
+
+        :type bucket: str
+        :param bucket: The name of the bucket to download from
+
+        :type key: str
+        :param key: The name of the key to download from
+
+        :type buffer: bytearray or writable bytes-like object
+        :param buffer: The buffer to download into. The content of the
+            object is written to the start of the buffer. A bytearray that
+            is smaller than the object is grown to the size of the object,
+            so an empty bytearray can be provided to download the object
+            into memory. Any other buffer must be at least as large as the
+            object.
+
+        :type extra_args: dict
+        :param extra_args: Extra arguments that may be passed to the
+            client operation
+
+        :type subscribers: list(s3transfer.subscribers.BaseSubscriber)
+        :param subscribers: The list of subscribers to be invoked in the
+            order provided based on the event emit during the process of
+            the transfer request.
+
+        :rtype: s3transfer.futures.TransferFuture
+        :returns: Transfer future representing the download
+        """
+        if not DownloadBufferOutputManager.is_compatible(buffer, self._osutil):
+            raise ValueError(
+                'Buffer %s of type: %s is not a writable bytes-like '
+                'object.' % (buffer, type(buffer)))
+        return self.download(bucket, key, buffer, extra_args, subscribers)
+
+    def open_download_stream(self, bucket, key, extra_args=None,
+                             subscribers=None, max_readahead_size=None):
+        """Downloads a file from S3 as a readable stream
+
+        The object is downloaded in the background, with ranged requests
+        in parallel if it is above the multipart threshold, and its
+        content can be read from the returned stream in order.
+
+        :type bucket: str
+        :param bucket: The name of the bucket to download from
+
+        :type key: str
+        :param key: The name of the key to download from
+
+        :type extra_args: dict
+        :param extra_args: Extra arguments that may be passed to the
+            client operation
+
+        :type subscribers: list(s3transfer.subscribers.BaseSubscriber)
+        :param subscribers: The list of subscribers to be invoked in the
+            order provided based on the event emit during the process of
+            the transfer request.
+
+        :type max_readahead_size: int
+        :param max_readahead_size: The maximum number of bytes past what
+            has been read from the stream that ranged requests are made
+            for. This bounds the memory used to hold downloaded data that
+            has not been read yet to about this plus a part for each
+            request. Defaults to enough to keep
+            ``max_request_concurrency`` ranged requests of
+            ``multipart_chunksize`` going at once.
+
+        :rtype: s3transfer.download.DownloadStream
+        :returns: A stream to read the content of the object from. Its
+            ``future`` attribute is the transfer future representing the
+            download. Closing the stream cancels the download if it has
+            not completed.
+        """
+        if subscribers is None:
+            subscribers = []
+        if max_readahead_size is None:
+            max_readahead_size = (
+                self._config.multipart_chunksize *
+                self._config.max_request_concurrency)
+        stream = DownloadStream(max_readahead_size)
+        future = self.download(
+            bucket, key, stream, extra_args,
+            subscribers + [DownloadStreamSubscriber(stream)])
+        stream.set_future(future)
+        return stream
+
     def copy(self, copy_source, bucket, key, extra_args=None,
-             subscribers=None, source_client=None):
+             subscribers=None, source_client=None, multipart_chunksize=None):
         """Copies a file in S3
 
         :type copy_source: dict
@@ -380,6 +817,12 @@ class TransferManager(object):
             If no client is provided, the transfer manager's client is used
             as the client for the source object.
 
+        :type multipart_chunksize: int
+        :param multipart_chunksize: The size of each part if the copy is a
+            multipart copy. If provided, this is used instead of the part
+            size from the transfer config. It is still adjusted to fit
+            within the limits of S3.
+
         :rtype: s3transfer.futures.TransferFuture
         :returns: Transfer future representing the copy
         """
@@ -390,12 +833,19 @@ class TransferManager(object):
         if source_client is None:
             source_client = self._client
         self._validate_all_known_args(extra_args, self.ALLOWED_COPY_ARGS)
+        self._validate_multipart_chunksize(multipart_chunksize)
         call_args = CallArgs(
             copy_source=copy_source, bucket=bucket, key=key,
             extra_args=extra_args, subscribers=subscribers,
-            source_client=source_client
+            source_client=source_client,
+            multipart_chunksize=multipart_chunksize
         )
-        return self._submit_transfer(call_args, CopySubmissionTask)
+        extra_main_kwargs = {}
+        if self._upload_part_size_planner:
+            extra_main_kwargs['part_size_planner'] = \
+                self._upload_part_size_planner
+        return self._submit_transfer(
+            call_args, CopySubmissionTask, extra_main_kwargs)
 
     def delete(self, bucket, key, extra_args=None, subscribers=None):
         """Delete an S3 object.
@@ -438,6 +888,12 @@ class TransferManager(object):
                     "must be one of: %s" % (
                         kwarg, ', '.join(allowed)))
 
+    def _validate_multipart_chunksize(self, multipart_chunksize):
+        if multipart_chunksize is not None and multipart_chunksize <= 0:
+            raise ValueError(
+                'Provided multipart_chunksize of value %s must be greater '
+                'than 0.' % multipart_chunksize)
+
     def _submit_transfer(self, call_args, submission_task_cls,
                          extra_main_kwargs=None):
         if not extra_main_kwargs:
@@ -473,7 +929,10 @@ class TransferManager(object):
     def _get_future_with_components(self, call_args):
         transfer_id = self._id_counter
         # Creates a new transfer future along with its components
-        transfer_coordinator = TransferCoordinator(transfer_id=transfer_id)
+        transfer_coordinator = TransferCoordinator(
+            transfer_id=transfer_id,
+            priority=getattr(call_args, 'priority', 0)
+        )
         # Track the transfer coordinator for transfers to manage.
         self._coordinator_controller.add_transfer_coordinator(
             transfer_coordinator)
@@ -94,6 +94,16 @@ class Task(object):
         """The id for the transfer request that the task belongs to"""
         return self._transfer_coordinator.transfer_id
 
+    @property
+    def priority(self):
+        """The priority of the transfer request that the task belongs to"""
+        return self._transfer_coordinator.priority
+
+    @property
+    def is_final(self):
+        """Whether the task is the final task of its transfer request"""
+        return self._is_final
+
     def _get_kwargs_with_params_to_include(self, kwargs, include):
         filtered_kwargs = {}
         for param in include:
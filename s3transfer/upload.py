@@ -10,19 +10,37 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
+import functools
+import hashlib
+import json
+import logging
 import math
+import os
+import threading
+from collections import deque
 
 from botocore.compat import six
+from botocore.exceptions import ClientError
 
-from s3transfer.compat import seekable, readable
+from s3transfer.compat import seekable, readable, readinto
 from s3transfer.futures import IN_MEMORY_UPLOAD_TAG
 from s3transfer.tasks import Task
 from s3transfer.tasks import SubmissionTask
 from s3transfer.tasks import CreateMultipartUploadTask
 from s3transfer.tasks import CompleteMultipartUploadTask
+from s3transfer.utils import random_file_extension
 from s3transfer.utils import get_callbacks
 from s3transfer.utils import get_filtered_dict
 from s3transfer.utils import DeferredOpenFile, ChunksizeAdjuster
+from s3transfer.utils import SharedFile
+from s3transfer.utils import BufferReader
+from s3transfer.utils import FunctionContainer
+from s3transfer.utils import NoResourcesAvailable
+
+
+logger = logging.getLogger(__name__)
+
+RESUMABLE_UPLOAD_EXTENSION = 's3upload'
 
 
 class AggregatedProgressCallback(object):
@@ -116,10 +134,12 @@ class UploadInputManager(object):
     that may be accepted. All implementations must subclass and override
     public methods from this class.
     """
-    def __init__(self, osutil, transfer_coordinator, bandwidth_limiter=None):
+    def __init__(self, osutil, transfer_coordinator, bandwidth_limiter=None,
+                 buffer_pool=None):
         self._osutil = osutil
         self._transfer_coordinator = transfer_coordinator
         self._bandwidth_limiter = bandwidth_limiter
+        self._buffer_pool = buffer_pool
 
     @classmethod
     def is_compatible(cls, upload_source):
@@ -221,6 +241,33 @@ class UploadInputManager(object):
     def _get_close_callbacks(self, aggregated_progress_callbacks):
         return [callback.flush for callback in aggregated_progress_callbacks]
 
+    def _wrap_data(self, data, callbacks, close_callbacks,
+                   done_callbacks=None):
+        """
+        Wraps data with the interrupt reader and the file chunk reader.
+
+        :type data: bytes-like object
+        :param data: The data to wrap. It is not copied.
+
+        :type callbacks: list
+        :param callbacks: The callbacks associated with the transfer future.
+
+        :type close_callbacks: list
+        :param close_callbacks: The callbacks to be called when closing the
+            wrapper for the data.
+
+        :type done_callbacks: list
+        :param done_callbacks: The callbacks to call once the data is no
+            longer needed, which allows the buffer holding it to be reused.
+
+        :return: Fully wrapped data.
+        """
+        fileobj = self._wrap_fileobj(
+            BufferReader(data, close_callbacks=done_callbacks))
+        return self._osutil.open_file_chunk_reader_from_fileobj(
+            fileobj=fileobj, chunk_size=len(data), full_file_size=len(data),
+            callbacks=callbacks, close_callbacks=close_callbacks)
+
 
 class UploadFilenameInputManager(UploadInputManager):
     """Upload utility for filenames"""
@@ -261,6 +308,7 @@ class UploadFilenameInputManager(UploadInputManager):
     def yield_upload_part_bodies(self, transfer_future, chunksize):
         full_file_size = transfer_future.meta.size
         num_parts = self._get_num_parts(transfer_future, chunksize)
+        upload_part_source = self._get_upload_part_source(transfer_future)
         for part_number in range(1, num_parts + 1):
             callbacks = self._get_progress_callbacks(transfer_future)
             close_callbacks = self._get_close_callbacks(callbacks)
@@ -268,7 +316,7 @@ class UploadFilenameInputManager(UploadInputManager):
             # Get a file-like object for that part and the size of the full
             # file size for the associated file-like object for that part.
             fileobj, full_size = self._get_upload_part_fileobj_with_full_size(
-                transfer_future.meta.call_args.fileobj, start_byte=start_byte,
+                upload_part_source, start_byte=start_byte,
                 part_size=chunksize, full_file_size=full_file_size)
 
             # Wrap fileobj with interrupt reader that will quickly cancel
@@ -283,20 +331,42 @@ class UploadFilenameInputManager(UploadInputManager):
                 close_callbacks=close_callbacks)
             yield part_number, read_file_chunk
 
-    def _get_deferred_open_file(self, fileobj, start_byte):
+    def _get_deferred_open_file(self, fileobj, start_byte, size):
+        # Once the file is opened, let the os know which part of it is
+        # about to be read so it can be read ahead if that was requested.
+        open_function = functools.partial(
+            self._open_with_readahead, start_byte=start_byte, size=size)
         fileobj = DeferredOpenFile(
-            fileobj, start_byte, open_function=self._osutil.open)
+            fileobj, start_byte, open_function=open_function)
+        return fileobj
+
+    def _open_with_readahead(self, filename, mode, start_byte, size):
+        fileobj = self._osutil.open(filename, mode)
+        self._osutil.readahead_pages(fileobj, start_byte, size)
         return fileobj
 
     def _get_put_object_fileobj_with_full_size(self, transfer_future):
         fileobj = transfer_future.meta.call_args.fileobj
         size = transfer_future.meta.size
-        return self._get_deferred_open_file(fileobj, 0), size
+        return self._get_deferred_open_file(fileobj, 0, size), size
+
+    def _get_upload_part_source(self, transfer_future):
+        # All of the parts read from a single shared file descriptor
+        # instead of each part opening the file on its own.
+        shared_file = SharedFile(
+            transfer_future.meta.call_args.fileobj,
+            open_function=self._osutil.open,
+            readahead_function=self._osutil.readahead_pages)
+        # Make sure the file gets closed if the upload fails before all of
+        # the parts have been uploaded.
+        self._transfer_coordinator.add_failure_cleanup(shared_file.close)
+        return shared_file
 
     def _get_upload_part_fileobj_with_full_size(self, fileobj, **kwargs):
         start_byte = kwargs['start_byte']
+        part_size = kwargs['part_size']
         full_size = kwargs['full_file_size']
-        return self._get_deferred_open_file(fileobj, start_byte), full_size
+        return fileobj.get_reader(start_byte, part_size), full_size
 
     def _get_num_parts(self, transfer_future, part_size):
         return int(
@@ -327,6 +397,9 @@ class UploadSeekableInputManager(UploadFilenameInputManager):
         transfer_future.meta.provide_transfer_size(
             end_position - start_position)
 
+    def _get_upload_part_source(self, transfer_future):
+        return transfer_future.meta.call_args.fileobj
+
     def _get_upload_part_fileobj_with_full_size(self, fileobj, **kwargs):
         # Note: It is unfortunate that in order to do a multithreaded
         # multipart upload we cannot simply copy the filelike object
@@ -352,10 +425,18 @@ class UploadSeekableInputManager(UploadFilenameInputManager):
 
 class UploadNonSeekableInputManager(UploadInputManager):
     """Upload utility for a file-like object that cannot seek."""
-    def __init__(self, osutil, transfer_coordinator, bandwidth_limiter=None):
+    def __init__(self, osutil, transfer_coordinator, bandwidth_limiter=None,
+                 buffer_pool=None):
         super(UploadNonSeekableInputManager, self).__init__(
-            osutil, transfer_coordinator, bandwidth_limiter)
-        self._initial_data = b''
+            osutil, transfer_coordinator, bandwidth_limiter, buffer_pool)
+        self._initial_data = memoryview(b'')
+        # The pooled buffers holding parts that have not been uploaded yet.
+        # Parts of a failed upload that never made it into a task are never
+        # closed, so their buffers are released once the upload is done.
+        self._held_buffers = {}
+        self._held_buffers_lock = threading.Lock()
+        self._transfer_coordinator.add_failure_cleanup(
+            self._release_held_buffers)
 
     @classmethod
     def is_compatible(cls, upload_source):
@@ -380,7 +461,9 @@ class UploadNonSeekableInputManager(UploadInputManager):
         # against the threshold.
         fileobj = transfer_future.meta.call_args.fileobj
         threshold = config.multipart_threshold
-        self._initial_data = self._read(fileobj, threshold, False)
+        # The data is kept as a view so parts can be sliced out of it
+        # without copying it.
+        self._initial_data = memoryview(fileobj.read(threshold))
         if len(self._initial_data) < threshold:
             return False
         else:
@@ -391,8 +474,13 @@ class UploadNonSeekableInputManager(UploadInputManager):
         close_callbacks = self._get_close_callbacks(callbacks)
         fileobj = transfer_future.meta.call_args.fileobj
 
-        body = self._wrap_data(
-            self._initial_data + fileobj.read(), callbacks, close_callbacks)
+        data = self._initial_data
+        remaining_data = fileobj.read()
+        if not len(data):
+            data = remaining_data
+        elif remaining_data:
+            data = data.tobytes() + remaining_data
+        body = self._wrap_data(data, callbacks, close_callbacks)
 
         # Zero out the stored data so we don't have additional copies
         # hanging around in memory.
@@ -408,17 +496,58 @@ class UploadNonSeekableInputManager(UploadInputManager):
             callbacks = self._get_progress_callbacks(transfer_future)
             close_callbacks = self._get_close_callbacks(callbacks)
             part_number += 1
-            part_content = self._read(file_object, chunksize)
+            buffer = self._acquire_buffer(chunksize)
+            try:
+                part_content, used_buffer = self._read(
+                    file_object, chunksize, buffer)
+            except Exception:
+                self._release_buffer(buffer)
+                raise
+            if not part_content or not used_buffer:
+                # Nothing is held in the buffer, so it can be reused
+                # right away.
+                self._release_buffer(buffer)
+                buffer = None
             if not part_content:
                 break
+            done_callbacks = []
+            if buffer is not None:
+                done_callbacks.append(
+                    FunctionContainer(self._release_buffer, buffer))
             part_object = self._wrap_data(
-                part_content, callbacks, close_callbacks)
+                part_content, callbacks, close_callbacks, done_callbacks)
 
             # Zero out part_content to avoid hanging on to additional data.
             part_content = None
             yield part_number, part_object
 
-    def _read(self, fileobj, amount, truncate=True):
+    def _acquire_buffer(self, size):
+        # Parts are read into buffers from the pool shared by all uploads,
+        # which are reused once the part they hold has been uploaded.
+        # Parts larger than the buffers of the pool get a buffer of their
+        # own.
+        if self._buffer_pool is None or \
+                size > self._buffer_pool.buffer_size:
+            return bytearray(size)
+        buffer = self._buffer_pool.acquire()
+        with self._held_buffers_lock:
+            self._held_buffers[id(buffer)] = buffer
+        return buffer
+
+    def _release_buffer(self, buffer):
+        with self._held_buffers_lock:
+            buffer = self._held_buffers.pop(id(buffer), None)
+        if buffer is not None:
+            self._buffer_pool.release(buffer)
+
+    def _release_held_buffers(self):
+        with self._held_buffers_lock:
+            buffers = list(self._held_buffers.values())
+            self._held_buffers.clear()
+        for buffer in buffers:
+            self._buffer_pool.release(buffer)
+
+    def _read(self, fileobj, amount, buffer):
         """
         Reads a specific amount of data from a stream and returns it. If there
         is any data in initial_data, that will be popped out first.
@@ -429,57 +558,97 @@ class UploadNonSeekableInputManager(UploadInputManager):
         :type amount: int
         :param amount: The number of bytes to read from the stream.
 
-        :type truncate: bool
-        :param truncate: Whether or not to truncate initial_data after
-            reading from it.
+        :type buffer: bytearray
+        :param buffer: The buffer of at least ``amount`` bytes to read the
+            data into if it cannot be taken from the initial data.
 
-        :return: Generator which generates part bodies from the initial data.
+        :return: A tuple of a memoryview of the data that was read and
+            whether that data is held in the buffer.
         """
-        # If the the initial data is empty, we simply read from the fileobj
-        if len(self._initial_data) == 0:
-            return fileobj.read(amount)
-
-        # If the requested number of bytes is less thant the amount of
-        # initial data, pull entirely from initial data.
+        # If the requested number of bytes is less than the amount of
+        # initial data, pull entirely from initial data. This only slices
+        # the view, so nothing is copied.
         if amount <= len(self._initial_data):
             data = self._initial_data[:amount]
             # Truncate initial data so we don't hang onto the data longer
             # than we need.
-            if truncate:
-                self._initial_data = self._initial_data[amount:]
-            return data
+            self._initial_data = self._initial_data[amount:]
+            return data, False
+
+        # At this point there may be some initial data left, but not enough
+        # to satisfy the number of bytes requested. Move the remaining
+        # initial data into the buffer and read the rest from the fileobj
+        # directly into the buffer after it.
+        view = memoryview(buffer)[:amount]
+        position = len(self._initial_data)
+        view[:position] = self._initial_data
+        # Zero out initial data so we don't hang onto the data any more.
+        self._initial_data = memoryview(b'')
+        while position < amount:
+            amount_read = readinto(fileobj, view[position:])
+            if not amount_read:
+                break
+            position += amount_read
+        return view[:position], True
 
-        # At this point there is some initial data left, but not enough to
-        # satisfy the number of bytes requested. Pull out the remaining
-        # initial data and read the rest from the fileobj.
-        amount_to_read = amount - len(self._initial_data)
-        data = self._initial_data + fileobj.read(amount_to_read)
 
-        # Zero out initial data so we don't hang onto the data any more.
-        if truncate:
-            self._initial_data = b''
-        return data
+class UploadBufferInputManager(UploadInputManager):
+    """Upload utility for bytes-like objects
 
-    def _wrap_data(self, data, callbacks, close_callbacks):
-        """
-        Wraps data with the interrupt reader and the file chunk reader.
+    The body of each request is a view of its slice of the buffer, so
+    nothing is copied up front and no extra memory is held while waiting
+    to upload. The buffer must not be modified until the upload is done.
+    """
+    @classmethod
+    def is_compatible(cls, upload_source):
+        # File-like objects that happen to support the buffer protocol
+        # (e.g. mmap objects) are left to the file-like managers.
+        if hasattr(upload_source, 'read'):
+            return False
+        try:
+            memoryview(upload_source)
+        except TypeError:
+            return False
+        return True
 
-        :type data: bytes
-        :param data: The data to wrap.
+    def stores_body_in_memory(self, operation_name):
+        # The data is already in memory regardless of whether it is being
+        # uploaded, so it does not count against the in-memory limits.
+        return False
 
-        :type callbacks: list
-        :param callbacks: The callbacks associated with the transfer future.
+    def provide_transfer_size(self, transfer_future):
+        transfer_future.meta.provide_transfer_size(
+            len(self._get_view(transfer_future)))
 
-        :type close_callbacks: list
-        :param close_callbacks: The callbacks to be called when closing the
-            wrapper for the data.
+    def requires_multipart_upload(self, transfer_future, config):
+        return transfer_future.meta.size >= config.multipart_threshold
 
-        :return: Fully wrapped data.
-        """
-        fileobj = self._wrap_fileobj(six.BytesIO(data))
-        return self._osutil.open_file_chunk_reader_from_fileobj(
-            fileobj=fileobj, chunk_size=len(data), full_file_size=len(data),
-            callbacks=callbacks, close_callbacks=close_callbacks)
+    def get_put_object_body(self, transfer_future):
+        callbacks = self._get_progress_callbacks(transfer_future)
+        close_callbacks = self._get_close_callbacks(callbacks)
+        return self._wrap_data(
+            self._get_view(transfer_future), callbacks, close_callbacks)
+
+    def yield_upload_part_bodies(self, transfer_future, chunksize):
+        view = self._get_view(transfer_future)
+        num_parts = int(
+            math.ceil(transfer_future.meta.size / float(chunksize)))
+        for part_number in range(1, num_parts + 1):
+            callbacks = self._get_progress_callbacks(transfer_future)
+            close_callbacks = self._get_close_callbacks(callbacks)
+            start_byte = chunksize * (part_number - 1)
+            part_object = self._wrap_data(
+                view[start_byte:start_byte + chunksize], callbacks,
+                close_callbacks)
+            yield part_number, part_object
+
+    def _get_view(self, transfer_future):
+        view = memoryview(transfer_future.meta.call_args.fileobj)
+        if hasattr(view, 'cast') and (view.ndim != 1 or view.format != 'B'):
+            # Parts are sliced out by byte offsets so the buffer needs to
+            # be viewed as a flat sequence of bytes.
+            view = view.cast('B')
+        return view
 
 
 class UploadSubmissionTask(SubmissionTask):
@@ -508,6 +677,7 @@ class UploadSubmissionTask(SubmissionTask):
         """
         upload_manager_resolver_chain = [
             UploadFilenameInputManager,
+            UploadBufferInputManager,
             UploadSeekableInputManager,
             UploadNonSeekableInputManager
         ]
@@ -521,7 +691,8 @@ class UploadSubmissionTask(SubmissionTask):
                 fileobj, type(fileobj)))
 
     def _submit(self, client, config, osutil, request_executor,
-                transfer_future, bandwidth_limiter=None):
+                transfer_future, bandwidth_limiter=None,
+                part_size_planner=None, buffer_pool=None):
         """
         :param client: The client associated with the transfer manager
 
@@ -539,10 +710,24 @@ class UploadSubmissionTask(SubmissionTask):
         :type transfer_future: s3transfer.futures.TransferFuture
         :param transfer_future: The transfer future associated with the
             transfer request that tasks are being submitted for
+
+        :type bandwidth_limiter: s3transfer.bandwidth.BandwidthLimiter
+        :param bandwidth_limiter: The bandwidth limiter to use when
+            uploading streams
+
+        :type part_size_planner: s3transfer.utils.UploadPartSizePlanner
+        :param part_size_planner: The planner to use to pick the size of
+            each part of a multipart upload of known size. If not provided,
+            the configured multipart_chunksize is used.
+
+        :type buffer_pool: s3transfer.utils.BufferPool
+        :param buffer_pool: The pool of buffers to read the parts of
+            uploads from file-like objects that cannot seek into
         """
         upload_input_manager = self._get_upload_input_manager_cls(
             transfer_future)(
-                osutil, self._transfer_coordinator, bandwidth_limiter)
+                osutil, self._transfer_coordinator, bandwidth_limiter,
+                buffer_pool)
 
         # Determine the size if it was not provided
         if transfer_future.meta.size is None:
@@ -557,7 +742,7 @@ class UploadSubmissionTask(SubmissionTask):
         else:
             self._submit_multipart_request(
                 client, config, osutil, request_executor, transfer_future,
-                upload_input_manager)
+                upload_input_manager, part_size_planner)
 
     def _submit_upload_request(self, client, config, osutil, request_executor,
                                transfer_future, upload_input_manager):
@@ -587,13 +772,34 @@ class UploadSubmissionTask(SubmissionTask):
 
     def _submit_multipart_request(self, client, config, osutil,
                                   request_executor, transfer_future,
-                                  upload_input_manager):
+                                  upload_input_manager,
+                                  part_size_planner=None):
         call_args = transfer_future.meta.call_args
+        extra_part_args = self._extra_upload_part_args(call_args.extra_args)
+
+        size = transfer_future.meta.size
+        chunksize = getattr(call_args, 'multipart_chunksize', None)
+        if chunksize is None:
+            chunksize = config.multipart_chunksize
+            if part_size_planner is not None and size is not None:
+                chunksize = part_size_planner.get_part_size(
+                    size, config.max_request_concurrency)
+        adjuster = ChunksizeAdjuster()
+        chunksize = adjuster.adjust_chunksize(chunksize, size)
+
+        journal = None
+        if self._should_use_resumable_upload(config, osutil, transfer_future):
+            journal = self._get_journal(osutil, transfer_future, chunksize)
+            # Parts have to line up with the ones already uploaded, so the
+            # part size of the journal is used even if it has changed.
+            chunksize = journal.part_size
+            # Keep the multipart upload and save whatever was uploaded if
+            # anything goes wrong so that the upload can be resumed.
+            self._transfer_coordinator.add_failure_cleanup(journal.save)
 
         # Submit the request to create a multipart upload.
-        create_multipart_future = self._transfer_coordinator.submit(
-            request_executor,
-            CreateMultipartUploadTask(
+        if journal is None:
+            create_multipart_task = CreateMultipartUploadTask(
                 transfer_coordinator=self._transfer_coordinator,
                 main_kwargs={
                     'client': client,
@@ -602,58 +808,70 @@ class UploadSubmissionTask(SubmissionTask):
                     'extra_args': call_args.extra_args,
                 }
             )
-        )
+        else:
+            create_multipart_task = CreateResumableMultipartUploadTask(
+                transfer_coordinator=self._transfer_coordinator,
+                main_kwargs={
+                    'client': client,
+                    'bucket': call_args.bucket,
+                    'key': call_args.key,
+                    'extra_args': call_args.extra_args,
+                    'list_parts_extra_args': extra_part_args,
+                    'journal': journal,
+                }
+            )
+        create_multipart_future = self._transfer_coordinator.submit(
+            request_executor, create_multipart_task)
 
         # Submit requests to upload the parts of the file.
         part_futures = []
-        extra_part_args = self._extra_upload_part_args(call_args.extra_args)
 
         # Get any tags that need to be associated to the submitted task
         # for upload the data
         upload_part_tag = self._get_upload_task_tag(
             upload_input_manager, 'upload_part')
 
-        size = transfer_future.meta.size
-        adjuster = ChunksizeAdjuster()
-        chunksize = adjuster.adjust_chunksize(config.multipart_chunksize, size)
         part_iterator = upload_input_manager.yield_upload_part_bodies(
             transfer_future, chunksize)
+        upload_part_tasks = (
+            self._get_upload_part_task(
+                client, call_args, fileobj, part_number, extra_part_args,
+                create_multipart_future, journal)
+            for part_number, fileobj in part_iterator
+        )
 
-        for part_number, fileobj in part_iterator:
-            part_futures.append(
-                self._transfer_coordinator.submit(
-                    request_executor,
-                    UploadPartTask(
-                        transfer_coordinator=self._transfer_coordinator,
-                        main_kwargs={
-                            'client': client,
-                            'fileobj': fileobj,
-                            'bucket': call_args.bucket,
-                            'key': call_args.key,
-                            'part_number': part_number,
-                            'extra_args': extra_part_args
-                        },
-                        pending_main_kwargs={
-                            'upload_id': create_multipart_future
-                        }
-                    ),
-                    tag=upload_part_tag
+        readahead_size = config.max_in_memory_upload_readahead_size
+        if upload_part_tag is not None and readahead_size is not None:
+            part_futures = self._submit_upload_part_tasks_with_readahead(
+                request_executor, upload_part_tasks, upload_part_tag,
+                max(1, readahead_size // chunksize))
+        else:
+            for upload_part_task in upload_part_tasks:
+                part_futures.append(
+                    self._transfer_coordinator.submit(
+                        request_executor, upload_part_task,
+                        tag=upload_part_tag
+                    )
                 )
-            )
 
         complete_multipart_extra_args = self._extra_complete_multipart_args(
             call_args.extra_args)
+        complete_multipart_kwargs = {
+            'client': client,
+            'bucket': call_args.bucket,
+            'key': call_args.key,
+            'extra_args': complete_multipart_extra_args,
+        }
+        complete_multipart_task_cls = CompleteMultipartUploadTask
+        if journal is not None:
+            complete_multipart_kwargs['journal'] = journal
+            complete_multipart_task_cls = CompleteResumableMultipartUploadTask
         # Submit the request to complete the multipart upload.
         self._transfer_coordinator.submit(
             request_executor,
-            CompleteMultipartUploadTask(
+            complete_multipart_task_cls(
                 transfer_coordinator=self._transfer_coordinator,
-                main_kwargs={
-                    'client': client,
-                    'bucket': call_args.bucket,
-                    'key': call_args.key,
-                    'extra_args': complete_multipart_extra_args,
-                },
+                main_kwargs=complete_multipart_kwargs,
                 pending_main_kwargs={
                     'upload_id': create_multipart_future,
                     'parts': part_futures
@@ -662,6 +880,115 @@ class UploadSubmissionTask(SubmissionTask):
             )
         )
 
+    def _get_upload_part_task(self, client, call_args, fileobj, part_number,
+                              extra_part_args, create_multipart_future,
+                              journal=None):
+        main_kwargs = {
+            'client': client,
+            'fileobj': fileobj,
+            'bucket': call_args.bucket,
+            'key': call_args.key,
+            'part_number': part_number,
+            'extra_args': extra_part_args
+        }
+        upload_part_task_cls = UploadPartTask
+        if journal is not None:
+            main_kwargs['journal'] = journal
+            upload_part_task_cls = UploadResumablePartTask
+        return upload_part_task_cls(
+            transfer_coordinator=self._transfer_coordinator,
+            main_kwargs=main_kwargs,
+            pending_main_kwargs={
+                'upload_id': create_multipart_future
+            },
+            # The task does not run once the upload has failed, so the body
+            # is also closed when the task is done. This releases what the
+            # body holds, such as a pooled buffer, while the rest of the
+            # parts are still being submitted.
+            done_callbacks=[fileobj.close]
+        )
+
+    def _should_use_resumable_upload(self, config, osutil, transfer_future):
+        # Only uploads of regular files are resumed as the file is what
+        # identifies the upload and it has to be read again to resume it.
+        fileobj = transfer_future.meta.call_args.fileobj
+        return (
+            config.resumable_uploads and
+            UploadFilenameInputManager.is_compatible(fileobj) and
+            not osutil.is_special_file(fileobj)
+        )
+
+    def _get_journal(self, osutil, transfer_future, part_size):
+        call_args = transfer_future.meta.call_args
+        journal_filename = (
+            call_args.fileobj + os.extsep + RESUMABLE_UPLOAD_EXTENSION +
+            os.extsep + 'journal'
+        )
+        identity = {
+            'bucket': call_args.bucket,
+            'key': call_args.key,
+            'size': transfer_future.meta.size,
+            'modified_time': osutil.get_file_modified_time(call_args.fileobj),
+            'extra_args': self._get_extra_args_digest(call_args.extra_args),
+        }
+        journal = UploadJournal.load(journal_filename, identity, osutil)
+        if journal is not None and journal.upload_id is not None:
+            logger.debug(
+                'Resuming multipart upload %s of %s with uploaded parts: %s',
+                journal.upload_id, call_args.fileobj, journal.parts)
+            return journal
+        # Start the upload over. The journal is saved once the multipart
+        # upload is created.
+        return UploadJournal(journal_filename, identity, osutil, part_size)
+
+    def _get_extra_args_digest(self, extra_args):
+        # A multipart upload keeps the extra args it was created with, so it
+        # is only resumed with the same ones. They are stored as a digest as
+        # they may include secrets, like a customer provided encryption key,
+        # and values that cannot be serialized, like datetimes.
+        serialized = json.dumps(extra_args, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    def _submit_upload_part_tasks_with_readahead(self, request_executor,
+                                                 upload_part_tasks, tag,
+                                                 max_readahead_parts):
+        # Instead of blocking until there is room to upload the part that
+        # was just read, the next parts are read while waiting for room so
+        # they are ready to be uploaded as soon as there is. Reading each
+        # part is what pulls its data into memory, so this is only done for
+        # up to max_readahead_parts parts at a time.
+        part_futures = []
+        pending_tasks = deque()
+        exhausted = False
+        while True:
+            while pending_tasks:
+                try:
+                    part_futures.append(
+                        self._transfer_coordinator.submit(
+                            request_executor, pending_tasks[0], tag=tag,
+                            block=False
+                        )
+                    )
+                except NoResourcesAvailable:
+                    break
+                pending_tasks.popleft()
+            if exhausted and not pending_tasks:
+                return part_futures
+            if not exhausted and len(pending_tasks) < max_readahead_parts:
+                upload_part_task = next(upload_part_tasks, None)
+                if upload_part_task is None:
+                    exhausted = True
+                else:
+                    pending_tasks.append(upload_part_task)
+            else:
+                # Nothing else can be read ahead, so wait for room to
+                # upload the oldest part that was read.
+                part_futures.append(
+                    self._transfer_coordinator.submit(
+                        request_executor, pending_tasks.popleft(), tag=tag
+                    )
+                )
+
     def _extra_upload_part_args(self, extra_args):
         # Only the args in UPLOAD_PART_ARGS actually need to be passed
         # onto the upload_part calls.
@@ -692,6 +1019,63 @@ class PutObjectTask(Task):
             client.put_object(Bucket=bucket, Key=key, Body=body, **extra_args)
 
 
+class CreateResumableMultipartUploadTask(Task):
+    """Task to initiate or resume a resumable multipart upload
+
+    Unlike CreateMultipartUploadTask, the multipart upload is not aborted
+    if the transfer fails so that it can be resumed later on.
+    """
+    def _main(self, client, bucket, key, extra_args, list_parts_extra_args,
+              journal):
+        """
+        :param client: The client to use when calling CreateMultipartUpload
+            and ListParts
+        :param bucket: The name of the bucket to upload to
+        :param key: The name of the key to upload to
+        :param extra_args: A dictionary of any extra arguments that may be
+            used in the intialization.
+        :param list_parts_extra_args: A dictionary of any extra arguments
+            that may be used to list the parts already uploaded.
+        :param journal: The UploadJournal of the upload
+
+        :returns: The upload id of the multipart upload
+        """
+        if journal.upload_id is not None:
+            try:
+                uploaded_parts = self._list_parts(
+                    client, bucket, key, journal.upload_id,
+                    list_parts_extra_args)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                    raise
+                logger.debug(
+                    'Multipart upload %s no longer exists, starting the '
+                    'upload over.', journal.upload_id)
+            else:
+                # Only trust the parts that are both in the journal and in
+                # the multipart upload. Anything else is uploaded again.
+                journal.retain_parts(uploaded_parts)
+                journal.save()
+                return journal.upload_id
+
+        response = client.create_multipart_upload(
+            Bucket=bucket, Key=key, **extra_args)
+        upload_id = response['UploadId']
+        journal.start(upload_id)
+        journal.save()
+        return upload_id
+
+    def _list_parts(self, client, bucket, key, upload_id, extra_args):
+        parts = []
+        paginator = client.get_paginator('list_parts')
+        for page in paginator.paginate(
+                Bucket=bucket, Key=key, UploadId=upload_id, **extra_args):
+            for part in page.get('Parts', []):
+                parts.append(
+                    {'ETag': part['ETag'], 'PartNumber': part['PartNumber']})
+        return parts
+
+
 class UploadPartTask(Task):
     """Task to upload a part in a multipart upload"""
     def _main(self, client, fileobj, bucket, key, upload_id, part_number,
@@ -722,3 +1106,182 @@ class UploadPartTask(Task):
                 Body=body, **extra_args)
         etag = response['ETag']
         return {'ETag': etag, 'PartNumber': part_number}
+
+
+class UploadResumablePartTask(UploadPartTask):
+    """Task to upload a part of a resumable multipart upload
+
+    The part is not uploaded again if the journal shows that it already
+    was. Otherwise, the part is added to the journal once it is uploaded.
+
+    :param journal: The UploadJournal of the upload
+    """
+    def _main(self, client, fileobj, bucket, key, upload_id, part_number,
+              extra_args, journal):
+        part = journal.get_part(part_number)
+        if part is not None:
+            fileobj.close()
+            return part
+        part = super(UploadResumablePartTask, self)._main(
+            client, fileobj, bucket, key, upload_id, part_number, extra_args)
+        journal.add_part(part)
+        return part
+
+
+class CompleteResumableMultipartUploadTask(CompleteMultipartUploadTask):
+    """Task to complete a resumable multipart upload
+
+    Once the upload is completed, its journal is removed as there is
+    nothing left to resume.
+
+    :param journal: The UploadJournal of the upload
+    """
+    def _main(self, client, bucket, key, upload_id, parts, extra_args,
+              journal):
+        super(CompleteResumableMultipartUploadTask, self)._main(
+            client, bucket, key, upload_id, parts, extra_args)
+        journal.remove()
+
+
+class UploadJournal(object):
+    """Journal of the parts of a multipart upload that have been uploaded
+
+    The journal is stored as lines of JSON next to the file being
+    uploaded. The first line includes an identity of the file and where it
+    is uploaded to so that a multipart upload is only ever resumed for the
+    same file. Each uploaded part is appended as a line of its own, so
+    recording a part does not rewrite the whole journal. The journal is
+    compacted into one line per part whenever it is saved.
+    """
+    def __init__(self, filename, identity, osutil, part_size,
+                 upload_id=None, parts=None):
+        """
+        :param filename: The name of the file to store the journal in
+        :param identity: A JSON serializable dictionary identifying the
+            file being uploaded and where it is uploaded to
+        :param osutil: The os utility to use to store the journal
+        :param part_size: The size of each part of the upload
+        :param upload_id: The id of the multipart upload if it was created
+        :param parts: A list of the parts that have been uploaded::
+
+            [{'ETag': etag_value, 'PartNumber': part_number}, ...]
+        """
+        self._filename = filename
+        self._identity = identity
+        self._osutil = osutil
+        self._part_size = part_size
+        self._upload_id = upload_id
+        self._parts = {}
+        self._lock = threading.Lock()
+        for part in parts or []:
+            self._parts[part['PartNumber']] = part
+
+    @classmethod
+    def load(cls, filename, identity, osutil):
+        """Load the journal stored for a file
+
+        Any part that was only partially appended, e.g. because the process
+        was killed while appending it, is ignored.
+
+        :returns: The stored journal or None if there is no journal or
+            the journal was stored for a different file or destination
+        """
+        try:
+            with osutil.open(filename, 'r') as f:
+                lines = f.read().splitlines()
+            contents = json.loads(lines[0])
+            if contents['identity'] != identity:
+                return None
+            part_size = int(contents['part_size'])
+            upload_id = contents['upload_id']
+            parts = []
+            for line in lines[1:]:
+                part = cls._load_part(line)
+                if part is not None:
+                    parts.append(part)
+        except (IOError, OSError, ValueError, KeyError, TypeError,
+                IndexError):
+            logger.debug(
+                'Unable to load upload journal %s', filename, exc_info=True)
+            return None
+        return cls(filename, identity, osutil, part_size, upload_id, parts)
+
+    @classmethod
+    def _load_part(cls, line):
+        try:
+            part = json.loads(line)
+            return {
+                'ETag': part['ETag'], 'PartNumber': int(part['PartNumber'])}
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @property
+    def part_size(self):
+        return self._part_size
+
+    @property
+    def upload_id(self):
+        return self._upload_id
+
+    @property
+    def parts(self):
+        """A list of the uploaded parts sorted by part number"""
+        with self._lock:
+            return [self._parts[i] for i in sorted(self._parts)]
+
+    def start(self, upload_id):
+        """Record a new multipart upload, forgetting any uploaded parts"""
+        with self._lock:
+            self._upload_id = upload_id
+            self._parts = {}
+
+    def get_part(self, part_number):
+        """Get a part if it has been uploaded
+
+        :returns: The part or None if it has not been uploaded
+        """
+        with self._lock:
+            return self._parts.get(part_number)
+
+    def add_part(self, part):
+        """Record that a part has been uploaded
+
+        The part is appended to the stored journal, which has to have been
+        saved since the upload was started.
+        """
+        with self._lock:
+            self._parts[part['PartNumber']] = part
+            # Each line starts with a newline instead of ending with one so
+            # that a partially appended line never swallows the next one.
+            with self._osutil.open(self._filename, 'a') as f:
+                f.write('\n' + json.dumps(part))
+
+    def retain_parts(self, parts):
+        """Forget any recorded part that is not in the provided parts"""
+        with self._lock:
+            self._parts = dict(
+                (part['PartNumber'], part) for part in parts
+                if self._parts.get(part['PartNumber']) == part
+            )
+
+    def save(self):
+        """Store the journal, compacting any appended parts"""
+        with self._lock:
+            lines = [json.dumps({
+                'identity': self._identity,
+                'part_size': self._part_size,
+                'upload_id': self._upload_id,
+            })]
+            lines.extend(
+                json.dumps(self._parts[i]) for i in sorted(self._parts))
+            # Write to a temporary file first so the journal is replaced
+            # atomically and is never left partially written.
+            temp_filename = \
+                self._filename + os.extsep + random_file_extension()
+            with self._osutil.open(temp_filename, 'w') as f:
+                f.write('\n'.join(lines))
+            self._osutil.rename_file(temp_filename, self._filename)
+
+    def remove(self):
+        """Remove the stored journal"""
+        self._osutil.remove_file(self._filename)
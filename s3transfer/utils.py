@@ -13,10 +13,15 @@
 import random
 import time
 import functools
+import hashlib
+import heapq
 import math
+import mmap
 import os
+import errno
 import stat
 import string
+import tempfile
 import logging
 import threading
 import io
@@ -24,6 +29,13 @@ from collections import defaultdict
 
 from s3transfer.compat import rename_file
 from s3transfer.compat import seekable
+from s3transfer.compat import pread
+from s3transfer.compat import pwrite
+from s3transfer.compat import pwritev
+from s3transfer.compat import posix_fallocate
+from s3transfer.compat import posix_fadvise
+from s3transfer.compat import sync_file_range
+from s3transfer.compat import readinto
 
 
 MAX_PARTS = 10000
@@ -32,6 +44,11 @@ MAX_PARTS = 10000
 # and: http://docs.aws.amazon.com/AmazonS3/latest/dev/qfacts.html
 MAX_SINGLE_UPLOAD_SIZE = 5 * (1024 ** 3)
 MIN_UPLOAD_CHUNKSIZE = 5 * (1024 ** 2)
+# The bounds used when picking the size of each ranged download request.
+MIN_DOWNLOAD_PART_SIZE = 1024 ** 2
+MAX_DOWNLOAD_PART_SIZE = 256 * (1024 ** 2)
+# The largest part size picked when planning the parts of an upload or copy.
+MAX_PLANNED_UPLOAD_PART_SIZE = 256 * (1024 ** 2)
 logger = logging.getLogger(__name__)
 
 
@@ -224,9 +241,50 @@ class CountCallbackInvoker(object):
 
 
 class OSUtils(object):
+    # The page cache policy defaults are also set on the class so that
+    # subclasses that do not call this __init__ keep working.
+    _drop_written_pages = False
+    _sync_written_pages = False
+    _readahead_read_pages = False
+
+    def __init__(self, drop_written_pages=False, sync_written_pages=False,
+                 readahead_read_pages=False):
+        """Utility for os-related behavior of transfers
+
+        By default, files are read and written without giving the kernel
+        any advice about the page cache. For very large transfers, that can
+        evict the cached pages of everything else on the host, so the page
+        cache can be managed with the following opt-in policy.
+
+        :type drop_written_pages: bool
+        :param drop_written_pages: If True, the pages of downloaded content
+            written to a file are dropped from the page cache as soon as
+            they are written (``POSIX_FADV_DONTNEED``). This does not apply
+            to memory mapped downloads.
+
+        :type sync_written_pages: bool
+        :param sync_written_pages: If True, along with
+            ``drop_written_pages``, each written range is flushed to disk
+            before its pages are dropped. Dirty pages cannot be dropped
+            until they are written out, so this makes sure they are dropped
+            at the cost of waiting on the disk for each write.
+
+        :type readahead_read_pages: bool
+        :param readahead_read_pages: If True, the kernel is told that each
+            part of a file about to be uploaded will be read sequentially
+            and soon (``POSIX_FADV_SEQUENTIAL`` and ``POSIX_FADV_WILLNEED``)
+            so that it is read ahead of the upload.
+        """
+        self._drop_written_pages = drop_written_pages
+        self._sync_written_pages = sync_written_pages
+        self._readahead_read_pages = readahead_read_pages
+
     def get_file_size(self, filename):
         return os.path.getsize(filename)
 
+    def get_file_modified_time(self, filename):
+        return os.path.getmtime(filename)
+
     def open_file_chunk_reader(self, filename, start_byte, size, callbacks):
         return ReadFileChunk.from_filename(filename, start_byte,
                                            size, callbacks,
@@ -255,6 +313,64 @@ class OSUtils(object):
     def rename_file(self, current_filename, new_filename):
         rename_file(current_filename, new_filename)
 
+    def allocate(self, fileobj, size):
+        """Reserve disk space for a file so it is the provided size
+
+        Where possible, the blocks for the file are allocated up front so
+        that writing to different parts of the file out of order does not
+        fragment it. Otherwise, the file is just truncated to the size.
+
+        :param fileobj: The open file to allocate space for
+        :param size: The size in bytes the file should be
+        """
+        if posix_fallocate is not None:
+            try:
+                posix_fallocate(fileobj.fileno(), 0, size)
+                return
+            except OSError as e:
+                # Not all filesystems support preallocation.
+                if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                    raise
+        fileobj.truncate(size)
+
+    def release_written_pages(self, fileobj, offset, size):
+        """Release the page cache of a range of a file that was written
+
+        This does nothing unless ``drop_written_pages`` was set or the
+        platform does not support giving advice about the page cache.
+
+        :param fileobj: The open file that was written to
+        :param offset: The offset in the file that the range starts at
+        :param size: The size of the range in bytes
+        """
+        if not self._drop_written_pages or posix_fadvise is None or \
+                not size:
+            return
+        fileno = fileobj.fileno()
+        if self._sync_written_pages and sync_file_range is not None:
+            sync_file_range(fileno, offset, size)
+        posix_fadvise(fileno, offset, size, os.POSIX_FADV_DONTNEED)
+
+    def readahead_pages(self, fileobj, offset, size):
+        """Advise that a range of a file is about to be read sequentially
+
+        This does nothing unless ``readahead_read_pages`` was set or the
+        platform does not support giving advice about the page cache.
+
+        :param fileobj: The open file that is going to be read
+        :param offset: The offset in the file that the range starts at
+        :param size: The size of the range in bytes
+        """
+        if not self._readahead_read_pages or posix_fadvise is None or \
+                not size:
+            return
+        fileno = fileobj.fileno()
+        posix_fadvise(fileno, offset, size, os.POSIX_FADV_SEQUENTIAL)
+        posix_fadvise(fileno, offset, size, os.POSIX_FADV_WILLNEED)
+
+    def open_mapped_file(self, filename, size):
+        return MappedFile.from_filename(filename, size, self)
+
     def is_special_file(cls, filename):
         """Checks to see if a file is a special UNIX file.
 
@@ -312,12 +428,16 @@ class DeferredOpenFile(object):
         self._start_byte = start_byte
         self._mode = mode
         self._open_function = open_function
+        self._lock = threading.Lock()
 
     def _open_if_needed(self):
         if self._fileobj is None:
-            self._fileobj = self._open_function(self._filename, self._mode)
-            if self._start_byte != 0:
-                self._fileobj.seek(self._start_byte)
+            with self._lock:
+                if self._fileobj is None:
+                    fileobj = self._open_function(self._filename, self._mode)
+                    if self._start_byte != 0:
+                        fileobj.seek(self._start_byte)
+                    self._fileobj = fileobj
 
     @property
     def name(self):
@@ -331,6 +451,48 @@ class DeferredOpenFile(object):
         self._open_if_needed()
         self._fileobj.write(data)
 
+    def pwrite(self, data, offset):
+        """Write data at a specific offset in the file
+
+        If the platform supports positional writes, the data is written
+        directly to the file descriptor without using or moving the file
+        position. This allows writes to the same file from multiple threads
+        without any shared state. Otherwise, the write falls back to a
+        seek() and write() that is serialized with other positional writes.
+
+        :param data: The data to write
+        :param offset: The offset in the file to write the data to
+        """
+        self._open_if_needed()
+        if pwrite is not None and hasattr(self._fileobj, 'fileno'):
+            pwrite(self._fileobj.fileno(), data, offset)
+        else:
+            with self._lock:
+                self._fileobj.seek(offset)
+                self._fileobj.write(data)
+
+    def pwritev(self, buffers, offset):
+        """Write a list of buffers one after another at an offset in the file
+
+        If the platform supports vectored writes, all of the buffers are
+        written with a single system call. Otherwise, each buffer is written
+        with pwrite().
+
+        :param buffers: The list of bytes-like objects to write
+        :param offset: The offset in the file to write the first buffer to
+        """
+        self._open_if_needed()
+        if pwritev is not None and hasattr(self._fileobj, 'fileno'):
+            pwritev(self._fileobj.fileno(), buffers, offset)
+        else:
+            for buffer in buffers:
+                self.pwrite(buffer, offset)
+                offset += len(buffer)
+
+    def fileno(self):
+        self._open_if_needed()
+        return self._fileobj.fileno()
+
     def seek(self, where):
         self._open_if_needed()
         self._fileobj.seek(where)
@@ -352,6 +514,245 @@ class DeferredOpenFile(object):
         self.close()
 
 
+class SharedFile(object):
+    def __init__(self, filename, open_function=open, readahead_function=None):
+        """A file that is opened once and read from by several readers
+
+        Each reader created with ``get_reader()`` keeps its own position
+        and reads from the one shared file descriptor with positional
+        reads, so reading different parts of the file from different
+        threads needs neither its own open file nor any seeking. The file
+        is opened when it is first read from and closed once every reader
+        has been closed.
+
+        :type filename: str
+        :param filename: The name of the file to read
+
+        :type open_function: function
+        :param open_function: The function to use to open the file
+
+        :type readahead_function: function
+        :param readahead_function: A function called with the open file,
+            the start of a reader and its size before the reader is first
+            read from. This allows the range of the file a reader is about
+            to read to be read ahead.
+        """
+        self._filename = filename
+        self._open_function = open_function
+        self._readahead_function = readahead_function
+        self._fileobj = None
+        self._num_readers = 0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self._filename
+
+    def get_reader(self, start_byte=0, size=None):
+        """Get a reader of the file
+
+        :type start_byte: int
+        :param start_byte: The position in the file the reader starts at
+
+        :type size: int
+        :param size: The number of bytes the reader is expected to read.
+            This is only used to read ahead.
+
+        :rtype: SharedFileReader
+        :returns: A file-like object reading from the shared file
+        """
+        with self._lock:
+            self._num_readers += 1
+        return SharedFileReader(self, start_byte, size)
+
+    def fileno(self):
+        return self._open_if_needed().fileno()
+
+    def readahead(self, start_byte, size):
+        fileobj = self._open_if_needed()
+        if self._readahead_function is not None and size:
+            self._readahead_function(fileobj, start_byte, size)
+
+    def pread(self, size, offset):
+        """Read from the file at a specific offset
+
+        If the platform supports positional reads, the data is read
+        directly from the file descriptor without using or moving the file
+        position. Otherwise, the read falls back to a seek() and read()
+        that is serialized with other positional reads.
+
+        :param size: The number of bytes to read. If None, the rest of the
+            file is read.
+        :param offset: The offset in the file to read the data from
+        """
+        fileobj = self._open_if_needed()
+        if pread is not None and size is not None and \
+                hasattr(fileobj, 'fileno'):
+            return pread(fileobj.fileno(), size, offset)
+        with self._lock:
+            fileobj.seek(offset)
+            return fileobj.read(size)
+
+    def release(self):
+        """Let go of a reader, closing the file if it was the last one"""
+        with self._lock:
+            self._num_readers -= 1
+            # The file is closed while holding the lock so a reader
+            # created in the meantime cannot start using it.
+            if self._num_readers <= 0:
+                self._close()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._fileobj is not None:
+            self._fileobj.close()
+            self._fileobj = None
+
+    def _open_if_needed(self):
+        with self._lock:
+            if self._fileobj is None:
+                self._fileobj = self._open_function(self._filename, 'rb')
+            return self._fileobj
+
+
+class SharedFileReader(object):
+    def __init__(self, shared_file, start_byte=0, size=None):
+        """A file-like object reading from a SharedFile
+
+        :type shared_file: SharedFile
+        :param shared_file: The file to read from
+
+        :type start_byte: int
+        :param start_byte: The position in the file to start reading at
+
+        :type size: int
+        :param size: The number of bytes expected to be read
+        """
+        self._shared_file = shared_file
+        self._start_byte = start_byte
+        self._size = size
+        self._position = start_byte
+        self._read_ahead = False
+        self._closed = False
+
+    @property
+    def name(self):
+        return self._shared_file.name
+
+    def read(self, amount=None):
+        if not self._read_ahead:
+            self._shared_file.readahead(self._start_byte, self._size)
+            self._read_ahead = True
+        data = self._shared_file.pread(amount, self._position)
+        self._position += len(data)
+        return data
+
+    def seek(self, where):
+        self._position = where
+
+    def tell(self):
+        return self._position
+
+    def fileno(self):
+        return self._shared_file.fileno()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._shared_file.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+
+class MappedFile(object):
+    def __init__(self, filename, mapped_file):
+        """A file of a known size that is written to through a memory map
+
+        Writes happen directly against the mapped memory, so they can be made
+        from multiple threads at once and do not need to go through a file
+        object. Data can also be read from a stream directly into the
+        file by using the buffer returned from ``get_buffer()``.
+
+        :type filename: str
+        :param filename: The name of the file that is mapped
+
+        :type mapped_file: mmap.mmap
+        :param mapped_file: The memory map of the file
+        """
+        self._filename = filename
+        self._mmap = mapped_file
+
+    @classmethod
+    def from_filename(cls, filename, size, osutil):
+        """Convenience factory function to create from a filename
+
+        The file is created (or truncated), disk space is allocated for it
+        and then it is mapped into memory.
+
+        :type filename: str
+        :param filename: The name of the file to map
+
+        :type size: int
+        :param size: The size of the file. This must be greater than zero.
+
+        :type osutil: s3transfer.utils.OSUtils
+        :param osutil: The os utility to use to open and allocate the file
+
+        :rtype: s3transfer.utils.MappedFile
+        :returns: A MappedFile object
+        """
+        with osutil.open(filename, 'wb+') as f:
+            osutil.allocate(f, size)
+            # The map stays valid even after the file is closed.
+            mapped_file = mmap.mmap(f.fileno(), size)
+        return cls(filename, mapped_file)
+
+    @property
+    def name(self):
+        return self._filename
+
+    def get_buffer(self, offset):
+        """Get a writable buffer of the file starting at an offset
+
+        :param offset: The offset in the file the buffer should start at
+
+        :rtype: memoryview
+        :returns: A view of the file from the offset to the end of the file.
+        """
+        return memoryview(self._mmap)[offset:]
+
+    def pwrite(self, data, offset):
+        self._mmap[offset:offset + len(data)] = data
+
+    def pwritev(self, buffers, offset):
+        for buffer in buffers:
+            self.pwrite(buffer, offset)
+            offset += len(buffer)
+
+    def close(self):
+        if self._mmap is not None:
+            # Write out everything written through the map before the file
+            # is considered done with.
+            self._mmap.flush()
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A buffer from get_buffer() is still referenced (e.g. by
+                # the traceback of a failed download). The map will be
+                # closed once the last reference to it goes away.
+                logger.warning(
+                    'Unable to close mapped file %s because it has exported '
+                    'buffers.', self._filename)
+            self._mmap = None
+
+
 class ReadFileChunk(object):
     def __init__(self, fileobj, chunk_size, full_file_size,
                  callbacks=None, enable_callbacks=True, close_callbacks=None):
@@ -507,6 +908,52 @@ class ReadFileChunk(object):
         return iter([])
 
 
+class BufferReader(object):
+    def __init__(self, data, close_callbacks=None):
+        """A file-like object reading from a bytes-like object
+
+        Unlike ``io.BytesIO``, the data is not copied at all. Each read
+        returns a memoryview of the data, so what is read must no longer be
+        needed by the time the reader is closed and its buffer is reused.
+
+        :param data: The bytes-like object to read from
+        :param close_callbacks: The callbacks to call once the reader is
+            closed, which allows the buffer holding the data to be reused.
+            They are only called the first time the reader is closed.
+        """
+        self._view = memoryview(data)
+        self._position = 0
+        self._close_callbacks = close_callbacks
+        if close_callbacks is None:
+            self._close_callbacks = []
+
+    def read(self, amount=None):
+        end = len(self._view)
+        if amount is not None and amount >= 0:
+            end = min(self._position + amount, end)
+        data = self._view[self._position:end]
+        self._position += len(data)
+        return data
+
+    def seek(self, where):
+        self._position = where
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        close_callbacks = self._close_callbacks
+        self._close_callbacks = []
+        for callback in close_callbacks:
+            callback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+
 class StreamReaderProgress(object):
     """Wrapper for a read only stream that adds progress callbacks."""
     def __init__(self, stream, callbacks=None):
@@ -520,6 +967,11 @@ class StreamReaderProgress(object):
         invoke_progress_callbacks(self._callbacks, len(value))
         return value
 
+    def readinto(self, buffer):
+        amount_read = readinto(self._stream, buffer)
+        invoke_progress_callbacks(self._callbacks, amount_read)
+        return amount_read
+
 
 class NoResourcesAvailable(Exception):
     pass
@@ -586,6 +1038,7 @@ class SlidingWindowSemaphore(TaskSemaphore):
     """
     def __init__(self, count):
         self._count = count
+        self._max_count = count
         # Dict[tag, next_sequence_number].
         self._tag_sequences = defaultdict(int)
         self._lowest_sequence = {}
@@ -602,13 +1055,13 @@ class SlidingWindowSemaphore(TaskSemaphore):
         logger.debug("Acquiring %s", tag)
         self._condition.acquire()
         try:
-            if self._count == 0:
+            if self._count <= 0:
                 if not blocking:
                     raise NoResourcesAvailable("Cannot acquire tag '%s'" % tag)
                 else:
-                    while self._count == 0:
+                    while self._count <= 0:
                         self._condition.wait()
-            # self._count is no longer zero.
+            # self._count is now positive.
             # First, check if this is the first time we're seeing this tag.
             sequence_number = self._tag_sequences[tag]
             if sequence_number == 0:
@@ -656,6 +1109,75 @@ class SlidingWindowSemaphore(TaskSemaphore):
         finally:
             self._condition.release()
 
+    def resize(self, count):
+        """Change the count of the semaphore
+
+        Acquires that are held count against the new count, so if it is
+        lowered below the number of acquires held, acquiring blocks until
+        enough of them are released.
+
+        :param count: The new count
+        """
+        with self._condition:
+            self._count += count - self._max_count
+            self._max_count = count
+            self._condition.notify_all()
+
+
+class BufferPool(object):
+    def __init__(self, buffer_size, max_buffers=None):
+        """A bounded pool of reusable buffers
+
+        Buffers are only allocated when there are no released buffers to
+        reuse, so no more than ``max_buffers`` buffers are ever allocated.
+        If all of the buffers are in use, acquiring a buffer blocks until
+        one is released.
+
+        :param buffer_size: The size in bytes of each buffer
+        :param max_buffers: The maximum number of buffers in the pool. If
+            not provided, a new buffer is allocated whenever there are no
+            released buffers to reuse.
+        """
+        self._buffer_size = buffer_size
+        self._semaphore = None
+        if max_buffers is not None:
+            self._semaphore = threading.Semaphore(max_buffers)
+        self._free_buffers = []
+        self._lock = threading.Lock()
+
+    @property
+    def buffer_size(self):
+        return self._buffer_size
+
+    def acquire(self, blocking=True):
+        """Acquire a buffer from the pool
+
+        :param blocking: If True, block until a buffer is available. If
+            False, raise an exception if no buffer is available.
+
+        :rtype: bytearray
+        :returns: A buffer of ``buffer_size`` bytes. Its contents are
+            undefined.
+        """
+        if self._semaphore is not None and \
+                not self._semaphore.acquire(blocking):
+            raise NoResourcesAvailable('No buffers available in pool')
+        with self._lock:
+            if self._free_buffers:
+                return self._free_buffers.pop()
+        return bytearray(self._buffer_size)
+
+    def release(self, buffer):
+        """Return a buffer acquired from the pool back to the pool
+
+        :param buffer: The buffer to release. It must not be used after
+            it has been released.
+        """
+        with self._lock:
+            self._free_buffers.append(buffer)
+        if self._semaphore is not None:
+            self._semaphore.release()
+
 
 class ChunksizeAdjuster(object):
     def __init__(self, max_size=MAX_SINGLE_UPLOAD_SIZE,
@@ -710,3 +1232,376 @@ class ChunksizeAdjuster(object):
                 (chunksize, current_chunksize))
 
         return chunksize
+
+
+class DownloadPartSizePlanner(object):
+    def __init__(self, min_size=MIN_DOWNLOAD_PART_SIZE,
+                 max_size=MAX_DOWNLOAD_PART_SIZE, parts_per_request_slot=4,
+                 min_part_duration=0.2, throughput_weight=0.2):
+        """Plans the size of each ranged request for a download
+
+        The size is chosen so that a download is split into roughly
+        ``parts_per_request_slot`` parts for every request that can be made
+        concurrently, which keeps all of the request threads busy for small
+        objects without making an excessive amount of requests for large
+        objects.
+
+        :param min_size: The smallest part size to use
+        :param max_size: The largest part size to use
+        :param parts_per_request_slot: The number of parts to aim for per
+            concurrent request
+        :param min_part_duration: The fewest seconds each part should take
+            to download based on the observed throughput of requests. This
+            keeps the overhead of each request from dominating the time
+            spent downloading a part.
+        :param throughput_weight: How much weight a newly observed
+            throughput is given over previous observations.
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.parts_per_request_slot = parts_per_request_slot
+        self.min_part_duration = min_part_duration
+        self.throughput_weight = throughput_weight
+        self._throughput = None
+        self._lock = threading.Lock()
+
+    @property
+    def throughput(self):
+        """The observed throughput in bytes per second of a single request
+
+        This is None if no throughput has been recorded.
+        """
+        return self._throughput
+
+    def record_throughput(self, num_bytes, seconds):
+        """Record the throughput of a single completed request
+
+        :param num_bytes: The number of bytes downloaded by the request
+        :param seconds: The number of seconds the request took
+        """
+        if seconds <= 0:
+            return
+        throughput = num_bytes / float(seconds)
+        with self._lock:
+            if self._throughput is None:
+                self._throughput = throughput
+            else:
+                self._throughput = (
+                    self.throughput_weight * throughput +
+                    (1 - self.throughput_weight) * self._throughput
+                )
+
+    def get_part_size(self, file_size, max_concurrency):
+        """Get the size of each ranged request to download an object with
+
+        :type file_size: int
+        :param file_size: The size of the object being downloaded
+
+        :type max_concurrency: int
+        :param max_concurrency: The maximum number of requests that can be
+            made concurrently
+
+        :returns: The part size to use, within the configured bounds.
+        """
+        num_parts = self.parts_per_request_slot * max_concurrency
+        part_size = int(math.ceil(file_size / float(num_parts)))
+        throughput = self._throughput
+        if throughput is not None:
+            min_size_for_throughput = int(throughput * self.min_part_duration)
+            if part_size < min_size_for_throughput:
+                logger.debug(
+                    "Part size would download in less than %s seconds at the "
+                    "observed throughput. Setting to %s from %s." % (
+                        self.min_part_duration, min_size_for_throughput,
+                        part_size))
+                part_size = min_size_for_throughput
+        return min(max(part_size, self.min_size), self.max_size)
+
+
+class UploadPartSizePlanner(object):
+    def __init__(self, min_size=MIN_UPLOAD_CHUNKSIZE,
+                 max_size=MAX_PLANNED_UPLOAD_PART_SIZE,
+                 parts_per_request_slot=4):
+        """Plans the size of each part of a multipart upload or copy
+
+        The size is chosen so that an object is split into roughly
+        ``parts_per_request_slot`` parts for every request that can be made
+        concurrently, so smaller objects are still spread across all of the
+        request threads and larger objects are sent in larger parts instead
+        of an excessive amount of requests. The size returned may still need
+        to be adjusted to fit within the limits of S3.
+
+        :param min_size: The smallest part size to use
+        :param max_size: The largest part size to use unless a larger size
+            is needed to stay within the maximum number of parts.
+        :param parts_per_request_slot: The number of parts to aim for per
+            concurrent request
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.parts_per_request_slot = parts_per_request_slot
+
+    def get_part_size(self, file_size, max_concurrency):
+        """Get the size of each part to transfer an object with
+
+        :type file_size: int
+        :param file_size: The size of the object being transferred
+
+        :type max_concurrency: int
+        :param max_concurrency: The maximum number of requests that can be
+            made concurrently
+
+        :returns: The part size to use, within the configured bounds.
+        """
+        num_parts = self.parts_per_request_slot * max_concurrency
+        part_size = int(math.ceil(file_size / float(num_parts)))
+        return min(max(part_size, self.min_size), self.max_size)
+
+
+class ETagCalculator(object):
+    def __init__(self, size, part_size=None, max_in_memory_size=None,
+                 spill_file_factory=None):
+        """Calculates the ETag of an object from its content as it streams
+
+        Content can be provided in any order and from several threads. Each
+        part of the object is hashed on its own, so the content of different
+        parts never waits on each other. Content that comes after content
+        of the same part that has not been provided yet is held until
+        everything before it has been provided, so that each part is always
+        hashed in order.
+
+        :param size: The size of the object
+        :param part_size: The size of each part if the object was uploaded
+            with a multipart upload, in which case the ETag is the MD5 of
+            the MD5 of each of its parts. If not provided, the ETag is the
+            MD5 of the entire object.
+        :param max_in_memory_size: The maximum number of bytes of held
+            content to keep in memory. Any other held content is spilled to
+            a temporary file. If not provided, all held content is kept in
+            memory.
+        :param spill_file_factory: A callable that returns the file-like
+            object to spill held content to. Defaults to creating an
+            anonymous temporary file.
+        """
+        self.size = size
+        self.part_size = part_size
+        num_parts = 1
+        if part_size is not None:
+            num_parts = max(int(math.ceil(size / float(part_size))), 1)
+        self._md5s = [hashlib.md5() for _ in range(num_parts)]
+        self._positions = [
+            self._get_part_start(i) for i in range(num_parts)]
+        self._pending = [[] for _ in range(num_parts)]
+        self._part_locks = [threading.Lock() for _ in range(num_parts)]
+        self._num_pending = 0
+        self._max_in_memory_size = max_in_memory_size
+        self._in_memory_size = 0
+        if spill_file_factory is None:
+            spill_file_factory = tempfile.TemporaryFile
+        self._spill_file_factory = spill_file_factory
+        self._spill_file = None
+        self._num_spilled = 0
+        self._spill_lock = threading.Lock()
+
+    def update(self, offset, data):
+        """Provide content of the object
+
+        :param offset: The offset of the content in the object
+        :param data: The content. Content provided more than once is only
+            hashed the first time.
+        """
+        data = memoryview(data)
+        while data:
+            index = self._get_part_index(offset)
+            amount = min(len(data), self._get_part_end(index) - offset)
+            if index >= len(self._md5s) or amount <= 0:
+                return
+            with self._part_locks[index]:
+                self._update_part(index, offset, data[:amount])
+            offset += amount
+            data = data[amount:]
+
+    def get_etag(self):
+        """Get the ETag of the object from all of the provided content
+
+        :raises ValueError: If not all of the content has been provided
+        """
+        provided = sum(
+            position - self._get_part_start(i)
+            for i, position in enumerate(self._positions))
+        if provided < self.size:
+            raise ValueError(
+                'Only %s of %s bytes were provided to calculate the ETag '
+                'from.' % (provided, self.size))
+        if self.part_size is None:
+            return self._md5s[0].hexdigest()
+        return '%s-%s' % (
+            hashlib.md5(b''.join(md5.digest() for md5 in self._md5s))
+            .hexdigest(),
+            len(self._md5s))
+
+    def close(self):
+        """Discard any held content spilled to the temporary file"""
+        with self._spill_lock:
+            self._close_spill_file()
+
+    def _get_part_index(self, offset):
+        if self.part_size is None:
+            return 0
+        return offset // self.part_size
+
+    def _get_part_start(self, index):
+        if self.part_size is None:
+            return 0
+        return index * self.part_size
+
+    def _get_part_end(self, index):
+        if self.part_size is None:
+            return self.size
+        return min((index + 1) * self.part_size, self.size)
+
+    def _update_part(self, index, offset, data):
+        pending = self._pending[index]
+        if offset > self._positions[index]:
+            heapq.heappush(pending, (offset,) + self._defer(data))
+            return
+        self._hash_part(index, offset, data)
+        while pending and pending[0][0] <= self._positions[index]:
+            offset, _, data, spill_location = heapq.heappop(pending)
+            self._hash_part(
+                index, offset, self._undefer(data, spill_location))
+
+    def _hash_part(self, index, offset, data):
+        data = memoryview(data)[self._positions[index] - offset:]
+        self._md5s[index].update(data)
+        self._positions[index] += len(data)
+
+    def _defer(self, data):
+        # Returns an id to order held content at the same offset by, the
+        # content to keep in memory and where it was spilled to if it was
+        # spilled.
+        with self._spill_lock:
+            self._num_pending += 1
+            if self._max_in_memory_size is None or \
+                    self._in_memory_size + len(data) <= \
+                    self._max_in_memory_size:
+                self._in_memory_size += len(data)
+                # The data may be a view of a buffer that is reused once
+                # it is written, so a copy is held on to instead.
+                return self._num_pending, data.tobytes(), None
+            if self._spill_file is None:
+                self._spill_file = self._spill_file_factory()
+            self._spill_file.seek(0, 2)
+            position = self._spill_file.tell()
+            self._spill_file.write(data)
+            self._num_spilled += 1
+            return self._num_pending, None, (position, len(data))
+
+    def _undefer(self, data, spill_location):
+        with self._spill_lock:
+            if spill_location is None:
+                self._in_memory_size -= len(data)
+                return data
+            position, size = spill_location
+            self._spill_file.seek(position)
+            data = self._spill_file.read(size)
+            self._num_spilled -= 1
+            if not self._num_spilled:
+                # Nothing is left in the temporary file so it can be closed
+                # instead of growing with each spilled part of the content.
+                self._close_spill_file()
+            return data
+
+    def _close_spill_file(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+
+class DownloadWindowPlanner(object):
+    def __init__(self, semaphore, max_size, min_count=1,
+                 measurement_weight=0.2):
+        """Plans the window of parts that downloads can have in memory
+
+        The window is resized so that parts are requested far enough ahead
+        of when their data is written to keep the output busy, based on how
+        long it takes to download a part and how fast the output is
+        drained. A slow output gets a small window so downloaded data does
+        not pile up in memory, and a fast output or slow requests get a
+        large window so the output does not wait on requests.
+
+        :type semaphore: SlidingWindowSemaphore
+        :param semaphore: The semaphore limiting the window of parts
+        :param max_size: The most bytes of parts the window can hold
+        :param min_count: The fewest parts the window can hold
+        :param measurement_weight: How much weight a new measurement is
+            given over previous measurements.
+        """
+        self._semaphore = semaphore
+        self.max_size = max_size
+        self.min_count = min_count
+        self.measurement_weight = measurement_weight
+        self._part_size = None
+        self._request_duration = None
+        self._drain_rate = None
+        self._count = None
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        """The number of parts in the window
+
+        This is None if the window has not been resized yet.
+        """
+        return self._count
+
+    def record_request(self, num_bytes, seconds):
+        """Record a completed request for a part
+
+        :param num_bytes: The number of bytes downloaded by the request
+        :param seconds: The number of seconds the request took
+        """
+        if num_bytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._part_size = self._get_average(self._part_size, num_bytes)
+            self._request_duration = self._get_average(
+                self._request_duration, seconds)
+            self._resize()
+
+    def record_drain(self, num_bytes, seconds):
+        """Record data being written to the output of a download
+
+        :param num_bytes: The number of bytes written
+        :param seconds: The number of seconds the write took
+        """
+        if num_bytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._drain_rate = self._get_average(
+                self._drain_rate, num_bytes / float(seconds))
+            self._resize()
+
+    def _get_average(self, average, value):
+        if average is None:
+            return value
+        return (
+            self.measurement_weight * value +
+            (1 - self.measurement_weight) * average
+        )
+
+    def _resize(self):
+        if self._part_size is None or self._drain_rate is None:
+            return
+        max_count = max(self.min_count, int(self.max_size // self._part_size))
+        # Enough parts to cover what is drained while a part downloads, plus
+        # the part being drained.
+        count = int(math.ceil(
+            self._drain_rate * self._request_duration / self._part_size)) + 1
+        count = min(max(count, self.min_count), max_count)
+        if count != self._count:
+            logger.debug(
+                "Resizing download window to %s parts from %s." % (
+                    count, self._count))
+            self._count = count
+            self._semaphore.resize(count)
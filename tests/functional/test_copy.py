@@ -398,6 +398,42 @@ class TestMultipartCopy(BaseCopyTest):
         future.result()
         self.stubber.assert_no_pending_responses()
 
+    def test_copy_with_multipart_chunksize(self):
+        # The chunksize provided for the call is used over the one in the
+        # config.
+        self.config.multipart_chunksize = MIN_UPLOAD_CHUNKSIZE * 2
+        self._manager = TransferManager(self.client, self.config)
+        head_params, add_copy_kwargs = self._get_expected_params()
+        self.add_head_object_response(expected_params=head_params)
+        self.add_successful_copy_responses(**add_copy_kwargs)
+
+        call_kwargs = self.create_call_kwargs()
+        call_kwargs['multipart_chunksize'] = MIN_UPLOAD_CHUNKSIZE
+        future = self.manager.copy(**call_kwargs)
+        future.result()
+        self.stubber.assert_no_pending_responses()
+
+    def test_copy_with_adaptive_multipart_chunksize(self):
+        # With one concurrent request, the object is split into as few
+        # parts as possible of the minimum part size instead of using the
+        # chunksize in the config.
+        self.config.multipart_chunksize = MIN_UPLOAD_CHUNKSIZE * 2
+        self.config.adaptive_multipart_chunksize = True
+        self._manager = TransferManager(self.client, self.config)
+        head_params, add_copy_kwargs = self._get_expected_params()
+        self.add_head_object_response(expected_params=head_params)
+        self.add_successful_copy_responses(**add_copy_kwargs)
+
+        future = self.manager.copy(**self.create_call_kwargs())
+        future.result()
+        self.stubber.assert_no_pending_responses()
+
+    def test_copy_with_invalid_multipart_chunksize(self):
+        call_kwargs = self.create_call_kwargs()
+        call_kwargs['multipart_chunksize'] = 0
+        with self.assertRaises(ValueError):
+            self.manager.copy(**call_kwargs)
+
     def test_copy_with_extra_args(self):
         # This extra argument should be added to the head object,
         # the create multipart upload, and upload part copy.
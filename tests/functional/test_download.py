@@ -11,13 +11,16 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 import copy
+import hashlib
 import os
 import tempfile
 import time
 import shutil
 import glob
 
+import mock
 from botocore.exceptions import ClientError
+from botocore.exceptions import ParamValidationError
 
 from tests import StreamWithError
 from tests import FileSizeProvider
@@ -25,14 +28,18 @@ from tests import RecordingSubscriber
 from tests import RecordingOSUtils
 from tests import NonSeekableWriter
 from tests import BaseGeneralInterfaceTest
+from tests import StubbedClientTest
 from tests import skip_if_windows
 from tests import skip_if_using_serial_implementation
 from s3transfer.compat import six
 from s3transfer.compat import SOCKET_ERROR
+from s3transfer.exceptions import CancelledError
+from s3transfer.exceptions import DownloadIntegrityError
 from s3transfer.exceptions import RetriesExceededError
 from s3transfer.manager import TransferManager
 from s3transfer.manager import TransferConfig
 from s3transfer.download import GetObjectTask
+from s3transfer.utils import OSUtils
 
 
 class BaseDownloadTest(BaseGeneralInterfaceTest):
@@ -160,6 +167,180 @@ class BaseDownloadTest(BaseGeneralInterfaceTest):
         with open(self.filename, 'rb') as f:
             self.assertEqual(self.content, f.read())
 
+    def test_download_with_multiple_io_threads(self):
+        self.config.max_io_concurrency = 4
+        self._manager = TransferManager(self.client, self.config)
+        filenames = []
+        futures = []
+        for i in range(4):
+            self.add_head_object_response()
+            self.add_successful_get_object_responses()
+            filename = os.path.join(self.tempdir, 'myfile%s' % i)
+            filenames.append(filename)
+            futures.append(self.manager.download(
+                self.bucket, self.key, filename, self.extra_args))
+            # The stubbed responses are consumed in order so let each
+            # download finish before setting up the next one.
+            futures[-1].result()
+
+        for filename in filenames:
+            with open(filename, 'rb') as f:
+                self.assertEqual(self.content, f.read())
+
+    def test_download_with_buffer_pool(self):
+        self.config.io_chunksize = 3
+        self.config.download_buffer_pool_size = 2
+        self._manager = TransferManager(self.client, self.config)
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_for_nonseekable_filelike_obj_with_buffer_pool(self):
+        self.config.io_chunksize = 3
+        self.config.download_buffer_pool_size = 2
+        self._manager = TransferManager(self.client, self.config)
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        with open(self.filename, 'wb') as f:
+            future = self.manager.download(
+                self.bucket, self.key, NonSeekableWriter(f), self.extra_args)
+            future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_with_coalesced_writes(self):
+        self.config.io_chunksize = 3
+        self.config.max_coalesced_write_size = 6
+        self._manager = TransferManager(self.client, self.config)
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_for_nonseekable_filelike_obj_with_coalesced_writes(
+            self):
+        self.config.io_chunksize = 3
+        self.config.max_coalesced_write_size = 6
+        self._manager = TransferManager(self.client, self.config)
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        with open(self.filename, 'wb') as f:
+            future = self.manager.download(
+                self.bucket, self.key, NonSeekableWriter(f), self.extra_args)
+            future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_to_several_targets(self):
+        self.config.io_chunksize = 3
+        self.config.download_buffer_pool_size = 2
+        self._manager = TransferManager(self.client, self.config)
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        other_filename = os.path.join(self.tempdir, 'myotherfile')
+        stream = six.BytesIO()
+        future = self.manager.download(
+            self.bucket, self.key,
+            [self.filename, other_filename, NonSeekableWriter(stream)],
+            self.extra_args)
+        future.result()
+
+        for filename in [self.filename, other_filename]:
+            with open(filename, 'rb') as f:
+                self.assertEqual(self.content, f.read())
+        self.assertEqual(self.content, stream.getvalue())
+
+    def test_download_to_several_targets_failure(self):
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        bad_filename = os.path.join(self.tempdir, 'no-exist', 'myfile')
+        future = self.manager.download(
+            self.bucket, self.key, [self.filename, bad_filename],
+            self.extra_args)
+        with self.assertRaises(IOError):
+            future.result()
+        self.assertEqual(os.listdir(self.tempdir), [])
+
+    def test_download_into_buffer(self):
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        buffer = bytearray(len(self.content))
+        future = self.manager.download_into(
+            self.bucket, self.key, buffer, self.extra_args)
+        future.result()
+
+        self.assertEqual(buffer, self.content)
+
+    def test_download_into_grows_bytearray(self):
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        buffer = bytearray()
+        future = self.manager.download_into(
+            self.bucket, self.key, buffer, self.extra_args)
+        future.result()
+
+        self.assertEqual(buffer, self.content)
+
+    def test_download_into_buffer_too_small(self):
+        self.add_head_object_response()
+
+        buffer = memoryview(bytearray(len(self.content) - 1))
+        future = self.manager.download_into(
+            self.bucket, self.key, buffer, self.extra_args)
+        with self.assertRaises(ValueError):
+            future.result()
+
+    def test_download_into_requires_writable_buffer(self):
+        with self.assertRaises(ValueError):
+            self.manager.download_into(
+                self.bucket, self.key, b'readonly', self.extra_args)
+
+    def test_open_download_stream(self):
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        with self.manager.open_download_stream(
+                self.bucket, self.key, self.extra_args) as stream:
+            self.assertEqual(stream.read(), self.content)
+            stream.future.result()
+
+    def test_open_download_stream_with_small_readahead(self):
+        self.add_head_object_response()
+        self.add_successful_get_object_responses()
+
+        with self.manager.open_download_stream(
+                self.bucket, self.key, self.extra_args,
+                max_readahead_size=1) as stream:
+            self.assertEqual(stream.read(), self.content)
+
+    def test_open_download_stream_failure(self):
+        self.add_head_object_response()
+        self.stubber.add_client_error('get_object')
+
+        with self.manager.open_download_stream(
+                self.bucket, self.key, self.extra_args) as stream:
+            with self.assertRaises(ClientError):
+                stream.read()
+
     def test_download_for_seekable_filelike_obj(self):
         self.add_head_object_response()
         self.add_successful_get_object_responses()
@@ -287,6 +468,38 @@ class BaseDownloadTest(BaseGeneralInterfaceTest):
         ]
         self.assertEqual(-3, progress_byte_amts[1])
 
+    def test_retry_resumes_from_offset(self):
+        self.add_head_object_response()
+        self.stubber.add_response(
+            'get_object',
+            {
+                'Body': StreamWithError(
+                    copy.deepcopy(self.stream), SOCKET_ERROR, 1),
+                'ETag': '"myetag"'
+            }
+        )
+        # The retry should only request what has not been downloaded yet.
+        self.stubber.add_response(
+            'get_object',
+            {'Body': six.BytesIO(self.content[3:]), 'ETag': '"myetag"'}
+        )
+
+        recorder_subscriber = RecordingSubscriber()
+        self.config.io_chunksize = 3
+        self.config.multipart_threshold = len(self.content) + 1
+        future = self.manager.download(
+            subscribers=[recorder_subscriber], **self.create_call_kwargs())
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+        # No progress should have been rewound.
+        self.assertEqual(
+            recorder_subscriber.calculate_bytes_seen(), len(self.content))
+        for call in recorder_subscriber.on_progress_calls:
+            self.assertGreater(call['bytes_transferred'], 0)
+
     def test_can_provide_file_size(self):
         self.add_successful_get_object_responses()
 
@@ -364,6 +577,21 @@ class TestNonRangedDownload(BaseDownloadTest):
         with open(self.filename, 'rb') as f:
             self.assertEqual(self.content, f.read())
 
+    def test_download_with_priority(self):
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+        self.add_head_object_response(expected_params)
+        self.add_successful_get_object_responses(expected_params)
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, priority=5)
+        self.assertEqual(future.meta.call_args.priority, 5)
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
     def test_allowed_copy_params_are_valid(self):
         op_model = self.client.meta.service_model.operation_model('GetObject')
         for allowed_upload_arg in self._manager.ALLOWED_DOWNLOAD_ARGS:
@@ -382,6 +610,56 @@ class TestNonRangedDownload(BaseDownloadTest):
         with open(self.filename, 'rb') as f:
             self.assertEqual(b'', f.read())
 
+    def test_download_without_head_object(self):
+        self.config.skip_download_head_object = True
+        self._manager = TransferManager(self.client, self.config)
+        self.stubber.add_response(
+            'get_object',
+            {
+                'Body': self.stream,
+                'ContentRange': 'bytes 0-9/%s' % len(self.content)
+            },
+            {
+                'Bucket': self.bucket, 'Key': self.key,
+                'Range': 'bytes=0-%s' % (self.config.multipart_chunksize - 1)
+            }
+        )
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_without_head_object_closes_body_on_failure(self):
+        self.config.skip_download_head_object = True
+        self.config.verify_downloads = True
+        self._manager = TransferManager(self.client, self.config)
+        self.stubber.add_response(
+            'get_object',
+            {
+                'Body': self.stream,
+                'ContentRange': 'bytes 0-9/%s' % len(self.content),
+                'ETag': '"myetag-2"'
+            }
+        )
+        # Looking up the size of the parts of the object to verify the
+        # download with fails before the body of the first range is read.
+        # Client errors only skip verifying the download, so the lookup
+        # fails with some other error.
+        exception = Exception('failed')
+        with mock.patch.object(self.client, 'head_object',
+                               side_effect=exception):
+            future = self.manager.download(
+                self.bucket, self.key, self.filename, self.extra_args)
+            with self.assertRaises(Exception) as context:
+                future.result()
+
+        self.assertIs(context.exception, exception)
+        self.stubber.assert_no_pending_responses()
+        self.assertTrue(self.stream.closed)
+
     def test_uses_bandwidth_limiter(self):
         self.content = b'a' * 1024 * 1024
         self.stream = six.BytesIO(self.content)
@@ -461,6 +739,79 @@ class TestRangedDownload(BaseDownloadTest):
             {'bytes_transferred': 2},
         ]
 
+    def wait_until(self, predicate, timeout=5):
+        end_time = time.time() + timeout
+        while not predicate() and time.time() < end_time:
+            time.sleep(0.01)
+        return predicate()
+
+    def test_unread_download_stream_does_not_hold_up_other_downloads(self):
+        # With a single request thread and a single submission thread, the
+        # other download can only go through if neither is kept waiting on
+        # the stream to be read.
+        self.config.max_submission_concurrency = 1
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {'Bucket': self.bucket, 'Key': self.key}
+        other_params = {'Bucket': self.bucket, 'Key': 'otherkey'}
+        responses = self.create_stubbed_responses()
+        responses[0]['expected_params'] = expected_params
+        responses[1]['expected_params'] = dict(
+            expected_params, Range='bytes=0-3')
+        for response in responses[:2]:
+            self.stubber.add_response(**response)
+
+        subscriber = RecordingSubscriber()
+        stream = self.manager.open_download_stream(
+            self.bucket, self.key, subscribers=[subscriber],
+            max_readahead_size=1)
+        # Only the first range fits in the readahead window until the
+        # stream is read.
+        self.assertTrue(self.wait_until(
+            lambda: subscriber.calculate_bytes_seen() == 4))
+
+        self.stubber.add_response(
+            'head_object', {'ContentLength': 2}, other_params)
+        self.stubber.add_response(
+            'get_object', {'Body': six.BytesIO(b'ab')},
+            dict(other_params, Range='bytes=0-'))
+        future = self.manager.download(
+            self.bucket, 'otherkey', self.filename)
+        # The only request thread is not stuck on the unread stream.
+        self.assertTrue(self.wait_until(future.done))
+        future.result()
+
+        responses[2]['expected_params'] = dict(
+            expected_params, Range='bytes=4-7')
+        responses[3]['expected_params'] = dict(
+            expected_params, Range='bytes=8-')
+        for response in responses[2:]:
+            self.stubber.add_response(**response)
+        with stream:
+            self.assertEqual(stream.read(), self.content)
+            stream.future.result()
+
+    def test_cancel_unread_download_stream(self):
+        expected_params = {'Bucket': self.bucket, 'Key': self.key}
+        responses = self.create_stubbed_responses()
+        responses[0]['expected_params'] = expected_params
+        responses[1]['expected_params'] = dict(
+            expected_params, Range='bytes=0-3')
+        for response in responses[:2]:
+            self.stubber.add_response(**response)
+
+        subscriber = RecordingSubscriber()
+        stream = self.manager.open_download_stream(
+            self.bucket, self.key, subscribers=[subscriber],
+            max_readahead_size=1)
+        self.assertTrue(self.wait_until(
+            lambda: subscriber.calculate_bytes_seen() == 4))
+        # Nothing is left waiting on the stream, so the download is done
+        # as soon as it is cancelled.
+        stream.future.cancel()
+        with self.assertRaises(CancelledError):
+            stream.future.result()
+        self.stubber.assert_no_pending_responses()
+
     def test_download(self):
         self.extra_args['RequestPayer'] = 'requester'
         expected_params = {
@@ -480,3 +831,492 @@ class TestRangedDownload(BaseDownloadTest):
         # Ensure that the contents are correct
         with open(self.filename, 'rb') as f:
             self.assertEqual(self.content, f.read())
+
+    def test_download_with_mmap(self):
+        self.config.use_mmap_downloads = True
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+        expected_ranges = ['bytes=0-3', 'bytes=4-7', 'bytes=8-']
+        self.add_head_object_response(expected_params)
+        self.add_successful_get_object_responses(
+            expected_params, expected_ranges)
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        # Ensure that the contents are correct
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_with_adaptive_part_size(self):
+        self.config.adaptive_download_part_size = True
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+        self.add_head_object_response(expected_params)
+        # The object is smaller than the minimum part size so it should
+        # be downloaded with a single ranged request.
+        self.stubber.add_response(
+            'get_object', {'Body': six.BytesIO(self.content)},
+            dict(expected_params, Range='bytes=0-'))
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_with_adaptive_window(self):
+        self.config.adaptive_download_window = True
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+        expected_ranges = ['bytes=0-3', 'bytes=4-7', 'bytes=8-']
+        self.add_head_object_response(expected_params)
+        self.add_successful_get_object_responses(
+            expected_params, expected_ranges)
+
+        with open(self.filename, 'wb') as f:
+            future = self.manager.download(
+                self.bucket, self.key, NonSeekableWriter(f),
+                self.extra_args)
+            future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_download_resumes_after_failure(self):
+        self.config.resumable_downloads = True
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+            'IfMatch': '"myetag"',
+        }
+        head_response = {
+            'ContentLength': len(self.content), 'ETag': '"myetag"'}
+        self.stubber.add_response('head_object', head_response)
+        self.stubber.add_response(
+            'get_object', {'Body': six.BytesIO(self.content[0:4])},
+            dict(expected_params, Range='bytes=0-3'))
+        self.stubber.add_client_error('get_object')
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        with self.assertRaises(ClientError):
+            future.result()
+        self.assertFalse(os.path.exists(self.filename))
+
+        # Downloading again should only request the ranges that are missing.
+        self.stubber.add_response('head_object', head_response)
+        self.stubber.add_response(
+            'get_object', {'Body': six.BytesIO(self.content[4:8])},
+            dict(expected_params, Range='bytes=4-7'))
+        self.stubber.add_response(
+            'get_object', {'Body': six.BytesIO(self.content[8:])},
+            dict(expected_params, Range='bytes=8-9'))
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+        self.assertEqual(os.listdir(self.tempdir), ['myfile'])
+
+    def test_download_without_head_object(self):
+        self.config.skip_download_head_object = True
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+        for start, end in [(0, 3), (4, 7), (8, 9)]:
+            self.stubber.add_response(
+                'get_object',
+                {
+                    'Body': six.BytesIO(self.content[start:end + 1]),
+                    'ContentRange': 'bytes %s-%s/10' % (start, end)
+                },
+                dict(expected_params, Range='bytes=%s-%s' % (start, end))
+            )
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, self.extra_args)
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+
+class TestByteRangeDownload(StubbedClientTest):
+    def setUp(self):
+        super(TestByteRangeDownload, self).setUp()
+        self.config = TransferConfig(
+            max_request_concurrency=1, multipart_chunksize=4,
+            max_download_range_gap_size=2)
+        self.manager = TransferManager(self.client, self.config)
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'myfile')
+        self.bucket = 'mybucket'
+        self.key = 'mykey'
+        self.content = b'0123456789abcdefghij'
+        self.expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+
+    def tearDown(self):
+        super(TestByteRangeDownload, self).tearDown()
+        shutil.rmtree(self.tempdir)
+
+    def add_head_object_response(self):
+        self.stubber.add_response(
+            'head_object', {'ContentLength': len(self.content)},
+            self.expected_params)
+
+    def add_get_object_responses(self, ranges):
+        for start, end in ranges:
+            self.stubber.add_response(
+                'get_object',
+                {'Body': six.BytesIO(self.content[start:end])},
+                dict(self.expected_params,
+                     Range='bytes=%s-%s' % (start, end - 1))
+            )
+
+    def test_download_byte_range(self):
+        self.add_head_object_response()
+        self.add_get_object_responses([(3, 7), (7, 11), (11, 12)])
+        subscriber = RecordingSubscriber()
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, byte_range=(3, 12),
+            subscribers=[subscriber])
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content[3:12], f.read())
+        self.assertEqual(future.meta.size, 9)
+        self.assertEqual(subscriber.calculate_bytes_seen(), 9)
+
+    def test_download_byte_range_to_end_of_object(self):
+        self.add_head_object_response()
+        self.add_get_object_responses([(14, 18), (18, 20)])
+
+        buffer = bytearray()
+        future = self.manager.download(
+            self.bucket, self.key, buffer, byte_range=(14, None))
+        future.result()
+
+        self.assertEqual(self.content[14:], buffer)
+
+    def test_download_byte_range_past_end_of_object(self):
+        self.add_head_object_response()
+        self.add_get_object_responses([(18, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, byte_range=(18, 100))
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content[18:], f.read())
+
+    def test_download_empty_byte_range(self):
+        self.add_head_object_response()
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename, byte_range=(5, 5))
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(b'', f.read())
+
+    def test_download_invalid_byte_range(self):
+        for byte_range in [(-1, 5), (5, 4)]:
+            with self.assertRaises(ValueError):
+                self.manager.download(
+                    self.bucket, self.key, self.filename,
+                    byte_range=byte_range)
+
+    def test_download_ranges(self):
+        self.add_head_object_response()
+        # The first two ranges are close enough to be requested together,
+        # while the last one is requested on its own.
+        self.add_get_object_responses([(0, 4), (4, 6), (15, 17)])
+        subscriber = RecordingSubscriber()
+
+        future = self.manager.download_ranges(
+            self.bucket, self.key, [(15, 2), (0, 2), (4, 2)], self.filename,
+            subscribers=[subscriber])
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(b'fg0145', f.read())
+        self.assertEqual(future.meta.size, 6)
+        self.assertEqual(subscriber.calculate_bytes_seen(), 6)
+
+    def test_download_ranges_with_mmap_downloads(self):
+        self.config.use_mmap_downloads = True
+        self.config.multipart_threshold = 1
+        self.manager = TransferManager(
+            self.client, self.config, OSUtils(drop_written_pages=True))
+        self.add_head_object_response()
+        self.add_get_object_responses([(0, 4), (4, 6), (15, 17)])
+
+        future = self.manager.download_ranges(
+            self.bucket, self.key, [(15, 2), (0, 2), (4, 2)], self.filename)
+        future.result()
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(b'fg0145', f.read())
+
+    def test_download_ranges_into_bytearray(self):
+        self.add_head_object_response()
+        self.add_get_object_responses([(0, 4), (4, 6), (15, 17)])
+
+        buffer = bytearray()
+        future = self.manager.download_ranges(
+            self.bucket, self.key, [(15, 2), (0, 2), (4, 2)], buffer)
+        future.result()
+
+        self.assertEqual(b'fg0145', buffer)
+
+    def test_download_ranges_into_memoryview(self):
+        self.add_head_object_response()
+        self.add_get_object_responses([(0, 4), (4, 6), (15, 17)])
+
+        buffer = bytearray(6)
+        future = self.manager.download_ranges(
+            self.bucket, self.key, [(15, 2), (0, 2), (4, 2)],
+            memoryview(buffer))
+        future.result()
+
+        self.assertEqual(b'fg0145', buffer)
+
+    def test_download_overlapping_ranges_to_nonseekable_fileobj(self):
+        self.add_head_object_response()
+        self.add_get_object_responses([(2, 6), (6, 8)])
+
+        stream = six.BytesIO()
+        subscriber = RecordingSubscriber()
+        future = self.manager.download_ranges(
+            self.bucket, self.key, [(4, 4), (2, 4)],
+            NonSeekableWriter(stream), subscribers=[subscriber])
+        future.result()
+
+        self.assertEqual(b'45672345', stream.getvalue())
+        # The overlapping bytes are written, and reported, for each range.
+        self.assertEqual(future.meta.size, 8)
+        self.assertEqual(subscriber.calculate_bytes_seen(), 8)
+
+    def test_download_invalid_ranges(self):
+        with self.assertRaises(ValueError):
+            self.manager.download_ranges(
+                self.bucket, self.key, [(0, 2), (4, -1)], self.filename)
+
+
+class TestVerifiedDownload(StubbedClientTest):
+    def setUp(self):
+        super(TestVerifiedDownload, self).setUp()
+        self.config = TransferConfig(
+            max_request_concurrency=1, multipart_threshold=8,
+            multipart_chunksize=8, verify_downloads=True)
+        self.manager = TransferManager(self.client, self.config)
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'myfile')
+        self.bucket = 'mybucket'
+        self.key = 'mykey'
+        self.content = b'0123456789abcdefghij'
+        self.etag = hashlib.md5(self.content).hexdigest()
+        self.expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+        }
+
+    def tearDown(self):
+        super(TestVerifiedDownload, self).tearDown()
+        shutil.rmtree(self.tempdir)
+
+    def get_multipart_etag(self, part_size):
+        digests = [
+            hashlib.md5(self.content[i:i + part_size]).digest()
+            for i in range(0, len(self.content), part_size)
+        ]
+        return '%s-%s' % (
+            hashlib.md5(b''.join(digests)).hexdigest(), len(digests))
+
+    def add_head_object_response(self, etag, **kwargs):
+        response = {'ContentLength': len(self.content), 'ETag': '"%s"' % etag}
+        response.update(kwargs)
+        self.stubber.add_response(
+            'head_object', response, self.expected_params)
+
+    def add_get_object_responses(self, ranges=None):
+        if ranges is None:
+            self.stubber.add_response(
+                'get_object', {'Body': six.BytesIO(self.content)},
+                self.expected_params)
+            return
+        for start, end in ranges:
+            range_end = end - 1 if end < len(self.content) else ''
+            self.stubber.add_response(
+                'get_object',
+                {'Body': six.BytesIO(self.content[start:end])},
+                dict(self.expected_params,
+                     Range='bytes=%s-%s' % (start, range_end))
+            )
+
+    def test_verifies_download(self):
+        self.config.multipart_threshold = 100
+        self.add_head_object_response(self.etag)
+        self.add_get_object_responses()
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(future.meta.digest, self.etag)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_verifies_ranged_download(self):
+        self.add_head_object_response(self.etag)
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.assertEqual(future.meta.digest, self.etag)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_verifies_download_of_multipart_object(self):
+        etag = self.get_multipart_etag(8)
+        self.add_head_object_response(etag)
+        self.stubber.add_response(
+            'head_object', {'ContentLength': 8},
+            dict(self.expected_params, PartNumber=1))
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.assertEqual(future.meta.digest, etag)
+
+    def test_requests_whole_parts_of_multipart_object(self):
+        etag = self.get_multipart_etag(6)
+        self.add_head_object_response(etag)
+        self.stubber.add_response(
+            'head_object', {'ContentLength': 6},
+            dict(self.expected_params, PartNumber=1))
+        # The configured part size is rounded down to a whole number of
+        # the parts that the object was uploaded in.
+        self.add_get_object_responses([(0, 6), (6, 12), (12, 18), (18, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(future.meta.digest, etag)
+
+    def test_verifies_download_into_buffer(self):
+        self.add_head_object_response(self.etag)
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        buffer = bytearray()
+        future = self.manager.download_into(self.bucket, self.key, buffer)
+        future.result()
+
+        self.assertEqual(future.meta.digest, self.etag)
+        self.assertEqual(self.content, buffer)
+
+    def test_mismatched_download_fails(self):
+        etag = hashlib.md5(b'other content').hexdigest()
+        self.add_head_object_response(etag)
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        with self.assertRaises(DownloadIntegrityError):
+            future.result()
+
+        self.assertEqual(future.meta.digest, self.etag)
+        # The file is never moved into place and nothing is left behind.
+        self.assertEqual(os.listdir(self.tempdir), [])
+
+    def test_does_not_verify_kms_encrypted_object(self):
+        etag = hashlib.md5(b'other content').hexdigest()
+        self.add_head_object_response(etag, ServerSideEncryption='aws:kms')
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.assertIsNone(future.meta.digest)
+
+    def test_does_not_verify_multipart_object_if_part_size_unknown(self):
+        self.add_head_object_response(self.get_multipart_etag(8))
+        self.stubber.add_client_error(
+            'head_object', http_status_code=400,
+            expected_params=dict(self.expected_params, PartNumber=1))
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.stubber.assert_no_pending_responses()
+        self.assertIsNone(future.meta.digest)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(self.content, f.read())
+
+    def test_does_not_verify_multipart_object_if_part_number_unsupported(
+            self):
+        self.add_head_object_response(self.get_multipart_etag(8))
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+        head_object = self.client.head_object
+
+        def head_object_without_part_number(**kwargs):
+            if 'PartNumber' in kwargs:
+                raise ParamValidationError(report='Unknown parameter')
+            return head_object(**kwargs)
+
+        with mock.patch.object(self.client, 'head_object',
+                               head_object_without_part_number):
+            future = self.manager.download(
+                self.bucket, self.key, self.filename)
+            future.result()
+
+        self.stubber.assert_no_pending_responses()
+        self.assertIsNone(future.meta.digest)
+
+    def test_does_not_verify_multipart_object_with_uneven_parts(self):
+        self.add_head_object_response(self.get_multipart_etag(8))
+        self.stubber.add_response(
+            'head_object', {'ContentLength': 5},
+            dict(self.expected_params, PartNumber=1))
+        self.add_get_object_responses([(0, 8), (8, 16), (16, 20)])
+
+        future = self.manager.download(
+            self.bucket, self.key, self.filename)
+        future.result()
+
+        self.assertIsNone(future.meta.digest)
@@ -95,11 +95,13 @@ class BaseUploadTest(BaseGeneralInterfaceTest):
 
     def _stream_body(self, body):
         read_amt = 8 * 1024
+        # Bodies read from buffers return views of the data, so it is
+        # collected into bytes.
+        collected_body = b''
         data = body.read(read_amt)
-        collected_body = data
         while data:
-            data = body.read(read_amt)
             collected_body += data
+            data = body.read(read_amt)
         return collected_body
 
     @property
@@ -181,6 +183,14 @@ class TestNonMultipartUpload(BaseUploadTest):
         self.assert_expected_client_calls_were_correct()
         self.assert_put_object_body_was_correct()
 
+    def test_upload_for_buffer(self):
+        self.add_put_object_response_with_default_expected_params()
+        future = self.manager.upload(
+            bytearray(self.content), self.bucket, self.key, self.extra_args)
+        future.result()
+        self.assert_expected_client_calls_were_correct()
+        self.assert_put_object_body_was_correct()
+
     def test_upload_for_seekable_filelike_obj_that_has_been_seeked(self):
         self.add_put_object_response_with_default_expected_params()
         bytes_io = six.BytesIO(self.content)
@@ -450,6 +460,83 @@ class TestMultipartUpload(BaseUploadTest):
         # the sent contents were in order.
         self.assert_upload_part_bodies_were_correct()
 
+    def test_upload_with_multipart_chunksize(self):
+        # The chunksize provided for the call is used over the one in the
+        # config.
+        self.config.multipart_chunksize = 2
+        self._manager = TransferManager(self.client, self.config)
+        self.add_create_multipart_response_with_default_expected_params()
+        self.add_upload_part_responses_with_default_expected_params()
+        self.add_complete_multipart_response_with_default_expected_params()
+        future = self.manager.upload(
+            self.filename, self.bucket, self.key, self.extra_args,
+            multipart_chunksize=self.chunksize)
+        future.result()
+        self.assert_expected_client_calls_were_correct()
+        self.assert_upload_part_bodies_were_correct()
+
+    def test_upload_with_invalid_multipart_chunksize(self):
+        with self.assertRaises(ValueError):
+            self.manager.upload(
+                self.filename, self.bucket, self.key,
+                multipart_chunksize=-1)
+
+    def test_upload_for_buffer(self):
+        self.add_create_multipart_response_with_default_expected_params()
+        self.add_upload_part_responses_with_default_expected_params()
+        self.add_complete_multipart_response_with_default_expected_params()
+        future = self.manager.upload(
+            memoryview(self.content), self.bucket, self.key, self.extra_args)
+        future.result()
+        self.assert_expected_client_calls_were_correct()
+        self.assert_upload_part_bodies_were_correct()
+
+    def test_upload_with_readahead_for_non_seekable_filelike_obj(self):
+        # With only one part allowed in memory for uploading at a time,
+        # the parts are still uploaded in order while the next ones are
+        # read ahead.
+        self.config.max_in_memory_upload_chunks = 1
+        self.config.max_in_memory_upload_readahead_size = \
+            self.config.multipart_chunksize * 2
+        self._manager = TransferManager(self.client, self.config)
+        self.add_create_multipart_response_with_default_expected_params()
+        self.add_upload_part_responses_with_default_expected_params()
+        self.add_complete_multipart_response_with_default_expected_params()
+        stream = NonSeekableReader(self.content)
+        future = self.manager.upload(
+            stream, self.bucket, self.key, self.extra_args)
+        future.result()
+        self.assert_expected_client_calls_were_correct()
+        self.assert_upload_part_bodies_were_correct()
+
+    def test_failed_non_seekable_upload_releases_buffers(self):
+        # With a pool of only two buffers shared by all uploads, the next
+        # upload could never read its parts if the failed one held on to
+        # the buffers of the parts it did not upload.
+        self.config.max_in_memory_upload_chunks = 1
+        self.config.max_submission_concurrency = 1
+        self._manager = TransferManager(self.client, self.config)
+        self.add_create_multipart_response_with_default_expected_params()
+        self.stubber.add_client_error('upload_part')
+        self.stubber.add_response(
+            'abort_multipart_upload', {},
+            {'Bucket': self.bucket, 'Key': self.key,
+             'UploadId': self.multipart_id})
+        future = self.manager.upload(
+            NonSeekableReader(self.content), self.bucket, self.key)
+        with self.assertRaises(ClientError):
+            future.result()
+
+        self.sent_bodies = []
+        self.add_create_multipart_response_with_default_expected_params()
+        self.add_upload_part_responses_with_default_expected_params()
+        self.add_complete_multipart_response_with_default_expected_params()
+        future = self.manager.upload(
+            NonSeekableReader(self.content), self.bucket, self.key)
+        future.result()
+        self.assert_expected_client_calls_were_correct()
+        self.assert_upload_part_bodies_were_correct()
+
     def test_upload_failure_invokes_abort(self):
         self.stubber.add_response(
             method='create_multipart_upload',
@@ -492,6 +579,74 @@ class TestMultipartUpload(BaseUploadTest):
             future.result()
         self.assert_expected_client_calls_were_correct()
 
+    def test_upload_resumes_after_failure(self):
+        self.config.resumable_uploads = True
+        self._manager = TransferManager(self.client, self.config)
+        expected_params = {
+            'Bucket': self.bucket,
+            'Key': self.key,
+            'UploadId': self.multipart_id,
+        }
+        self.add_create_multipart_response_with_default_expected_params()
+        self.stubber.add_response(
+            'upload_part', {'ETag': 'etag-1'},
+            dict(expected_params, Body=ANY, PartNumber=1))
+        self.stubber.add_client_error('upload_part')
+
+        # The multipart upload should not be aborted.
+        future = self.manager.upload(self.filename, self.bucket, self.key)
+        with self.assertRaises(ClientError):
+            future.result()
+        self.stubber.assert_no_pending_responses()
+        self.assertTrue(
+            os.path.exists(self.filename + '.s3upload.journal'))
+
+        # Uploading again should only upload the parts that are missing
+        # from the multipart upload.
+        self.stubber.add_response(
+            'list_parts',
+            {'Parts': [{'ETag': 'etag-1', 'PartNumber': 1}]},
+            expected_params)
+        for part_number in [2, 3]:
+            self.stubber.add_response(
+                'upload_part', {'ETag': 'etag-%s' % part_number},
+                dict(expected_params, Body=ANY, PartNumber=part_number))
+        self.add_complete_multipart_response_with_default_expected_params()
+
+        self.sent_bodies = []
+        future = self.manager.upload(self.filename, self.bucket, self.key)
+        future.result()
+
+        self.assert_expected_client_calls_were_correct()
+        self.assertEqual(
+            self.sent_bodies, [self.content[4:8], self.content[8:]])
+        # The journal should be removed once the upload is complete.
+        self.assertEqual(os.listdir(self.tempdir), ['myfile'])
+
+    def test_upload_does_not_resume_with_different_extra_args(self):
+        self.config.resumable_uploads = True
+        self._manager = TransferManager(self.client, self.config)
+        self.add_create_multipart_response_with_default_expected_params()
+        self.stubber.add_client_error('upload_part')
+
+        future = self.manager.upload(self.filename, self.bucket, self.key)
+        with self.assertRaises(ClientError):
+            future.result()
+        self.stubber.assert_no_pending_responses()
+
+        # The multipart upload was created without the metadata, so a new
+        # one has to be created instead of resuming it.
+        self.extra_args['Metadata'] = {'foo': 'bar'}
+        self.add_create_multipart_response_with_default_expected_params(
+            extra_expected_params={'Metadata': {'foo': 'bar'}})
+        self.add_upload_part_responses_with_default_expected_params()
+        self.add_complete_multipart_response_with_default_expected_params()
+
+        future = self.manager.upload(
+            self.filename, self.bucket, self.key, self.extra_args)
+        future.result()
+        self.assert_expected_client_calls_were_correct()
+
     def test_upload_passes_select_extra_args(self):
         self.extra_args['Metadata'] = {'foo': 'bar'}
 
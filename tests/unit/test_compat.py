@@ -10,14 +10,18 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
+import io
 import os
 import tempfile
 import shutil
 
+import mock
 from botocore.compat import six
 
 from tests import unittest
-from s3transfer.compat import seekable, readable
+from s3transfer.compat import seekable, readable, readinto, pwrite, pwritev
+from s3transfer.compat import pread
+from s3transfer.compat import sync_file_range
 
 
 class ErrorRaisingSeekWrapper(object):
@@ -74,3 +78,161 @@ class TestReadable(unittest.TestCase):
 
     def test_non_file_like_obj(self):
         self.assertFalse(readable(object()))
+
+
+class TestReadinto(unittest.TestCase):
+    def test_readinto_fileobj(self):
+        buffer = bytearray(3)
+        self.assertEqual(readinto(six.BytesIO(b'foobar'), buffer), 3)
+        self.assertEqual(buffer, b'foo')
+
+    def test_falls_back_to_read(self):
+        fileobj = mock.Mock(spec=['read'])
+        fileobj.read.return_value = b'fo'
+        buffer = bytearray(3)
+        self.assertEqual(readinto(fileobj, buffer), 2)
+        fileobj.read.assert_called_with(3)
+        self.assertEqual(buffer, b'fo\x00')
+
+    def test_end_of_file(self):
+        fileobj = mock.Mock(spec=['read'])
+        fileobj.read.return_value = b''
+        self.assertEqual(readinto(fileobj, bytearray(3)), 0)
+
+    def test_falls_back_to_read_for_raw_io_without_readinto(self):
+        class Reader(io.RawIOBase):
+            def read(self, n=-1):
+                return b'foo'[:n]
+
+        buffer = bytearray(3)
+        self.assertEqual(readinto(Reader(), buffer), 3)
+        self.assertEqual(buffer, b'foo')
+
+
+@unittest.skipIf(pwrite is None, 'Positional writes are not supported')
+class TestPwrite(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'foo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_writes_at_offsets(self):
+        with open(self.filename, 'wb') as f:
+            pwrite(f.fileno(), b'bar', 3)
+            pwrite(f.fileno(), b'foo', 0)
+            # The file position should not have been moved.
+            self.assertEqual(f.tell(), 0)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_accepts_memoryview(self):
+        with open(self.filename, 'wb') as f:
+            pwrite(f.fileno(), memoryview(b'foobar')[3:], 0)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'bar')
+
+
+@unittest.skipIf(pread is None, 'Positional reads are not supported')
+class TestPread(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'foo')
+        with open(self.filename, 'wb') as f:
+            f.write(b'foobar')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_reads_at_offsets(self):
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(pread(f.fileno(), 3, 3), b'bar')
+            self.assertEqual(pread(f.fileno(), 3, 0), b'foo')
+            # The file position should not have been moved.
+            self.assertEqual(f.tell(), 0)
+
+    def test_short_read_at_end_of_file(self):
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(pread(f.fileno(), 10, 4), b'ar')
+            self.assertEqual(pread(f.fileno(), 10, 6), b'')
+
+    def test_retries_partial_reads(self):
+        with mock.patch('os.pread', side_effect=[b'fo', b'o']) as os_pread:
+            self.assertEqual(pread(10, 3, 0), b'foo')
+        self.assertEqual(
+            os_pread.call_args_list, [mock.call(10, 3, 0), mock.call(10, 1, 2)])
+
+
+@unittest.skipIf(pwritev is None, 'Vectored writes are not supported')
+class TestPwritev(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'foo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_writes_buffers_at_offset(self):
+        with open(self.filename, 'wb') as f:
+            pwritev(f.fileno(), [b'b', b'ar'], 3)
+            pwritev(f.fileno(), [b'fo', bytearray(b'o')], 0)
+            # The file position should not have been moved.
+            self.assertEqual(f.tell(), 0)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_skips_empty_buffers(self):
+        with open(self.filename, 'wb') as f:
+            pwritev(f.fileno(), [b'', b'foo', b''], 0)
+            pwritev(f.fileno(), [b''], 3)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foo')
+
+    def test_handles_partial_writes(self):
+        calls = []
+
+        def partial_pwritev(fileno, buffers, offset):
+            # Only ever write out two bytes at a time.
+            data = b''.join(bytes(buffer) for buffer in buffers)[:2]
+            calls.append((data, offset))
+            return len(data)
+
+        with mock.patch('os.pwritev', partial_pwritev):
+            pwritev(0, [b'foo', b'bar'], 10)
+        self.assertEqual(
+            calls, [(b'fo', 10), (b'ob', 12), (b'ar', 14)])
+
+    def test_limits_number_of_buffers_per_call(self):
+        num_buffers_per_call = []
+
+        def recording_pwritev(fileno, buffers, offset):
+            num_buffers_per_call.append(len(buffers))
+            return sum(len(buffer) for buffer in buffers)
+
+        with mock.patch('os.pwritev', recording_pwritev):
+            with mock.patch('s3transfer.compat._IOV_MAX', 2):
+                pwritev(0, [b'a', b'b', b'c', b'd', b'e'], 0)
+        self.assertEqual(num_buffers_per_call, [2, 2, 1])
+
+
+@unittest.skipIf(sync_file_range is None, 'sync_file_range is not supported')
+class TestSyncFileRange(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'foo')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_syncs_range(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'foobar')
+            f.flush()
+            sync_file_range(f.fileno(), 0, 6)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_raises_os_error(self):
+        with self.assertRaises(OSError):
+            sync_file_range(-1, 0, 6)
@@ -10,10 +10,13 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
+import array
 import copy
+import hashlib
 import os
 import shutil
 import tempfile
+import threading
 import mock
 
 from tests import BaseTaskTest
@@ -25,9 +28,13 @@ from tests import RecordingExecutor
 from tests import NonSeekableWriter
 from s3transfer.compat import six
 from s3transfer.compat import SOCKET_ERROR
+from s3transfer.exceptions import DownloadIntegrityError
 from s3transfer.exceptions import RetriesExceededError
 from s3transfer.bandwidth import BandwidthLimiter
 from s3transfer.download import DownloadFilenameOutputManager
+from s3transfer.download import DownloadMappedFilenameOutputManager
+from s3transfer.download import DownloadResumableFilenameOutputManager
+from s3transfer.download import DownloadBufferOutputManager
 from s3transfer.download import DownloadSpecialFilenameOutputManager
 from s3transfer.download import DownloadSeekableOutputManager
 from s3transfer.download import DownloadNonSeekableOutputManager
@@ -35,16 +42,41 @@ from s3transfer.download import DownloadSubmissionTask
 from s3transfer.download import GetObjectTask
 from s3transfer.download import ImmediatelyWriteIOGetObjectTask
 from s3transfer.download import IOWriteTask
+from s3transfer.download import IOPositionalWriteTask
+from s3transfer.download import IOCoalescedWriteTask
 from s3transfer.download import IOStreamingWriteTask
 from s3transfer.download import IORenameFileTask
+from s3transfer.download import IOHashTask
+from s3transfer.download import IOVerifyDownloadTask
 from s3transfer.download import IOCloseTask
 from s3transfer.download import CompleteDownloadNOOPTask
 from s3transfer.download import DownloadChunkIterator
+from s3transfer.download import DownloadBufferChunkIterator
+from s3transfer.download import PooledDownloadChunkIterator
+from s3transfer.download import ReusedBufferChunkIterator
 from s3transfer.download import DeferQueue
+from s3transfer.download import CoalescingWriteQueue
+from s3transfer.download import DownloadJournal
+from s3transfer.download import DownloadStream
+from s3transfer.download import DownloadStreamOutputManager
+from s3transfer.download import DownloadStreamWriteTask
+from s3transfer.download import DownloadStreamSubscriber
+from s3transfer.download import DownloadTeeOutputManager
+from s3transfer.download import IOTeeWriteTask
+from s3transfer.download import CompleteTeeDownloadTask
+from s3transfer.download import DownloadRangesOutputManager
 from s3transfer.futures import IN_MEMORY_DOWNLOAD_TAG
+from s3transfer.tasks import Task
 from s3transfer.futures import BoundedExecutor
+from s3transfer.futures import TransferCoordinator
 from s3transfer.utils import OSUtils
 from s3transfer.utils import CallArgs
+from s3transfer.utils import DeferredOpenFile
+from s3transfer.utils import BufferPool
+from s3transfer.utils import DownloadPartSizePlanner
+from s3transfer.utils import ETagCalculator
+from s3transfer.utils import DownloadWindowPlanner
+from s3transfer.utils import NoResourcesAvailable
 
 
 class DownloadException(Exception):
@@ -61,9 +93,22 @@ class WriteCollector(object):
         self._pos = pos
 
     def write(self, data):
-        self.writes.append((self._pos, data))
+        self.writes.append((self._pos, self._copy(data)))
         self._pos += len(data)
 
+    def pwrite(self, data, offset):
+        self.writes.append((offset, self._copy(data)))
+
+    def _copy(self, data):
+        # Like a real write, views are copied as the buffer they are a view
+        # of may be reused.
+        if isinstance(data, memoryview):
+            return data.tobytes()
+        return data
+
+    def pwritev(self, buffers, offset):
+        self.writes.append((offset, buffers))
+
 
 class AlwaysIndicatesSpecialFileOSUtils(OSUtils):
     """OSUtil that always returns True for is_special_file"""
@@ -71,6 +116,12 @@ class AlwaysIndicatesSpecialFileOSUtils(OSUtils):
         return True
 
 
+class WaitForEventTask(Task):
+    """A task that blocks the executor running it until an event is set"""
+    def _main(self, event):
+        event.wait()
+
+
 class CancelledStreamWrapper(object):
     """A wrapper to trigger a cancellation while stream reading
 
@@ -169,11 +220,272 @@ class TestDownloadFilenameOutputManager(BaseDownloadOutputManagerTest):
         fileobj = WriteCollector()
         io_write_task = self.download_output_manager.get_io_write_task(
             fileobj=fileobj, data='foo', offset=3)
-        self.assertIsInstance(io_write_task, IOWriteTask)
+        self.assertIsInstance(io_write_task, IOPositionalWriteTask)
 
         io_write_task()
         self.assertEqual(fileobj.writes, [(3, 'foo')])
 
+    def test_get_writer_for_immediate_writes(self):
+        fileobj = WriteCollector()
+        write = self.download_output_manager.get_writer_for_immediate_writes(
+            fileobj)
+        write(b'foo', 3)
+        self.assertEqual(fileobj.writes, [(3, b'foo')])
+
+    def test_queue_file_io_task_calls_done_callbacks_if_not_queued(self):
+        self.io_executor.shutdown()
+        done_callback = mock.Mock()
+        with self.assertRaises(RuntimeError):
+            self.download_output_manager.queue_file_io_task(
+                fileobj=WriteCollector(), data='foo', offset=0,
+                done_callbacks=[done_callback])
+        done_callback.assert_called_once_with()
+
+    def test_get_file_io_write_task_with_done_callbacks(self):
+        done_callback = mock.Mock()
+        io_write_task = self.download_output_manager.get_io_write_task(
+            fileobj=WriteCollector(), data='foo', offset=3,
+            done_callbacks=[done_callback])
+        io_write_task()
+        done_callback.assert_called_once_with()
+
+    def test_io_writes_to_temporary_file_out_of_order(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobj, data=b'bar', offset=3)()
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobj, data=b'foo', offset=0)()
+        self.download_output_manager.get_final_io_task()()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_coalesces_queued_writes(self):
+        download_output_manager = DownloadFilenameOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor, max_coalesced_write_size=6)
+        fileobj = WriteCollector()
+        done_callback = mock.Mock()
+        # Hold up the io executor so all of the writes are pending
+        # when the first write task runs.
+        event = threading.Event()
+        self.io_executor.submit(
+            self.get_task(WaitForEventTask, main_kwargs={'event': event}))
+        for data, offset in [(b'bar', 3), (b'foo', 0), (b'baz', 6)]:
+            download_output_manager.queue_file_io_task(
+                fileobj=fileobj, data=data, offset=offset,
+                done_callbacks=[done_callback])
+        event.set()
+        self.io_executor.shutdown()
+        self.assertEqual(
+            fileobj.writes, [(0, [b'foo', b'bar']), (6, [b'baz'])])
+        self.assertEqual(done_callback.call_count, 3)
+
+    def test_coalesced_writes_to_temporary_file(self):
+        download_output_manager = DownloadFilenameOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor, max_coalesced_write_size=6)
+        fileobj = download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        download_output_manager.queue_file_io_task(
+            fileobj=fileobj, data=b'bar', offset=3)
+        download_output_manager.queue_file_io_task(
+            fileobj=fileobj, data=b'foo', offset=0)
+        self.io_executor.shutdown()
+        download_output_manager.get_final_io_task()()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_coalesced_writes_discarded_on_failure(self):
+        download_output_manager = DownloadFilenameOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor, max_coalesced_write_size=6)
+        self.transfer_coordinator.set_exception(Exception('failed'))
+        done_callback = mock.Mock()
+        download_output_manager.queue_file_io_task(
+            fileobj=WriteCollector(), data=b'foo', offset=0,
+            done_callbacks=[done_callback])
+        self.io_executor.shutdown()
+        self.transfer_coordinator.announce_done()
+        done_callback.assert_called_once_with()
+
+    def test_get_buffer_for_direct_writes(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.assertIsNone(
+            self.download_output_manager.get_buffer_for_direct_writes(
+                fileobj, 0))
+
+
+class TestDownloadMappedFilenameOutputManager(BaseDownloadOutputManagerTest):
+    def setUp(self):
+        super(TestDownloadMappedFilenameOutputManager, self).setUp()
+        self.future.meta.provide_transfer_size(6)
+        self.download_output_manager = DownloadMappedFilenameOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor)
+
+    def test_get_fileobj_for_io_writes(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        # Make sure the name of the file returned is not the same as the
+        # final filename as we should be writing to a temporary file.
+        self.assertNotEqual(fileobj.name, self.filename)
+        # The temporary file should already be the size of the download.
+        self.assertEqual(os.path.getsize(fileobj.name), 6)
+        fileobj.close()
+
+    def test_get_buffer_for_direct_writes(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        buffer = self.download_output_manager.get_buffer_for_direct_writes(
+            fileobj, 3)
+        self.assertEqual(len(buffer), 3)
+        buffer[:] = b'bar'
+        self.download_output_manager.get_buffer_for_direct_writes(
+            fileobj, 0)[:3] = b'foo'
+        del buffer
+        self.download_output_manager.get_final_io_task()()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_io_write_task(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobj, data=b'bar', offset=3)()
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobj, data=b'foo', offset=0)()
+        self.download_output_manager.get_final_io_task()()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_removes_temporary_file_on_failure(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        temp_filename = fileobj.name
+        self.transfer_coordinator.set_exception(Exception('failed'))
+        self.transfer_coordinator.announce_done()
+        self.assertFalse(os.path.exists(temp_filename))
+
+
+class TestDownloadResumableFilenameOutputManager(
+        BaseDownloadOutputManagerTest):
+    def setUp(self):
+        super(TestDownloadResumableFilenameOutputManager, self).setUp()
+        self.call_args = CallArgs(
+            fileobj=self.filename, bucket='mybucket', key='mykey',
+            extra_args={})
+        self.future = self.get_resumable_transfer_future()
+        self.download_output_manager = self.get_download_output_manager()
+
+    def get_resumable_transfer_future(self, etag='"myetag"'):
+        future = self.get_transfer_future(self.call_args)
+        future.meta.provide_transfer_size(6)
+        future.meta.provide_object_etag(etag)
+        return future
+
+    def get_download_output_manager(self):
+        return DownloadResumableFilenameOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor)
+
+    def fail_partial_download(self):
+        # Write the first half of the download and then fail.
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.queue_file_io_task(
+            fileobj=fileobj, data=b'foo', offset=0)
+        self.io_executor.shutdown()
+        self.transfer_coordinator.set_exception(Exception('failed'))
+        self.transfer_coordinator.announce_done()
+
+    def resume_download(self, etag='"myetag"'):
+        self.transfer_coordinator = TransferCoordinator()
+        self.io_executor = BoundedExecutor(1000, 1)
+        self.future = self.get_resumable_transfer_future(etag)
+        self.download_output_manager = self.get_download_output_manager()
+        return self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+
+    def test_get_fileobj_for_io_writes(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.assertEqual(fileobj.name, self.filename + '.s3download')
+        self.assertEqual(
+            self.download_output_manager.get_downloaded_ranges(), [])
+
+    def test_keeps_temporary_file_on_failure(self):
+        self.fail_partial_download()
+        self.assertTrue(os.path.exists(self.filename + '.s3download'))
+        self.assertTrue(
+            os.path.exists(self.filename + '.s3download.journal'))
+
+    def test_resumes_download(self):
+        self.fail_partial_download()
+        fileobj = self.resume_download()
+        self.assertEqual(
+            self.download_output_manager.get_downloaded_ranges(), [(0, 3)])
+
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobj, data=b'bar', offset=3)()
+        self.download_output_manager.get_final_io_task()()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+        # Nothing is left to resume once the download completes.
+        self.assertEqual(os.listdir(self.tempdir), ['myfile'])
+
+    def test_starts_over_if_etag_changed(self):
+        self.fail_partial_download()
+        self.resume_download(etag='"newetag"')
+        self.assertEqual(
+            self.download_output_manager.get_downloaded_ranges(), [])
+
+    def test_starts_over_if_temporary_file_is_missing(self):
+        self.fail_partial_download()
+        os.remove(self.filename + '.s3download')
+        self.resume_download()
+        self.assertEqual(
+            self.download_output_manager.get_downloaded_ranges(), [])
+
+    def test_does_not_record_writes_that_were_not_made(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.transfer_coordinator.set_exception(Exception('failed'))
+        self.download_output_manager.queue_file_io_task(
+            fileobj=fileobj, data=b'foo', offset=0)
+        self.io_executor.shutdown()
+        self.transfer_coordinator.announce_done()
+        self.resume_download()
+        self.assertEqual(
+            self.download_output_manager.get_downloaded_ranges(), [])
+
+    def test_saves_journal_after_queued_writes(self):
+        fileobj = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        journal_filename = self.filename + '.s3download.journal'
+        identity = {
+            'bucket': 'mybucket', 'key': 'mykey', 'etag': '"myetag"',
+            'version_id': None, 'size': 6
+        }
+        # Hold up the io executor to make sure the journal is not saved
+        # before the write queued ahead of it is made.
+        event = threading.Event()
+        self.io_executor.submit(
+            self.get_task(WaitForEventTask, main_kwargs={'event': event}))
+        self.download_output_manager.queue_file_io_task(
+            fileobj=fileobj, data=b'foo', offset=0)
+        self.download_output_manager.record_downloaded_range(0, 3)
+        journal = DownloadJournal.load(
+            journal_filename, identity, self.osutil)
+        self.assertEqual(journal.downloaded_ranges, [])
+        event.set()
+        self.io_executor.shutdown()
+        journal = DownloadJournal.load(
+            journal_filename, identity, self.osutil)
+        self.assertEqual(journal.downloaded_ranges, [(0, 3)])
+        fileobj.close()
+
 
 class TestDownloadSpecialFilenameOutputManager(BaseDownloadOutputManagerTest):
     def setUp(self):
@@ -216,6 +528,104 @@ class TestDownloadSpecialFilenameOutputManager(BaseDownloadOutputManagerTest):
         self.assertEqual(fileobj.writes, [(0, 'foo'), (3, 'bar')])
 
 
+class TestDownloadBufferOutputManager(BaseDownloadOutputManagerTest):
+    def setUp(self):
+        super(TestDownloadBufferOutputManager, self).setUp()
+        self.download_output_manager = DownloadBufferOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor)
+        self.buffer = bytearray(6)
+        self.future = self.get_transfer_future(CallArgs(fileobj=self.buffer))
+        self.future.meta.provide_transfer_size(6)
+
+    def use_buffer(self, buffer):
+        self.buffer = buffer
+        self.future = self.get_transfer_future(CallArgs(fileobj=buffer))
+        self.future.meta.provide_transfer_size(6)
+
+    def test_is_compatible_with_bytearray(self):
+        self.assertTrue(
+            self.download_output_manager.is_compatible(
+                bytearray(), self.osutil))
+
+    def test_is_compatible_with_writable_memoryview(self):
+        self.assertTrue(
+            self.download_output_manager.is_compatible(
+                memoryview(bytearray(6))[2:], self.osutil))
+
+    def test_not_compatible_with_bytes(self):
+        self.assertFalse(
+            self.download_output_manager.is_compatible(b'foo', self.osutil))
+
+    def test_not_compatible_with_filename(self):
+        self.assertFalse(
+            self.download_output_manager.is_compatible(
+                self.filename, self.osutil))
+
+    def test_not_compatible_with_file_like_object(self):
+        self.assertFalse(
+            self.download_output_manager.is_compatible(
+                six.BytesIO(), self.osutil))
+
+    def test_get_download_task_tag(self):
+        self.assertIsNone(self.download_output_manager.get_download_task_tag())
+
+    def test_get_fileobj_for_io_writes(self):
+        view = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        view[:] = b'foobar'
+        self.assertEqual(self.buffer, b'foobar')
+
+    def test_grows_bytearray_to_size_of_object(self):
+        self.use_buffer(bytearray(b'foo'))
+        view = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.assertEqual(len(view), 6)
+        self.assertEqual(len(self.buffer), 6)
+
+    def test_does_not_shrink_larger_bytearray(self):
+        self.use_buffer(bytearray(10))
+        view = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.assertEqual(len(view), 10)
+
+    def test_raises_for_buffer_too_small(self):
+        self.use_buffer(memoryview(bytearray(3)))
+        with self.assertRaises(ValueError):
+            self.download_output_manager.get_fileobj_for_io_writes(
+                self.future)
+
+    def test_writes_by_bytes_for_non_byte_buffers(self):
+        self.use_buffer(array.array('h', [0, 0, 0]))
+        view = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.assertEqual(len(view), 6)
+        view[:] = b'foobar'
+        self.assertEqual(self.buffer.tobytes(), b'foobar')
+
+    def test_get_buffer_for_direct_writes(self):
+        view = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.get_buffer_for_direct_writes(
+            view, 3)[:] = b'bar'
+        self.download_output_manager.get_buffer_for_direct_writes(
+            view, 0)[:3] = b'foo'
+        self.assertEqual(self.buffer, b'foobar')
+
+    def test_get_io_write_task(self):
+        view = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.get_io_write_task(view, b'bar', 3)()
+        self.download_output_manager.get_io_write_task(view, b'foo', 0)()
+        self.assertEqual(self.buffer, b'foobar')
+
+    def test_get_final_io_task(self):
+        self.assertIsInstance(
+            self.download_output_manager.get_final_io_task(),
+            CompleteDownloadNOOPTask
+        )
+
+
 class TestDownloadSeekableOutputManager(BaseDownloadOutputManagerTest):
     def setUp(self):
         super(TestDownloadSeekableOutputManager, self).setUp()
@@ -284,6 +694,13 @@ class TestDownloadSeekableOutputManager(BaseDownloadOutputManagerTest):
         io_write_task()
         self.assertEqual(fileobj.writes, [(3, 'foo')])
 
+    def test_get_writer_for_immediate_writes(self):
+        fileobj = WriteCollector()
+        write = self.download_output_manager.get_writer_for_immediate_writes(
+            fileobj)
+        write(b'foo', 3)
+        self.assertEqual(fileobj.writes, [(3, b'foo')])
+
 
 class TestDownloadNonSeekableOutputManager(BaseDownloadOutputManagerTest):
     def setUp(self):
@@ -350,6 +767,447 @@ class TestDownloadNonSeekableOutputManager(BaseDownloadOutputManagerTest):
         io_write_task()
         self.assertEqual(fileobj.writes, [(0, 'foo')])
 
+    def test_coalesces_writes_from_internal_queue(self):
+        class FakeQueue(object):
+            def request_writes(self, offset, data):
+                return [
+                    {'offset': 0, 'data': b'foo'},
+                    {'offset': 3, 'data': b'bar'},
+                    {'offset': 6, 'data': b'baz'},
+                ]
+
+        io_executor = BoundedExecutor(1000, 1)
+        manager = DownloadNonSeekableOutputManager(
+            self.osutil, self.transfer_coordinator, io_executor=io_executor,
+            defer_queue=FakeQueue(), max_coalesced_write_size=6)
+        fileobj = WriteCollector()
+        manager.queue_file_io_task(
+            fileobj=fileobj, data=b'foo', offset=0)
+        io_executor.shutdown()
+        self.assertEqual(fileobj.writes, [(0, b'foobar'), (6, b'baz')])
+
+    def test_queue_file_io_task_writes_next_data_from_buffer(self):
+        io_executor = BoundedExecutor(1000, 1)
+        manager = DownloadNonSeekableOutputManager(
+            self.osutil, self.transfer_coordinator, io_executor=io_executor)
+        fileobj = mock.Mock()
+        buffer = bytearray(b'foo')
+        done_callback = mock.Mock()
+        manager.queue_file_io_task(
+            fileobj=fileobj, data=memoryview(buffer), offset=0,
+            done_callbacks=[done_callback])
+        io_executor.shutdown()
+        written = fileobj.write.call_args[0][0]
+        self.assertIsInstance(written, memoryview)
+        self.assertIs(written.obj, buffer)
+        done_callback.assert_called_once_with()
+
+    def test_queue_file_io_task_releases_coalesced_data(self):
+        io_executor = BoundedExecutor(1000, 1)
+        manager = DownloadNonSeekableOutputManager(
+            self.osutil, self.transfer_coordinator, io_executor=io_executor,
+            max_coalesced_write_size=6)
+        fileobj = WriteCollector()
+        manager.queue_file_io_task(fileobj=fileobj, data=b'bar', offset=3)
+        buffer = bytearray(b'foo')
+        done_callback = mock.Mock()
+        manager.queue_file_io_task(
+            fileobj=fileobj, data=memoryview(buffer), offset=0,
+            done_callbacks=[done_callback])
+        # The joined write is a copy, so the buffer is reusable right away.
+        done_callback.assert_called_once_with()
+        buffer[:] = b'baz'
+        io_executor.shutdown()
+        self.assertEqual(fileobj.writes, [(0, b'foobar')])
+
+    def test_queue_file_io_task_copies_deferred_data_with_done_callbacks(
+            self):
+        io_executor = BoundedExecutor(1000, 1)
+        manager = DownloadNonSeekableOutputManager(
+            self.osutil, self.transfer_coordinator, io_executor=io_executor)
+        fileobj = WriteCollector()
+        buffer = bytearray(b'barfoo')
+        done_callback = mock.Mock()
+        # The data is deferred because it is not the next contiguous write.
+        manager.queue_file_io_task(
+            fileobj=fileobj, data=memoryview(buffer)[:3], offset=3,
+            done_callbacks=[done_callback])
+        # The buffer should be reusable right away.
+        done_callback.assert_called_once_with()
+        buffer[:] = b'foobaz'
+        manager.queue_file_io_task(fileobj=fileobj, data=b'foo', offset=0)
+        io_executor.shutdown()
+        self.assertEqual(fileobj.writes, [(0, b'foo'), (3, b'bar')])
+
+    def test_spills_deferred_writes(self):
+        io_executor = BoundedExecutor(1000, 1)
+        manager = DownloadNonSeekableOutputManager(
+            self.osutil, self.transfer_coordinator, io_executor=io_executor,
+            max_in_memory_deferred_size=3)
+        fileobj = WriteCollector()
+        manager.queue_file_io_task(fileobj=fileobj, data=b'baz', offset=6)
+        manager.queue_file_io_task(fileobj=fileobj, data=b'bar', offset=3)
+        manager.queue_file_io_task(fileobj=fileobj, data=b'foo', offset=0)
+        io_executor.shutdown()
+        self.assertEqual(
+            fileobj.writes, [(0, b'foo'), (3, b'bar'), (6, b'baz')])
+
+
+class TestDownloadStreamOutputManager(BaseDownloadOutputManagerTest):
+    def setUp(self):
+        super(TestDownloadStreamOutputManager, self).setUp()
+        self.stream = DownloadStream(max_readahead_size=1024)
+        self.call_args = CallArgs(fileobj=self.stream)
+        self.future = self.get_transfer_future(self.call_args)
+        self.download_output_manager = DownloadStreamOutputManager(
+            self.osutil, self.transfer_coordinator, io_executor=None)
+
+    def test_is_compatible(self):
+        self.assertTrue(
+            self.download_output_manager.is_compatible(
+                self.stream, self.osutil))
+
+    def test_not_compatible_with_file_like_object(self):
+        self.assertFalse(
+            self.download_output_manager.is_compatible(
+                six.BytesIO(), self.osutil))
+
+    def test_get_download_task_tag(self):
+        # The readahead window of the stream bounds what is held in memory.
+        self.assertIsNone(
+            self.download_output_manager.get_download_task_tag())
+
+    def test_get_fileobj_for_io_writes(self):
+        self.assertIs(
+            self.download_output_manager.get_fileobj_for_io_writes(
+                self.future),
+            self.stream)
+
+    def test_queue_file_io_task(self):
+        self.download_output_manager.queue_file_io_task(
+            fileobj=self.stream, data=b'bar', offset=3)
+        self.download_output_manager.queue_file_io_task(
+            fileobj=self.stream, data=b'foo', offset=0)
+        self.stream.finish()
+        self.assertEqual(self.stream.read(), b'foobar')
+
+    def submit_ranges(self, ranges):
+        self.submitted_ranges = []
+        self.range_done_callbacks = []
+        self.finalize = mock.Mock()
+
+        def submit_range(start_index, range_parameter, done_callbacks):
+            self.submitted_ranges.append(start_index)
+            self.range_done_callbacks.extend(done_callbacks)
+
+        self.download_output_manager.submit_ranges(
+            self.stream, [(start, 'range') for start in ranges],
+            submit_range, self.finalize)
+
+    def test_submit_ranges_in_readahead_window(self):
+        self.submit_ranges([0, 512, 1024])
+        self.assertEqual(self.submitted_ranges, [0, 512])
+        self.assertFalse(self.finalize.called)
+
+    def test_reading_submits_ranges(self):
+        self.submit_ranges([0, 512, 1024, 1536])
+        self.stream.queue_write(0, b'foo')
+        self.stream.read(3)
+        self.assertEqual(self.submitted_ranges, [0, 512, 1024])
+        self.assertFalse(self.finalize.called)
+
+    def test_finalizes_once_all_ranges_are_submitted(self):
+        self.submit_ranges([0, 512, 1024])
+        self.stream.queue_write(0, b'foo')
+        self.stream.read(3)
+        self.assertEqual(self.submitted_ranges, [0, 512, 1024])
+        self.finalize.assert_called_once_with()
+        self.stream.queue_write(3, b'bar')
+        self.stream.read(3)
+        self.finalize.assert_called_once_with()
+
+    def test_failed_range_drops_ranges_outside_of_window(self):
+        self.submit_ranges([0, 1024])
+        self.transfer_coordinator.set_exception(Exception('failed'))
+        for done_callback in self.range_done_callbacks:
+            done_callback()
+        self.assertEqual(self.submitted_ranges, [0])
+        self.finalize.assert_called_once_with()
+
+    def test_cancel_drops_ranges_outside_of_window(self):
+        self.transfer_coordinator.set_status_to_running()
+        self.submit_ranges([0, 1024])
+        self.transfer_coordinator.cancel()
+        self.assertEqual(self.submitted_ranges, [0])
+        self.finalize.assert_called_once_with()
+
+    def test_closing_stream_drops_ranges_outside_of_window(self):
+        self.transfer_coordinator.set_status_to_running()
+        self.submit_ranges([0, 1024])
+        self.stream.set_future(self.future)
+        self.stream.close()
+        self.assertEqual(self.submitted_ranges, [0])
+        self.finalize.assert_called_once_with()
+
+    def test_failure_to_submit_fails_transfer(self):
+        self.finalize = mock.Mock()
+        exception = Exception('failed')
+        self.download_output_manager.submit_ranges(
+            self.stream, [(0, 'range'), (1, 'range')],
+            mock.Mock(side_effect=exception), self.finalize)
+        self.assertIs(self.transfer_coordinator.exception, exception)
+        self.finalize.assert_called_once_with()
+
+    def test_queue_file_io_task_holds_buffer_until_read(self):
+        buffer = bytearray(b'foo')
+        done_callback = mock.Mock()
+        self.download_output_manager.queue_file_io_task(
+            fileobj=self.stream, data=memoryview(buffer), offset=0,
+            done_callbacks=[done_callback])
+        self.assertFalse(done_callback.called)
+        self.stream.finish()
+        self.assertEqual(self.stream.read(), b'foo')
+        done_callback.assert_called_once_with()
+
+    def test_queue_file_io_task_copies_deferred_data_with_done_callbacks(
+            self):
+        buffer = bytearray(b'bar')
+        done_callback = mock.Mock()
+        self.download_output_manager.queue_file_io_task(
+            fileobj=self.stream, data=memoryview(buffer), offset=3,
+            done_callbacks=[done_callback])
+        # The buffer can be reused as soon as the data is queued.
+        done_callback.assert_called_once_with()
+        buffer[:] = b'baz'
+        self.download_output_manager.queue_file_io_task(
+            fileobj=self.stream, data=b'foo', offset=0)
+        self.stream.finish()
+        self.assertEqual(self.stream.read(), b'foobar')
+
+    def test_io_write_task_releases_buffer_if_skipped(self):
+        done_callback = mock.Mock()
+        task = self.download_output_manager.get_io_write_task(
+            fileobj=self.stream, data=memoryview(bytearray(b'foo')),
+            offset=0, done_callbacks=[done_callback])
+        self.transfer_coordinator.set_exception(Exception('failed'))
+        task()
+        done_callback.assert_called_once_with()
+
+    def test_get_final_io_task(self):
+        self.assertIsInstance(
+            self.download_output_manager.get_final_io_task(),
+            CompleteDownloadNOOPTask)
+
+
+class TestDownloadTeeOutputManager(BaseDownloadOutputManagerTest):
+    def setUp(self):
+        super(TestDownloadTeeOutputManager, self).setUp()
+        self.stream_content = six.BytesIO()
+        self.stream = NonSeekableWriter(self.stream_content)
+        self.seekable = six.BytesIO()
+        self.call_args = CallArgs(
+            fileobj=[self.filename, self.seekable, self.stream])
+        self.future = self.get_transfer_future(self.call_args)
+        self.future.meta.provide_transfer_size(6)
+        self.download_output_manager = DownloadTeeOutputManager(
+            self.osutil, self.transfer_coordinator,
+            io_executor=self.io_executor)
+
+    def test_is_compatible(self):
+        self.assertTrue(
+            self.download_output_manager.is_compatible(
+                [self.filename, self.seekable], self.osutil))
+        self.assertTrue(
+            self.download_output_manager.is_compatible(
+                (self.filename,), self.osutil))
+
+    def test_is_not_compatible(self):
+        for download_target in [[], self.filename, self.seekable]:
+            self.assertFalse(
+                self.download_output_manager.is_compatible(
+                    download_target, self.osutil))
+
+    def test_get_fileobj_for_io_writes(self):
+        fileobjs = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.assertEqual(len(fileobjs), 3)
+        self.assertNotEqual(fileobjs[0].name, self.filename)
+        self.assertIs(fileobjs[1], self.seekable)
+        self.assertIs(fileobjs[2], self.stream)
+
+    def test_get_fileobj_for_unsupported_target(self):
+        self.call_args.fileobj = [self.filename, bytearray(6)]
+        with self.assertRaises(RuntimeError):
+            self.download_output_manager.get_fileobj_for_io_writes(
+                self.future)
+
+    def test_get_download_task_tag(self):
+        self.download_output_manager.get_fileobj_for_io_writes(self.future)
+        self.assertEqual(
+            self.download_output_manager.get_download_task_tag(),
+            IN_MEMORY_DOWNLOAD_TAG)
+
+    def test_get_download_task_tag_for_seekable_targets(self):
+        self.call_args.fileobj = [self.filename, self.seekable]
+        self.download_output_manager.get_fileobj_for_io_writes(self.future)
+        self.assertIsNone(
+            self.download_output_manager.get_download_task_tag())
+
+    def test_queued_writes_go_to_every_target(self):
+        fileobjs = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        done_callback = mock.Mock()
+        for data, offset in [(b'bar', 3), (b'foo', 0)]:
+            self.download_output_manager.queue_file_io_task(
+                fileobj=fileobjs, data=data, offset=offset,
+                done_callbacks=[done_callback])
+        self.io_executor.shutdown()
+        self.download_output_manager.get_final_io_task()()
+        self.assertEqual(self.transfer_coordinator.status, 'success')
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+        self.assertEqual(self.seekable.getvalue(), b'foobar')
+        self.assertEqual(self.stream_content.getvalue(), b'foobar')
+        self.assertEqual(done_callback.call_count, 2)
+
+    def test_done_callbacks_wait_for_every_target(self):
+        fileobjs = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        done_callback = mock.Mock()
+        # Hold up the io executor so none of the writes have happened.
+        event = threading.Event()
+        self.io_executor.submit(
+            self.get_task(WaitForEventTask, main_kwargs={'event': event}))
+        self.download_output_manager.queue_file_io_task(
+            fileobj=fileobjs[:2], data=b'foo', offset=0,
+            done_callbacks=[done_callback])
+        self.assertFalse(done_callback.called)
+        event.set()
+        self.io_executor.shutdown()
+        done_callback.assert_called_once_with()
+
+    def test_get_io_write_task(self):
+        fileobjs = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        done_callback = mock.Mock()
+        io_write_task = self.download_output_manager.get_io_write_task(
+            fileobj=fileobjs, data=b'foobar', offset=0,
+            done_callbacks=[done_callback])
+        self.assertIsInstance(io_write_task, IOTeeWriteTask)
+        io_write_task()
+        done_callback.assert_called_once_with()
+        self.download_output_manager.get_final_io_task()()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+        self.assertEqual(self.seekable.getvalue(), b'foobar')
+        self.assertEqual(self.stream_content.getvalue(), b'foobar')
+
+    def test_get_final_io_task(self):
+        fileobjs = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobjs, data=b'foobar', offset=0)()
+        final_task = self.download_output_manager.get_final_io_task()
+        self.assertIsInstance(final_task, CompleteTeeDownloadTask)
+        final_task()
+        self.assertEqual(self.transfer_coordinator.status, 'success')
+        self.assertTrue(os.path.exists(self.filename))
+
+    def test_failed_target_fails_download(self):
+        fileobjs = self.download_output_manager.get_fileobj_for_io_writes(
+            self.future)
+        self.download_output_manager.get_io_write_task(
+            fileobj=fileobjs, data=b'foobar', offset=0)()
+        temp_filename = fileobjs[0].name
+        # Make the rename of the temporary file fail.
+        os.remove(temp_filename)
+        fileobjs[0].close()
+        self.download_output_manager.get_final_io_task()()
+        self.assertEqual(self.transfer_coordinator.status, 'failed')
+        self.assertFalse(os.path.exists(self.filename))
+
+
+class TestDownloadRangesOutputManager(BaseDownloadOutputManagerTest):
+    def setUp(self):
+        super(TestDownloadRangesOutputManager, self).setUp()
+        self.output_manager = mock.Mock(DownloadSeekableOutputManager)
+        self.progress_callback = mock.Mock()
+        # The ranges (2, 4) and (8, 10) of the object are written one after
+        # another along with (3, 9), which overlaps both of them.
+        self.download_output_manager = DownloadRangesOutputManager(
+            self.output_manager, [(8, 10, 2), (2, 4, 0), (3, 9, 4)],
+            [self.progress_callback])
+        self.fileobj = WriteCollector()
+
+    def get_queued_writes(self):
+        return [
+            (call[0][2], bytes(call[0][1]))
+            for call in self.output_manager.queue_file_io_task.call_args_list
+        ]
+
+    def test_writes_requested_parts(self):
+        self.download_output_manager.queue_file_io_task(
+            self.fileobj, b'0123456789', 0)
+        self.assertEqual(
+            self.get_queued_writes(),
+            [(0, b'23'), (4, b'345678'), (2, b'89')])
+        # Progress for the two bytes that were not written is taken back
+        # and the two bytes that were written twice are counted twice.
+        self.assertFalse(self.progress_callback.called)
+
+    def test_reports_progress_for_each_write_of_overlapping_data(self):
+        self.download_output_manager.queue_file_io_task(
+            self.fileobj, b'345', 3)
+        self.assertEqual(self.get_queued_writes(), [(1, b'3'), (4, b'345')])
+        self.progress_callback.assert_called_once_with(bytes_transferred=1)
+
+    def test_drops_data_in_gaps(self):
+        self.download_output_manager.queue_file_io_task(
+            self.fileobj, b'01', 0)
+        self.assertEqual(self.get_queued_writes(), [])
+        self.progress_callback.assert_called_once_with(bytes_transferred=-2)
+
+    def test_done_callbacks_wait_for_every_part(self):
+        done_callback = mock.Mock()
+        self.download_output_manager.queue_file_io_task(
+            self.fileobj, b'345', 3, [done_callback])
+        self.assertFalse(done_callback.called)
+        part_done_callbacks = [
+            call[0][3][0]
+            for call in self.output_manager.queue_file_io_task.call_args_list
+        ]
+        self.assertEqual(len(part_done_callbacks), 2)
+        for part_done_callback in part_done_callbacks:
+            part_done_callback()
+        done_callback.assert_called_once_with()
+
+    def test_done_callbacks_for_dropped_data(self):
+        done_callback = mock.Mock()
+        self.download_output_manager.queue_file_io_task(
+            self.fileobj, b'01', 0, [done_callback])
+        done_callback.assert_called_once_with()
+
+    def test_no_direct_writes_with_several_ranges(self):
+        self.assertIsNone(
+            self.download_output_manager.get_buffer_for_direct_writes(
+                self.fileobj, 8))
+
+    def test_direct_writes_with_single_range(self):
+        buffer = bytearray(4)
+        download_output_manager = DownloadRangesOutputManager(
+            DownloadBufferOutputManager(
+                self.osutil, self.transfer_coordinator, self.io_executor),
+            [(10, 14, 0)])
+        direct_buffer = download_output_manager.get_buffer_for_direct_writes(
+            memoryview(buffer), 12)
+        direct_buffer[:] = b'ab'
+        self.assertEqual(buffer, bytearray(b'\x00\x00ab'))
+
+    def test_get_final_io_task(self):
+        self.assertIs(
+            self.download_output_manager.get_final_io_task(),
+            self.output_manager.get_final_io_task.return_value)
+
 
 class TestDownloadSubmissionTask(BaseSubmissionTaskTest):
     def setUp(self):
@@ -465,34 +1323,202 @@ class TestDownloadSubmissionTask(BaseSubmissionTaskTest):
         # to that task submission.
         self.assert_tag_for_get_object(None)
 
-    def test_submits_no_tag_for_get_object_fileobj(self):
+    def test_ranged_get_with_part_size_planner(self):
         self.wrap_executor_in_recorder()
+        self.configure_for_ranged_get()
+        self.config.max_request_concurrency = 1
         self.add_head_object_response()
-        self.add_get_responses()
+        for i in range(0, len(self.content), 3):
+            self.stubber.add_response(
+                'get_object', {'Body': six.BytesIO(self.content[i:i+3])})
+        planner = DownloadPartSizePlanner(
+            min_size=1, parts_per_request_slot=4)
+        self.submission_main_kwargs['part_size_planner'] = planner
 
-        with open(self.filename, 'wb') as f:
-            self.use_fileobj_in_call_args(f)
-            self.submission_task = self.get_download_submission_task()
-            self.wait_and_assert_completed_successfully(self.submission_task)
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
 
-        # Make sure no tag to limit that task specifically was not associated
-        # to that task submission.
-        self.assert_tag_for_get_object(None)
+        # The 10 byte object should have been split into 4 parts of 3
+        # bytes instead of using the configured chunksize of 4.
+        ranges = [
+            submission['task']._main_kwargs['extra_args']['Range']
+            for submission in self.executor.submissions
+        ]
+        self.assertEqual(
+            ranges, ['bytes=0-2', 'bytes=3-5', 'bytes=6-8', 'bytes=9-'])
+        self.assertIsNotNone(planner.throughput)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
 
-    def test_submits_no_tag_for_ranged_get_object_fileobj(self):
-        self.wrap_executor_in_recorder()
+    def test_ranged_get_buffer(self):
+        self.io_executor = RecordingExecutor(self.io_executor)
+        self.submission_main_kwargs['io_executor'] = self.io_executor
         self.configure_for_ranged_get()
         self.add_head_object_response()
         self.add_get_responses()
+        buffer = bytearray()
+        self.use_fileobj_in_call_args(buffer)
 
-        with open(self.filename, 'wb') as f:
-            self.use_fileobj_in_call_args(f)
-            self.submission_task = self.get_download_submission_task()
-            self.wait_and_assert_completed_successfully(self.submission_task)
-
-        # Make sure no tag to limit that task specifically was not associated
-        # to that task submission.
-        self.assert_tag_for_get_object(None)
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
+
+        # The content should be read directly into the buffer so the only
+        # task sent to the io executor should be the final task.
+        self.io_executor.shutdown()
+        self.assertEqual(len(self.io_executor.submissions), 1)
+        self.assertIsInstance(
+            self.io_executor.submissions[0]['task'], CompleteDownloadNOOPTask)
+        self.assertEqual(buffer, self.content)
+
+    def test_ranged_get_filename_with_mmap(self):
+        self.io_executor = RecordingExecutor(self.io_executor)
+        self.submission_main_kwargs['io_executor'] = self.io_executor
+        self.config.use_mmap_downloads = True
+        self.configure_for_ranged_get()
+        self.add_head_object_response()
+        self.add_get_responses()
+
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
+
+        # The content should be read directly into the file so the only
+        # task sent to the io executor should be the final rename task.
+        self.io_executor.shutdown()
+        self.assertEqual(len(self.io_executor.submissions), 1)
+        self.assertIsInstance(
+            self.io_executor.submissions[0]['task'], IORenameFileTask)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_ranged_get_resumes_download(self):
+        self.wrap_executor_in_recorder()
+        self.config.resumable_downloads = True
+        self.configure_for_ranged_get()
+        # Set up a previous attempt at the download that only got the
+        # middle of the object.
+        journal = DownloadJournal(
+            self.filename + '.s3download.journal',
+            {
+                'bucket': self.bucket, 'key': self.key, 'etag': '"myetag"',
+                'version_id': None, 'size': len(self.content)
+            },
+            self.osutil
+        )
+        journal.add_range(4, 8)
+        journal.save()
+        with open(self.filename + '.s3download', 'wb') as f:
+            f.write(b'\x00' * 4 + self.content[4:8])
+        self.stubber.add_response(
+            'head_object',
+            {'ContentLength': len(self.content), 'ETag': '"myetag"'})
+        for start, end in [(0, 4), (8, 10)]:
+            self.stubber.add_response(
+                'get_object', {'Body': six.BytesIO(self.content[start:end])},
+                expected_params={
+                    'Bucket': self.bucket, 'Key': self.key,
+                    'Range': 'bytes=%s-%s' % (start, end - 1),
+                    'IfMatch': '"myetag"'
+                }
+            )
+
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(os.listdir(self.tempdir), ['myfile'])
+
+    def test_skip_head_object_for_small_object(self):
+        self.config.skip_download_head_object = True
+        self.config.multipart_chunksize = 16
+        self.stubber.add_response(
+            'get_object',
+            {
+                'Body': self.stream, 'ContentRange': 'bytes 0-9/10',
+                'ContentLength': len(self.content)
+            },
+            expected_params={
+                'Bucket': self.bucket, 'Key': self.key, 'Range': 'bytes=0-15'
+            }
+        )
+
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
+
+        self.assertEqual(self.transfer_future.meta.size, len(self.content))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_skip_head_object_for_ranged_get(self):
+        self.config.skip_download_head_object = True
+        self.configure_for_ranged_get()
+        for start, end in [(0, 3), (4, 7), (8, 9)]:
+            requested_end = end
+            if start == 0:
+                requested_end = 3
+            self.stubber.add_response(
+                'get_object',
+                {
+                    'Body': six.BytesIO(self.content[start:end + 1]),
+                    'ContentRange': 'bytes %s-%s/10' % (start, end)
+                },
+                expected_params={
+                    'Bucket': self.bucket, 'Key': self.key,
+                    'Range': 'bytes=%s-%s' % (start, requested_end)
+                }
+            )
+
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_skip_head_object_for_empty_object(self):
+        self.config.skip_download_head_object = True
+        self.stubber.add_client_error(
+            'get_object', service_error_code='InvalidRange',
+            http_status_code=416)
+        self.stubber.add_response(
+            'get_object', {'Body': six.BytesIO(b'')},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+
+        self.submission_task = self.get_download_submission_task()
+        self.wait_and_assert_completed_successfully(self.submission_task)
+
+        self.assertEqual(self.transfer_future.meta.size, 0)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'')
+
+    def test_submits_no_tag_for_get_object_fileobj(self):
+        self.wrap_executor_in_recorder()
+        self.add_head_object_response()
+        self.add_get_responses()
+
+        with open(self.filename, 'wb') as f:
+            self.use_fileobj_in_call_args(f)
+            self.submission_task = self.get_download_submission_task()
+            self.wait_and_assert_completed_successfully(self.submission_task)
+
+        # Make sure no tag to limit that task specifically was not associated
+        # to that task submission.
+        self.assert_tag_for_get_object(None)
+
+    def test_submits_no_tag_for_ranged_get_object_fileobj(self):
+        self.wrap_executor_in_recorder()
+        self.configure_for_ranged_get()
+        self.add_head_object_response()
+        self.add_get_responses()
+
+        with open(self.filename, 'wb') as f:
+            self.use_fileobj_in_call_args(f)
+            self.submission_task = self.get_download_submission_task()
+            self.wait_and_assert_completed_successfully(self.submission_task)
+
+        # Make sure no tag to limit that task specifically was not associated
+        # to that task submission.
+        self.assert_tag_for_get_object(None)
 
     def tests_submits_tag_for_get_object_nonseekable_fileobj(self):
         self.wrap_executor_in_recorder()
@@ -523,6 +1549,26 @@ class TestDownloadSubmissionTask(BaseSubmissionTaskTest):
         # to that task submission.
         self.assert_tag_for_get_object(IN_MEMORY_DOWNLOAD_TAG)
 
+    def test_ranged_get_nonseekable_fileobj_with_window_planner(self):
+        self.configure_for_ranged_get()
+        self.add_head_object_response()
+        self.add_get_responses()
+        planner = mock.Mock(DownloadWindowPlanner)
+        self.submission_main_kwargs['window_planner'] = planner
+
+        with open(self.filename, 'wb') as f:
+            self.use_fileobj_in_call_args(NonSeekableWriter(f))
+            self.submission_task = self.get_download_submission_task()
+            self.wait_and_assert_completed_successfully(self.submission_task)
+
+        # Each ranged request and each write is measured.
+        self.assertEqual(planner.record_request.call_count, 3)
+        self.assertEqual(
+            sum(c[0][0] for c in planner.record_drain.call_args_list),
+            len(self.content))
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
 
 class TestGetObjectTask(BaseTaskTest):
     def setUp(self):
@@ -628,6 +1674,125 @@ class TestGetObjectTask(BaseTaskTest):
             [mock.call(mock.ANY, self.transfer_coordinator)]
         )
 
+    def test_reads_into_buffer_for_direct_writes(self):
+        buffer = bytearray(len(self.content) + 2)
+        self.download_output_manager.get_buffer_for_direct_writes = \
+            mock.Mock(return_value=memoryview(buffer)[2:])
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(start_index=2, io_chunksize=3)
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.download_output_manager.get_buffer_for_direct_writes.\
+            assert_called_with(self.fileobj, 2)
+        self.assertEqual(buffer[2:], self.content)
+        # Nothing should have gone through the io executor.
+        self.assert_io_writes([])
+
+    def assert_buffers_released(self, buffer_pool, num_buffers):
+        for _ in range(num_buffers):
+            buffer_pool.acquire(blocking=False)
+        with self.assertRaises(NoResourcesAvailable):
+            buffer_pool.acquire(blocking=False)
+
+    def test_uses_buffer_pool(self):
+        self.fileobj = six.BytesIO()
+        buffer_pool = BufferPool(buffer_size=3, max_buffers=2)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(buffer_pool=buffer_pool)
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        if self.io_executor is not None:
+            self.io_executor.shutdown()
+        self.assertEqual(self.fileobj.getvalue(), self.content)
+        self.assert_buffers_released(buffer_pool, 2)
+
+    def test_records_throughput_with_part_size_planner(self):
+        planner = mock.Mock(DownloadPartSizePlanner)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(part_size_planner=planner)
+        task()
+
+        planner.record_throughput.assert_called_once_with(
+            len(self.content), mock.ANY)
+
+    def test_records_request_with_window_planner(self):
+        planner = mock.Mock(DownloadWindowPlanner)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(window_planner=planner)
+        task()
+
+        planner.record_request.assert_called_once_with(
+            len(self.content), mock.ANY)
+
+    def test_records_downloaded_range(self):
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        with mock.patch.object(self.download_output_manager,
+                               'record_downloaded_range') as record:
+            task = self.get_download_task(start_index=5)
+            task()
+        record.assert_called_once_with(5, 5 + len(self.content))
+
+    def test_uses_provided_response(self):
+        task = self.get_download_task(response={'Body': self.stream})
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.assert_io_writes([(0, self.content)])
+
+    def test_retries_provided_response(self):
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(
+            response={'Body': StreamWithError(
+                copy.deepcopy(self.stream), SOCKET_ERROR)})
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.assert_io_writes([(0, self.content)])
+
+    def test_buffer_pool_released_on_retry(self):
+        self.fileobj = six.BytesIO()
+        buffer_pool = BufferPool(buffer_size=3, max_buffers=2)
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': StreamWithError(self.stream, SOCKET_ERROR, 1)
+            },
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': six.BytesIO(self.content)
+            },
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(buffer_pool=buffer_pool)
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        if self.io_executor is not None:
+            self.io_executor.shutdown()
+        self.assertEqual(self.fileobj.getvalue(), self.content)
+        self.assert_buffers_released(buffer_pool, 2)
+
     def test_retries_succeeds(self):
         self.stubber.add_response(
             'get_object', service_response={
@@ -695,6 +1860,168 @@ class TestGetObjectTask(BaseTaskTest):
             expected_contents.append((i, bytes(self.content[i:i+1])))
         self.assert_io_writes(expected_contents)
 
+    def test_retry_resumes_from_offset_with_etag(self):
+        # After the first read a retryable error will be thrown
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': StreamWithError(
+                    copy.deepcopy(self.stream), SOCKET_ERROR, 1),
+                'ETag': '"myetag"'
+            },
+            expected_params={
+                'Bucket': self.bucket, 'Key': self.key, 'Range': 'bytes=5-'
+            }
+        )
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': six.BytesIO(self.content[3:]), 'ETag': '"myetag"'
+            },
+            expected_params={
+                'Bucket': self.bucket, 'Key': self.key, 'Range': 'bytes=8-',
+                'IfMatch': '"myetag"'
+            }
+        )
+        self.extra_args['Range'] = 'bytes=5-'
+        callback = mock.Mock()
+        task = self.get_download_task(
+            io_chunksize=3, start_index=5, callbacks=[callback])
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        # Only the rest of the range was requested and nothing already
+        # downloaded was written or reported again.
+        self.assert_io_writes(
+            [(5, self.content[0:3]), (8, self.content[3:6]),
+             (11, self.content[6:9]), (14, self.content[9:])])
+        self.assertEqual(
+            sum(call[1]['bytes_transferred']
+                for call in callback.call_args_list),
+            len(self.content))
+        for call in callback.call_args_list:
+            self.assertGreater(call[1]['bytes_transferred'], 0)
+
+    def test_retry_resumes_within_closed_range(self):
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': StreamWithError(
+                    copy.deepcopy(self.stream), SOCKET_ERROR, 1),
+                'ETag': '"myetag"'
+            }
+        )
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': six.BytesIO(self.content[3:]), 'ETag': '"myetag"'
+            },
+            expected_params={
+                'Bucket': self.bucket, 'Key': self.key, 'Range': 'bytes=3-9',
+                'IfMatch': '"myetag"'
+            }
+        )
+        self.extra_args['Range'] = 'bytes=0-9'
+        task = self.get_download_task(io_chunksize=3)
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.assert_io_writes(
+            [(0, self.content[0:3]), (3, self.content[3:6]),
+             (6, self.content[6:9]), (9, self.content[9:])])
+
+    def test_does_not_resume_after_range_is_downloaded(self):
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': StreamWithError(
+                    copy.deepcopy(self.stream), SOCKET_ERROR, 1),
+                'ETag': '"myetag"'
+            }
+        )
+        self.extra_args['Range'] = 'bytes=0-9'
+        task = self.get_download_task(io_chunksize=len(self.content))
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.assert_io_writes([(0, self.content)])
+
+    def test_does_not_resume_at_end_of_object(self):
+        self.stubber.add_response(
+            'get_object', service_response={
+                'Body': StreamWithError(
+                    copy.deepcopy(self.stream), SOCKET_ERROR, 1),
+                'ETag': '"myetag"'
+            }
+        )
+        self.stubber.add_client_error(
+            'get_object', service_error_code='InvalidRange',
+            http_status_code=416)
+        task = self.get_download_task(io_chunksize=len(self.content))
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.assert_io_writes([(0, self.content)])
+
+    def test_hashes_content(self):
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        etag_calculator = ETagCalculator(len(self.content))
+        task = self.get_download_task(etag_calculator=etag_calculator)
+        task()
+
+        self.assert_io_writes([(0, self.content)])
+        self.assertEqual(
+            etag_calculator.get_etag(), hashlib.md5(self.content).hexdigest())
+
+    def test_hashes_content_on_hash_executor(self):
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        hash_threads = []
+        etag_calculator = mock.Mock(ETagCalculator)
+        etag_calculator.update.side_effect = lambda offset, data: \
+            hash_threads.append(threading.current_thread())
+        hash_executor = BoundedExecutor(1000, 1)
+        task = self.get_download_task(
+            etag_calculator=etag_calculator, hash_executor=hash_executor)
+        task()
+        hash_executor.shutdown()
+
+        self.assert_io_writes([(0, self.content)])
+        etag_calculator.update.assert_called_once_with(0, mock.ANY)
+        self.assertIsNot(hash_threads[0], threading.current_thread())
+
+    def test_releases_buffer_if_chunk_cannot_be_hashed(self):
+        buffer_pool = BufferPool(buffer_size=64, max_buffers=1)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        etag_calculator = mock.Mock(ETagCalculator)
+        etag_calculator.update.side_effect = Exception('failed')
+        task = self.get_download_task(
+            buffer_pool=buffer_pool, etag_calculator=etag_calculator)
+        task()
+
+        self.assertIsNotNone(self.transfer_coordinator.exception)
+        self.assert_buffers_released(buffer_pool, 1)
+
+    def test_releases_buffer_if_chunk_cannot_be_queued_to_hash(self):
+        buffer_pool = BufferPool(buffer_size=64, max_buffers=1)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        hash_executor = mock.Mock(BoundedExecutor)
+        hash_executor.submit.side_effect = Exception('failed')
+        task = self.get_download_task(
+            buffer_pool=buffer_pool,
+            etag_calculator=mock.Mock(ETagCalculator),
+            hash_executor=hash_executor)
+        task()
+
+        self.assertIsNotNone(self.transfer_coordinator.exception)
+        self.assert_buffers_released(buffer_pool, 1)
+
     def test_cancels_out_of_queueing(self):
         self.stubber.add_response(
             'get_object',
@@ -729,6 +2056,90 @@ class TestImmediatelyWriteIOGetObjectTask(TestGetObjectTask):
     def assert_io_writes(self, expected_writes):
         self.assertEqual(self.fileobj.writes, expected_writes)
 
+    def test_control_chunk_size_without_immediate_writer(self):
+        self.download_output_manager = DownloadNonSeekableOutputManager(
+            self.osutil, self.transfer_coordinator, self.io_executor)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(io_chunksize=1)
+        task()
+
+        self.assertEqual(
+            self.fileobj.writes,
+            [(i, self.content[i:i + 1]) for i in range(len(self.content))])
+
+    def test_does_not_create_io_write_tasks(self):
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        self.download_output_manager.get_io_write_task = mock.Mock()
+        task = self.get_download_task()
+        task()
+
+        self.assertFalse(self.download_output_manager.get_io_write_task.called)
+        self.assert_io_writes([(0, self.content)])
+
+    def test_buffer_is_no_larger_than_response(self):
+        self.stubber.add_response(
+            'get_object',
+            service_response={
+                'Body': self.stream, 'ContentLength': len(self.content)},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(io_chunksize=1024)
+        with mock.patch('s3transfer.download.ReusedBufferChunkIterator',
+                        wraps=ReusedBufferChunkIterator) as iterator_cls:
+            task()
+        buffer = iterator_cls.call_args[0][1]
+        self.assertEqual(len(buffer), len(self.content))
+        self.assert_io_writes([(0, self.content)])
+
+    def test_write_error_fails_transfer_without_retrying(self):
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        self.fileobj.write = mock.Mock(side_effect=OSError('disk full'))
+        task = self.get_download_task()
+        task()
+
+        self.stubber.assert_no_pending_responses()
+        self.assertIsInstance(self.transfer_coordinator.exception, OSError)
+
+    def test_fileobj_can_keep_references_to_written_data(self):
+        written = []
+
+        class ReferenceKeepingWriter(object):
+            def seek(self, offset):
+                pass
+
+            def write(self, data):
+                written.append(data)
+
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(
+            fileobj=ReferenceKeepingWriter(), io_chunksize=3)
+        task()
+
+        self.assertEqual(b''.join(written), self.content)
+
+    def test_releases_pooled_buffers(self):
+        # Pooled buffers are not used when data is written right away.
+        buffer_pool = BufferPool(buffer_size=4, max_buffers=1)
+        self.stubber.add_response(
+            'get_object', service_response={'Body': self.stream},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+        task = self.get_download_task(buffer_pool=buffer_pool)
+        task()
+        self.assert_io_writes([(0, self.content)])
+
 
 class BaseIOTaskTest(BaseTaskTest):
     def setUp(self):
@@ -743,6 +2154,27 @@ class BaseIOTaskTest(BaseTaskTest):
         self.files.remove_all()
 
 
+class TestDownloadStreamWriteTask(BaseTaskTest):
+    def test_main(self):
+        stream = DownloadStream(max_readahead_size=1024)
+        self.get_task(
+            DownloadStreamWriteTask,
+            main_kwargs={'stream': stream, 'data': b'foo', 'offset': 0})()
+        stream.finish()
+        self.assertEqual(stream.read(), b'foo')
+
+    def test_does_not_wait_for_room_in_readahead_window(self):
+        stream = DownloadStream(max_readahead_size=3)
+        self.get_task(
+            DownloadStreamWriteTask,
+            main_kwargs={'stream': stream, 'data': b'bar', 'offset': 3})()
+        self.get_task(
+            DownloadStreamWriteTask,
+            main_kwargs={'stream': stream, 'data': b'foo', 'offset': 0})()
+        stream.finish()
+        self.assertEqual(stream.read(), b'foobar')
+
+
 class TestIOStreamingWriteTask(BaseIOTaskTest):
     def test_main(self):
         with open(self.temp_filename, 'wb') as f:
@@ -767,6 +2199,20 @@ class TestIOStreamingWriteTask(BaseIOTaskTest):
             # the tasks were executed.
             self.assertEqual(f.read(), b'foobarbaz')
 
+    def test_records_drain(self):
+        window_planner = mock.Mock(DownloadWindowPlanner)
+        with open(self.temp_filename, 'wb') as f:
+            self.get_task(
+                IOStreamingWriteTask,
+                main_kwargs={
+                    'fileobj': f,
+                    'data': b'foobar',
+                    'window_planner': window_planner
+                }
+            )()
+        self.assertEqual(window_planner.record_drain.call_count, 1)
+        self.assertEqual(window_planner.record_drain.call_args[0][0], 6)
+
 
 class TestIOWriteTask(BaseIOTaskTest):
     def test_main(self):
@@ -797,6 +2243,89 @@ class TestIOWriteTask(BaseIOTaskTest):
             self.assertEqual(f.read(), b'foobar')
 
 
+class TestIOPositionalWriteTask(BaseIOTaskTest):
+    def test_main(self):
+        with DeferredOpenFile(self.temp_filename, mode='wb') as f:
+            for data, offset in [(b'bar', 3), (b'foo', 0)]:
+                task = self.get_task(
+                    IOPositionalWriteTask,
+                    main_kwargs={
+                        'fileobj': f,
+                        'data': data,
+                        'offset': offset
+                    }
+                )
+                task()
+
+        with open(self.temp_filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+
+    def test_releases_written_pages(self):
+        osutil = mock.Mock(OSUtils)
+        with DeferredOpenFile(self.temp_filename, mode='wb') as f:
+            task = self.get_task(
+                IOPositionalWriteTask,
+                main_kwargs={
+                    'fileobj': f,
+                    'data': b'foo',
+                    'offset': 3,
+                    'osutil': osutil
+                }
+            )
+            task()
+        osutil.release_written_pages.assert_called_once_with(f, 3, 3)
+
+
+class TestIOCoalescedWriteTask(BaseIOTaskTest):
+    def test_main(self):
+        write_queue = CoalescingWriteQueue(max_write_size=1024)
+        done_callback = mock.Mock()
+        for data, offset in [(b'bar', 3), (b'foo', 0)]:
+            write_queue.queue_write(offset, data, [done_callback])
+        with DeferredOpenFile(self.temp_filename, mode='wb') as f:
+            task = self.get_task(
+                IOCoalescedWriteTask,
+                main_kwargs={'fileobj': f, 'write_queue': write_queue}
+            )
+            task()
+
+        with open(self.temp_filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+        self.assertEqual(done_callback.call_count, 2)
+        self.assertEqual(write_queue.request_writes(), [])
+
+    def test_releases_written_pages(self):
+        write_queue = CoalescingWriteQueue(max_write_size=1024)
+        for data, offset in [(b'bar', 3), (b'foo', 0)]:
+            write_queue.queue_write(offset, data)
+        osutil = mock.Mock(OSUtils)
+        with DeferredOpenFile(self.temp_filename, mode='wb') as f:
+            task = self.get_task(
+                IOCoalescedWriteTask,
+                main_kwargs={
+                    'fileobj': f,
+                    'write_queue': write_queue,
+                    'osutil': osutil
+                }
+            )
+            task()
+        osutil.release_written_pages.assert_called_once_with(f, 0, 6)
+
+    def test_calls_done_callbacks_on_error(self):
+        write_queue = CoalescingWriteQueue(max_write_size=1024)
+        done_callback = mock.Mock()
+        write_queue.queue_write(0, b'foo', [done_callback])
+        fileobj = mock.Mock()
+        fileobj.pwritev.side_effect = OSError()
+        task = self.get_task(
+            IOCoalescedWriteTask,
+            main_kwargs={'fileobj': fileobj, 'write_queue': write_queue}
+        )
+        task()
+        done_callback.assert_called_once_with()
+
+
 class TestIORenameFileTask(BaseIOTaskTest):
     def test_main(self):
         with open(self.temp_filename, 'wb') as f:
@@ -813,6 +2342,70 @@ class TestIORenameFileTask(BaseIOTaskTest):
         self.assertFalse(os.path.exists(self.temp_filename))
 
 
+class TestIOHashTask(BaseTaskTest):
+    def test_main(self):
+        content = b'my content'
+        etag_calculator = ETagCalculator(len(content))
+        task = self.get_task(
+            IOHashTask,
+            main_kwargs={
+                'etag_calculator': etag_calculator,
+                'data': content,
+                'offset': 0
+            }
+        )
+        task()
+        self.assertEqual(
+            etag_calculator.get_etag(), hashlib.md5(content).hexdigest())
+
+
+class TestIOVerifyDownloadTask(BaseTaskTest):
+    def setUp(self):
+        super(TestIOVerifyDownloadTask, self).setUp()
+        self.content = b'my content'
+        self.etag_calculator = ETagCalculator(len(self.content))
+        self.etag_calculator.update(0, self.content)
+        self.transfer_future = self.get_transfer_future()
+        self.final_task = mock.Mock()
+
+    def get_verify_task(self, expected_etag):
+        return self.get_task(
+            IOVerifyDownloadTask,
+            main_kwargs={
+                'etag_calculator': self.etag_calculator,
+                'expected_etag': expected_etag,
+                'transfer_meta': self.transfer_future.meta,
+                'final_task': self.final_task
+            }
+        )
+
+    def test_main(self):
+        digest = hashlib.md5(self.content).hexdigest()
+        self.get_verify_task('"%s"' % digest)()
+        self.assertEqual(self.transfer_future.meta.digest, digest)
+        self.assertIsNone(self.transfer_coordinator.exception)
+        self.final_task.assert_called_once_with()
+
+    def test_is_final(self):
+        digest = hashlib.md5(self.content).hexdigest()
+        task = self.get_verify_task('"%s"' % digest)
+        # The task is submitted as the final task of the download, so the
+        # io executor can prioritize it like any other final task.
+        self.assertTrue(task.is_final)
+        task()
+        self.assertEqual(self.transfer_coordinator.status, 'success')
+
+    def test_mismatch(self):
+        self.get_verify_task('"%s"' % hashlib.md5(b'other').hexdigest())()
+        self.assertEqual(
+            self.transfer_future.meta.digest,
+            hashlib.md5(self.content).hexdigest())
+        self.assertIsInstance(
+            self.transfer_coordinator.exception, DownloadIntegrityError)
+        # The final task still runs so that the transfer is completed.
+        self.final_task.assert_called_once_with()
+
+
 class TestIOCloseTask(BaseIOTaskTest):
     def test_main(self):
         with open(self.temp_filename, 'w') as f:
@@ -846,6 +2439,157 @@ class TestDownloadChunkIterator(unittest.TestCase):
         self.assertEqual(ref_chunks, [b''])
 
 
+class TestDownloadBufferChunkIterator(unittest.TestCase):
+    def test_iter(self):
+        content = b'my content'
+        body = six.BytesIO(content)
+        buffer = bytearray(len(content))
+        ref_chunks = []
+        for chunk in DownloadBufferChunkIterator(body, buffer, len(content)):
+            ref_chunks.append(chunk.tobytes())
+        self.assertEqual(ref_chunks, [b'my content'])
+        self.assertEqual(buffer, content)
+
+    def test_iter_chunksize(self):
+        content = b'1234'
+        body = six.BytesIO(content)
+        buffer = bytearray(len(content))
+        ref_chunks = []
+        for chunk in DownloadBufferChunkIterator(body, buffer, 3):
+            ref_chunks.append(chunk.tobytes())
+        self.assertEqual(ref_chunks, [b'123', b'4'])
+        self.assertEqual(buffer, content)
+
+    def test_stops_at_end_of_body(self):
+        body = six.BytesIO(b'12')
+        buffer = bytearray(4)
+        ref_chunks = []
+        for chunk in DownloadBufferChunkIterator(body, buffer, 3):
+            ref_chunks.append(chunk.tobytes())
+        self.assertEqual(ref_chunks, [b'12'])
+        self.assertEqual(buffer, b'12\x00\x00')
+
+    def test_raises_if_body_larger_than_buffer(self):
+        body = six.BytesIO(b'1234')
+        buffer = bytearray(2)
+        chunks = DownloadBufferChunkIterator(body, buffer, 3)
+        self.assertEqual(next(chunks).tobytes(), b'12')
+        with self.assertRaises(DownloadIntegrityError):
+            next(chunks)
+
+    def test_empty_content(self):
+        body = six.BytesIO(b'')
+        ref_chunks = []
+        for chunk in DownloadBufferChunkIterator(body, bytearray(3), 3):
+            ref_chunks.append(chunk)
+        self.assertEqual(ref_chunks, [])
+
+
+class TestPooledDownloadChunkIterator(unittest.TestCase):
+    def setUp(self):
+        self.buffer_pool = BufferPool(buffer_size=3, max_buffers=10)
+
+    def get_chunks(self, body):
+        chunks = []
+        for buffer, chunk in PooledDownloadChunkIterator(
+                body, self.buffer_pool):
+            chunks.append(chunk.tobytes())
+            self.buffer_pool.release(buffer)
+        return chunks
+
+    def test_iter(self):
+        body = six.BytesIO(b'123456')
+        self.assertEqual(self.get_chunks(body), [b'123', b'456'])
+
+    def test_last_chunk_smaller_than_buffer(self):
+        body = six.BytesIO(b'1234')
+        self.assertEqual(self.get_chunks(body), [b'123', b'4'])
+
+    def test_fills_buffer_on_short_reads(self):
+        body = mock.Mock(spec=['read'])
+        body.read.side_effect = [b'1', b'23', b'4', b'']
+        self.assertEqual(self.get_chunks(body), [b'123', b'4'])
+
+    def test_empty_content(self):
+        body = six.BytesIO(b'')
+        self.assertEqual(self.get_chunks(body), [b''])
+
+    def test_reuses_buffers(self):
+        body = six.BytesIO(b'123456')
+        buffers = []
+        for buffer, _ in PooledDownloadChunkIterator(body, self.buffer_pool):
+            buffers.append(buffer)
+            self.buffer_pool.release(buffer)
+        self.assertIs(buffers[0], buffers[1])
+
+    def test_releases_buffer_on_error(self):
+        buffer_pool = BufferPool(buffer_size=3, max_buffers=1)
+        body = StreamWithError(six.BytesIO(b'123'), SOCKET_ERROR)
+        with self.assertRaises(SOCKET_ERROR):
+            next(PooledDownloadChunkIterator(body, buffer_pool))
+        # The buffer should be back in the pool.
+        buffer_pool.acquire(blocking=False)
+
+
+class TestCoalescingWriteQueue(unittest.TestCase):
+    def setUp(self):
+        self.q = CoalescingWriteQueue(max_write_size=6)
+
+    def test_no_writes(self):
+        self.assertEqual(self.q.request_writes(), [])
+
+    def test_single_write(self):
+        self.q.queue_write(0, b'foo')
+        self.assertEqual(
+            self.q.request_writes(),
+            [{'offset': 0, 'data': [b'foo'], 'done_callbacks': []}])
+
+    def test_groups_adjacent_writes_in_order(self):
+        first_callback = mock.Mock()
+        second_callback = mock.Mock()
+        self.q.queue_write(3, b'bar', [second_callback])
+        self.q.queue_write(0, b'foo', [first_callback])
+        self.assertEqual(
+            self.q.request_writes(),
+            [{'offset': 0, 'data': [b'foo', b'bar'],
+              'done_callbacks': [first_callback, second_callback]}])
+
+    def test_does_not_group_writes_with_gaps(self):
+        self.q.queue_write(0, b'foo')
+        self.q.queue_write(4, b'bar')
+        self.assertEqual(
+            self.q.request_writes(),
+            [{'offset': 0, 'data': [b'foo'], 'done_callbacks': []},
+             {'offset': 4, 'data': [b'bar'], 'done_callbacks': []}])
+
+    def test_respects_max_write_size(self):
+        self.q.queue_write(0, b'foo')
+        self.q.queue_write(3, b'bar')
+        self.q.queue_write(6, b'baz')
+        self.assertEqual(
+            self.q.request_writes(),
+            [{'offset': 0, 'data': [b'foo', b'bar'], 'done_callbacks': []},
+             {'offset': 6, 'data': [b'baz'], 'done_callbacks': []}])
+
+    def test_does_not_split_large_writes(self):
+        self.q.queue_write(0, b'foobarbaz')
+        self.assertEqual(
+            self.q.request_writes(),
+            [{'offset': 0, 'data': [b'foobarbaz'], 'done_callbacks': []}])
+
+    def test_requesting_writes_removes_them(self):
+        self.q.queue_write(0, b'foo')
+        self.q.request_writes()
+        self.assertEqual(self.q.request_writes(), [])
+
+    def test_discard_writes(self):
+        done_callback = mock.Mock()
+        self.q.queue_write(0, b'foo', [done_callback])
+        self.q.discard_writes()
+        done_callback.assert_called_once_with()
+        self.assertEqual(self.q.request_writes(), [])
+
+
 class TestDeferQueue(unittest.TestCase):
     def setUp(self):
         self.q = DeferQueue()
@@ -940,3 +2684,264 @@ class TestDeferQueue(unittest.TestCase):
                 {'offset': 2, 'data': 'c'},
             ]
         )
+
+
+class TestDownloadJournal(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'journal')
+        self.osutil = OSUtils()
+        self.identity = {'bucket': 'mybucket', 'key': 'mykey', 'etag': 'a'}
+        self.journal = DownloadJournal(
+            self.filename, self.identity, self.osutil)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_load_missing_journal(self):
+        self.assertIsNone(
+            DownloadJournal.load(self.filename, self.identity, self.osutil))
+
+    def test_load_corrupt_journal(self):
+        with open(self.filename, 'w') as f:
+            f.write('{')
+        self.assertIsNone(
+            DownloadJournal.load(self.filename, self.identity, self.osutil))
+
+    def test_save(self):
+        self.journal.add_range(4, 8)
+        self.journal.save()
+        journal = DownloadJournal.load(
+            self.filename, self.identity, self.osutil)
+        self.assertEqual(journal.downloaded_ranges, [(4, 8)])
+        # Only the journal itself should have been left behind.
+        self.assertEqual(os.listdir(self.tempdir), ['journal'])
+
+    def test_load_journal_for_different_object(self):
+        self.journal.save()
+        identity = dict(self.identity, etag='b')
+        self.assertIsNone(
+            DownloadJournal.load(self.filename, identity, self.osutil))
+
+    def test_merges_ranges(self):
+        self.journal.add_range(8, 10)
+        self.journal.add_range(0, 4)
+        self.journal.add_range(4, 6)
+        self.assertEqual(self.journal.downloaded_ranges, [(0, 6), (8, 10)])
+        self.journal.add_range(6, 8)
+        self.assertEqual(self.journal.downloaded_ranges, [(0, 10)])
+
+    def test_ignores_empty_ranges(self):
+        self.journal.add_range(4, 4)
+        self.assertEqual(self.journal.downloaded_ranges, [])
+
+    def test_remove(self):
+        self.journal.save()
+        self.journal.remove()
+        self.assertFalse(os.path.exists(self.filename))
+
+
+class TestDownloadStream(unittest.TestCase):
+    def setUp(self):
+        self.stream = DownloadStream(max_readahead_size=6)
+
+    def test_read_reorders_data(self):
+        self.stream.queue_write(3, b'bar')
+        self.stream.queue_write(0, b'foo')
+        self.stream.finish()
+        self.assertEqual(self.stream.read(), b'foobar')
+
+    def test_read_amount(self):
+        self.stream.queue_write(0, b'foo')
+        self.stream.queue_write(3, b'bar')
+        self.stream.finish()
+        self.assertEqual(self.stream.read(2), b'fo')
+        self.assertEqual(self.stream.read(2), b'ob')
+        self.assertEqual(self.stream.read(5), b'ar')
+        self.assertEqual(self.stream.read(5), b'')
+
+    def test_read_waits_for_data(self):
+        def queue_data():
+            self.stream.queue_write(0, b'foo')
+            self.stream.finish()
+
+        thread = threading.Thread(target=queue_data)
+        thread.start()
+        self.assertEqual(self.stream.read(), b'foo')
+        thread.join()
+
+    def test_iter(self):
+        self.stream.queue_write(0, b'foo')
+        self.stream.queue_write(3, b'bar')
+        self.stream.finish()
+        self.assertEqual(list(self.stream), [b'foo', b'bar'])
+
+    def test_is_in_readahead_window(self):
+        self.assertTrue(self.stream.is_in_readahead_window(5))
+        self.assertFalse(self.stream.is_in_readahead_window(6))
+
+    def test_reading_moves_readahead_window(self):
+        self.stream.queue_write(0, b'foo')
+        self.stream.queue_write(3, b'bar')
+        self.assertEqual(self.stream.read(3), b'foo')
+        self.assertTrue(self.stream.is_in_readahead_window(8))
+        self.assertFalse(self.stream.is_in_readahead_window(9))
+
+    def test_window_callbacks_called_on_read(self):
+        callback = mock.Mock()
+        self.stream.add_window_callback(callback)
+        self.stream.queue_write(0, b'foo')
+        self.stream.read(3)
+        callback.assert_called_once_with()
+
+    def test_window_callbacks_called_on_close(self):
+        callback = mock.Mock()
+        self.stream.add_window_callback(callback)
+        self.stream.close()
+        callback.assert_called_once_with()
+
+    def test_done_callbacks_called_once_data_read(self):
+        done_callback = mock.Mock()
+        self.stream.queue_write(
+            0, memoryview(bytearray(b'foobar')), [done_callback])
+        self.assertEqual(self.stream.read(3), b'foo')
+        self.assertFalse(done_callback.called)
+        self.assertEqual(self.stream.read(3), b'bar')
+        done_callback.assert_called_once_with()
+
+    def test_iter_returns_copies_of_held_data(self):
+        buffer = bytearray(b'foo')
+        done_callback = mock.Mock()
+        self.stream.queue_write(0, memoryview(buffer), [done_callback])
+        self.stream.finish()
+        chunk = next(self.stream)
+        done_callback.assert_called_once_with()
+        buffer[:] = b'bar'
+        self.assertEqual(chunk, b'foo')
+
+    def test_done_callbacks_called_on_close(self):
+        done_callback = mock.Mock()
+        self.stream.queue_write(0, b'foo', [done_callback])
+        self.stream.close()
+        done_callback.assert_called_once_with()
+
+    def test_done_callbacks_called_if_closed(self):
+        done_callback = mock.Mock()
+        self.stream.close()
+        self.stream.queue_write(0, b'foo', [done_callback])
+        done_callback.assert_called_once_with()
+
+    def test_ignores_duplicate_writes(self):
+        self.stream.queue_write(0, b'foo')
+        self.stream.queue_write(0, b'foo')
+        self.stream.finish()
+        self.assertEqual(self.stream.read(), b'foo')
+
+    def test_raises_exception_after_queued_data(self):
+        self.stream.queue_write(0, b'foo')
+        self.stream.set_exception(DownloadException())
+        self.assertEqual(self.stream.read(3), b'foo')
+        with self.assertRaises(DownloadException):
+            self.stream.read(3)
+
+    def test_close_cancels_download(self):
+        future = mock.Mock()
+        future.done.return_value = False
+        self.stream.set_future(future)
+        self.stream.close()
+        future.cancel.assert_called_once_with()
+
+    def test_read_after_close(self):
+        self.stream.close()
+        with self.assertRaises(ValueError):
+            self.stream.read()
+
+    def test_context_manager(self):
+        with self.stream as stream:
+            self.assertTrue(stream.readable())
+        with self.assertRaises(ValueError):
+            self.stream.read()
+
+
+class TestDownloadStreamSubscriber(unittest.TestCase):
+    def setUp(self):
+        self.stream = DownloadStream(max_readahead_size=6)
+        self.subscriber = DownloadStreamSubscriber(self.stream)
+        self.future = mock.Mock()
+
+    def test_on_done_success(self):
+        self.stream.queue_write(0, b'foo')
+        self.subscriber.on_done(future=self.future)
+        self.assertEqual(self.stream.read(), b'foo')
+
+    def test_on_done_failure(self):
+        self.future.result.side_effect = DownloadException()
+        self.subscriber.on_done(future=self.future)
+        with self.assertRaises(DownloadException):
+            self.stream.read()
+
+
+class SpillFile(six.BytesIO):
+    def close(self):
+        # Keep the content around to check what was spilled.
+        self.closed_called = True
+
+
+class TestDeferQueueSpilling(unittest.TestCase):
+    def setUp(self):
+        self.spill_files = []
+        self.q = DeferQueue(
+            max_in_memory_size=4, spill_file_factory=self.create_spill_file)
+
+    def create_spill_file(self):
+        spill_file = SpillFile()
+        self.spill_files.append(spill_file)
+        return spill_file
+
+    def test_does_not_spill_below_threshold(self):
+        self.q.request_writes(offset=4, data=b'bar')
+        self.assertEqual(self.spill_files, [])
+
+    def test_spills_above_threshold(self):
+        self.assertEqual(self.q.request_writes(offset=4, data=b'baz'), [])
+        self.assertEqual(self.q.request_writes(offset=7, data=b'qux'), [])
+        self.assertEqual(self.spill_files[0].getvalue(), b'qux')
+
+        writes = self.q.request_writes(offset=0, data=b'foo-')
+        self.assertEqual(
+            writes,
+            [
+                {'offset': 0, 'data': b'foo-'},
+                {'offset': 4, 'data': b'baz'},
+                {'offset': 7, 'data': b'qux'},
+            ]
+        )
+
+    def test_closes_spill_file_once_drained(self):
+        self.q.request_writes(offset=6, data=b'bazqux')
+        self.q.request_writes(offset=0, data=b'foobar')
+        self.assertTrue(self.spill_files[0].closed_called)
+
+    def test_memory_is_freed_once_written(self):
+        self.q.request_writes(offset=3, data=b'bar')
+        self.q.request_writes(offset=0, data=b'foo')
+        # The memory used by the deferred write is available again.
+        self.q.request_writes(offset=9, data=b'qux')
+        self.assertEqual(self.spill_files, [])
+
+    def test_duplicate_spilled_writes_are_ignored(self):
+        self.q.request_writes(offset=3, data=b'barbaz')
+        self.q.request_writes(offset=3, data=b'barbaz')
+        writes = self.q.request_writes(offset=0, data=b'foo')
+        self.assertEqual(
+            writes,
+            [
+                {'offset': 0, 'data': b'foo'},
+                {'offset': 3, 'data': b'barbaz'},
+            ]
+        )
+
+    def test_close(self):
+        self.q.request_writes(offset=3, data=b'barbaz')
+        self.q.close()
+        self.assertTrue(self.spill_files[0].closed_called)
@@ -27,6 +27,8 @@ from s3transfer.futures import TransferFuture
 from s3transfer.futures import TransferMeta
 from s3transfer.futures import TransferCoordinator
 from s3transfer.futures import BoundedExecutor
+from s3transfer.futures import ShardedBoundedExecutor
+from s3transfer.futures import PrioritizedTaskScheduler
 from s3transfer.futures import ExecutorFuture
 from s3transfer.futures import BaseExecutor
 from s3transfer.futures import NonThreadedExecutor
@@ -169,6 +171,11 @@ class TestTransferCoordinator(unittest.TestCase):
         transfer_coordinator = TransferCoordinator(transfer_id=1)
         self.assertEqual(transfer_coordinator.transfer_id, 1)
 
+    def test_priority(self):
+        self.assertEqual(self.transfer_coordinator.priority, 0)
+        transfer_coordinator = TransferCoordinator(priority=5)
+        self.assertEqual(transfer_coordinator.priority, 5)
+
     def test_repr(self):
         transfer_coordinator = TransferCoordinator(transfer_id=1)
         self.assertEqual(
@@ -277,6 +284,25 @@ class TestTransferCoordinator(unittest.TestCase):
         # succes is a done state.
         self.assertEqual(self.transfer_coordinator.status, 'success')
 
+    def test_cancel_callbacks(self):
+        callback = mock.Mock()
+        self.transfer_coordinator.add_cancel_callback(callback, 'foo')
+        self.transfer_coordinator.set_status_to_running()
+        self.transfer_coordinator.cancel()
+        callback.assert_called_once_with('foo')
+        # The callbacks are only ran once.
+        self.transfer_coordinator.cancel()
+        callback.assert_called_once_with('foo')
+
+    def test_cancel_callbacks_not_ran_once_done(self):
+        callback = mock.Mock()
+        self.transfer_coordinator.add_cancel_callback(callback)
+        self.transfer_coordinator.set_status_to_running()
+        self.transfer_coordinator.set_result('foo')
+        self.transfer_coordinator.announce_done()
+        self.transfer_coordinator.cancel()
+        self.assertFalse(callback.called)
+
     def test_set_result_can_override_cancel(self):
         self.transfer_coordinator.cancel()
         # Result setting should override any cancel or set exception as this
@@ -301,6 +327,30 @@ class TestTransferCoordinator(unittest.TestCase):
         )
         self.assertEqual(future.result(), 'foo')
 
+    def test_submit_without_blocking(self):
+        semaphore = TaskSemaphore(1)
+        executor = RecordingExecutor(
+            BoundedExecutor(1, 1, {'my-tag': semaphore}))
+        task = ReturnFooTask(self.transfer_coordinator)
+        future = self.transfer_coordinator.submit(
+            executor, task, tag='my-tag', block=False)
+        self.assertEqual(future.result(), 'foo')
+        executor.shutdown()
+        self.assertEqual(
+            executor.submissions,
+            [{'block': False, 'tag': 'my-tag', 'task': task}]
+        )
+
+    def test_submit_without_blocking_raises_if_no_room(self):
+        semaphore = TaskSemaphore(1)
+        semaphore.acquire('other-transfer')
+        executor = BoundedExecutor(1, 1, {'my-tag': semaphore})
+        with self.assertRaises(NoResourcesAvailable):
+            self.transfer_coordinator.submit(
+                executor, ReturnFooTask(self.transfer_coordinator),
+                tag='my-tag', block=False)
+        executor.shutdown()
+
     def test_association_and_disassociation_on_submit(self):
         self.transfer_coordinator = RecordingTransferCoordinator()
 
@@ -555,6 +605,170 @@ class TestBoundedExecutor(unittest.TestCase):
         self.assertTrue(mocked_executor_cls.return_value.submit.called)
 
 
+class TestShardedBoundedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor_cls = mock.Mock(BaseExecutor)
+        self.executor = ShardedBoundedExecutor(10, 2, {}, self.executor_cls)
+
+    def get_task(self, transfer_id):
+        return ReturnFooTask(TransferCoordinator(transfer_id=transfer_id))
+
+    def get_shard_for_submission(self, transfer_id):
+        for shard in self.executor._shards:
+            shard.submit.reset_mock()
+        self.executor.submit(self.get_task(transfer_id))
+        for shard in self.executor._shards:
+            if shard.submit.called:
+                return shard
+
+    def test_creates_single_threaded_shards(self):
+        self.assertEqual(
+            self.executor_cls.call_args_list,
+            [mock.call(max_workers=1), mock.call(max_workers=1)]
+        )
+
+    def test_same_transfer_always_uses_same_shard(self):
+        self.executor_cls.side_effect = lambda max_workers: mock.Mock(
+            BaseExecutor)
+        self.executor = ShardedBoundedExecutor(10, 2, {}, self.executor_cls)
+        shard = self.get_shard_for_submission(transfer_id=0)
+        self.assertIs(self.get_shard_for_submission(transfer_id=0), shard)
+        self.assertIsNot(self.get_shard_for_submission(transfer_id=1), shard)
+
+    def test_runs_tasks(self):
+        executor = ShardedBoundedExecutor(10, 2)
+        futures = [executor.submit(self.get_task(i)) for i in range(4)]
+        executor.shutdown()
+        self.assertEqual([f.result() for f in futures], ['foo'] * 4)
+
+    def test_shutdown_shuts_down_all_shards(self):
+        self.executor.shutdown()
+        self.assertEqual(
+            self.executor_cls.return_value.shutdown.call_args_list,
+            [mock.call(True), mock.call(True)]
+        )
+
+
+class RecordTaskTask(Task):
+    def _main(self, name, ran, **kwargs):
+        ran.append(name)
+        return name
+
+
+class DeferredExecutor(BaseExecutor):
+    def __init__(self, max_workers=None):
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(fn)
+
+    def run_all(self):
+        while self.submitted:
+            self.submitted.pop(0)()
+
+
+class TestPrioritizedTaskScheduler(unittest.TestCase):
+    def setUp(self):
+        self.executor = DeferredExecutor()
+        self.scheduler = PrioritizedTaskScheduler(
+            self.executor, aging_interval=4)
+        self.ran = []
+        self.coordinators = {}
+
+    def submit(self, transfer_id, name, priority=0, is_final=False):
+        if transfer_id not in self.coordinators:
+            self.coordinators[transfer_id] = TransferCoordinator(
+                transfer_id=transfer_id, priority=priority)
+        task = RecordTaskTask(
+            self.coordinators[transfer_id],
+            main_kwargs={'name': name, 'ran': self.ran},
+            is_final=is_final
+        )
+        return self.scheduler.submit(task)
+
+    def test_runs_tasks_and_sets_results(self):
+        future = self.submit(0, 'a')
+        self.assertFalse(future.done())
+        self.executor.run_all()
+        self.assertEqual(future.result(), 'a')
+
+    def test_runs_tasks_of_a_transfer_in_order(self):
+        for name in ['a', 'b', 'c']:
+            self.submit(0, name)
+        self.executor.run_all()
+        self.assertEqual(self.ran, ['a', 'b', 'c'])
+
+    def test_transfers_of_same_priority_take_turns(self):
+        for name in ['a1', 'a2', 'a3']:
+            self.submit(0, name)
+        for name in ['b1', 'b2']:
+            self.submit(1, name)
+        self.executor.run_all()
+        self.assertEqual(self.ran, ['a1', 'b1', 'a2', 'b2', 'a3'])
+
+    def test_higher_priority_transfer_runs_first(self):
+        for name in ['a1', 'a2']:
+            self.submit(0, name)
+        for name in ['b1', 'b2']:
+            self.submit(1, name, priority=1)
+        self.executor.run_all()
+        self.assertEqual(self.ran, ['b1', 'b2', 'a1', 'a2'])
+
+    def test_final_task_runs_before_other_transfers(self):
+        for name in ['a1', 'a2']:
+            self.submit(0, name, priority=1)
+        self.submit(1, 'b-final', is_final=True)
+        self.executor.run_all()
+        self.assertEqual(self.ran, ['b-final', 'a1', 'a2'])
+
+    def test_final_task_waits_on_tasks_of_its_transfer(self):
+        self.submit(0, 'a1', priority=1)
+        self.submit(1, 'b1')
+        self.submit(1, 'b-final', is_final=True)
+        self.executor.run_all()
+        self.assertEqual(self.ran, ['a1', 'b1', 'b-final'])
+
+    def test_lower_priority_transfer_is_not_starved(self):
+        self.submit(0, 'low')
+        for i in range(10):
+            self.submit(1, 'high%s' % i, priority=1)
+        self.executor.run_all()
+        # With an aging interval of 4, the low priority transfer catches up
+        # with the higher priority transfer after four of its tasks have ran
+        # and then wins the tie for having waited the longest.
+        self.assertEqual(self.ran.index('low'), 4)
+
+    def test_exception_is_set_on_future(self):
+        task = mock.Mock()
+        task.transfer_id = 0
+        task.priority = 0
+        task.is_final = False
+        task.side_effect = ValueError('bad')
+        future = self.scheduler.submit(task)
+        self.executor.run_all()
+        with self.assertRaises(ValueError):
+            future.result()
+
+    def test_failed_submission_is_not_left_pending(self):
+        self.executor.submit = mock.Mock(side_effect=RuntimeError())
+        with self.assertRaises(RuntimeError):
+            self.submit(0, 'a')
+        del self.executor.submit
+        self.submit(1, 'b')
+        self.executor.run_all()
+        self.assertEqual(self.ran, ['b'])
+
+    def test_with_thread_pool_executor(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scheduler = PrioritizedTaskScheduler(executor)
+            futures = []
+            for i in range(4):
+                coordinator = TransferCoordinator(transfer_id=i)
+                futures.append(scheduler.submit(RecordTaskTask(
+                    coordinator, main_kwargs={'name': i, 'ran': self.ran})))
+        self.assertEqual([f.result() for f in futures], [0, 1, 2, 3])
+
+
 class TestExecutorFuture(unittest.TestCase):
     def test_result(self):
         with ThreadPoolExecutor(max_workers=1) as executor:
@@ -32,6 +32,10 @@ class TestTransferConfig(unittest.TestCase):
         with self.assertRaises(ValueError):
             TransferConfig(max_request_queue_size=0)
 
+    def test_allows_false_flags(self):
+        config = TransferConfig(use_mmap_downloads=False)
+        self.assertFalse(config.use_mmap_downloads)
+
 
 class TestTransferCoordinatorController(unittest.TestCase):
     def setUp(self):
@@ -395,6 +395,16 @@ class TestTask(unittest.TestCase):
         # to the transfer coordinator.
         self.assertEqual(task.transfer_id, self.transfer_id)
 
+    def test_priority(self):
+        self.transfer_coordinator.priority = 3
+        task = SuccessTask(self.transfer_coordinator)
+        self.assertEqual(task.priority, 3)
+
+    def test_is_final(self):
+        self.assertFalse(SuccessTask(self.transfer_coordinator).is_final)
+        self.assertTrue(
+            SuccessTask(self.transfer_coordinator, is_final=True).is_final)
+
     def test_context_status_transitioning_success(self):
         # The status should be set to running.
         self.transfer_coordinator.set_status_to_running()
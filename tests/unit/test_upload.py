@@ -15,7 +15,9 @@ import os
 import tempfile
 import shutil
 import math
+from array import array
 
+import mock
 from botocore.stub import ANY
 
 from tests import unittest
@@ -33,11 +35,20 @@ from s3transfer.upload import InterruptReader
 from s3transfer.upload import UploadFilenameInputManager
 from s3transfer.upload import UploadSeekableInputManager
 from s3transfer.upload import UploadNonSeekableInputManager
+from s3transfer.upload import UploadBufferInputManager
 from s3transfer.upload import UploadSubmissionTask
 from s3transfer.upload import PutObjectTask
 from s3transfer.upload import UploadPartTask
+from s3transfer.upload import CreateResumableMultipartUploadTask
+from s3transfer.upload import UploadResumablePartTask
+from s3transfer.upload import CompleteResumableMultipartUploadTask
+from s3transfer.upload import UploadJournal
 from s3transfer.utils import CallArgs
 from s3transfer.utils import OSUtils
+from s3transfer.utils import BufferPool
+from s3transfer.utils import BufferReader
+from s3transfer.utils import NoResourcesAvailable
+from s3transfer.utils import UploadPartSizePlanner
 from s3transfer.utils import MIN_UPLOAD_CHUNKSIZE
 
 
@@ -289,6 +300,81 @@ class TestUploadFilenameInputManager(BaseUploadInputManagerTest):
                 read_file_chunk.read()
 
 
+class TestUploadFilenameInputManagerReadahead(BaseUploadInputManagerTest):
+    def setUp(self):
+        super(TestUploadFilenameInputManagerReadahead, self).setUp()
+        self.osutil = OSUtils()
+        self.osutil.readahead_pages = mock.Mock()
+        self.upload_input_manager = UploadFilenameInputManager(
+            self.osutil, self.transfer_coordinator)
+        self.call_args = CallArgs(
+            fileobj=self.filename, subscribers=self.subscribers)
+        self.future = self.get_transfer_future(self.call_args)
+        self.future.meta.provide_transfer_size(len(self.content))
+
+    def test_put_object_body_reads_ahead_whole_file(self):
+        with self.upload_input_manager.get_put_object_body(
+                self.future) as body:
+            body.read()
+        self.osutil.readahead_pages.assert_called_once_with(
+            mock.ANY, 0, len(self.content))
+
+    def test_upload_part_bodies_read_ahead_their_part(self):
+        part_iterator = self.upload_input_manager.yield_upload_part_bodies(
+            self.future, 4)
+        for _, read_file_chunk in part_iterator:
+            with read_file_chunk:
+                read_file_chunk.read()
+        self.assertEqual(
+            self.osutil.readahead_pages.call_args_list,
+            [mock.call(mock.ANY, start_byte, 4)
+             for start_byte in range(0, len(self.content), 4)])
+
+
+class TestUploadFilenameInputManagerSharedFile(BaseUploadInputManagerTest):
+    def setUp(self):
+        super(TestUploadFilenameInputManagerSharedFile, self).setUp()
+        self.osutil = OSUtils()
+        self.upload_input_manager = UploadFilenameInputManager(
+            self.osutil, self.transfer_coordinator)
+        self.call_args = CallArgs(
+            fileobj=self.filename, subscribers=self.subscribers)
+        self.future = self.get_transfer_future(self.call_args)
+        self.future.meta.provide_transfer_size(len(self.content))
+
+    def test_upload_part_bodies_share_one_open_file(self):
+        with mock.patch.object(
+                self.osutil, 'open', wraps=self.osutil.open) as open_file:
+            bodies = [
+                body for _, body in
+                self.upload_input_manager.yield_upload_part_bodies(
+                    self.future, 4)
+            ]
+            for body in bodies:
+                body.read()
+            for body in bodies:
+                body.close()
+        self.assertEqual(open_file.call_count, 1)
+
+    def test_failure_closes_shared_file(self):
+        opened_files = []
+
+        def open_file(filename, mode):
+            opened_files.append(open(filename, mode))
+            return opened_files[-1]
+
+        self.osutil.open = open_file
+        part_iterator = self.upload_input_manager.yield_upload_part_bodies(
+            self.future, 4)
+        _, body = next(part_iterator)
+        body.read()
+        self.transfer_coordinator.set_exception(InterruptionError())
+        self.transfer_coordinator.announce_done()
+        # The file should be closed even though the body was never closed.
+        self.assertEqual(len(opened_files), 1)
+        self.assertTrue(opened_files[0].closed)
+
+
 class TestUploadSeekableInputManager(TestUploadFilenameInputManager):
     def setUp(self):
         super(TestUploadSeekableInputManager, self).setUp()
@@ -410,6 +496,129 @@ class TestUploadNonSeekableInputManager(TestUploadFilenameInputManager):
         self.config.multipart_threshold = 8
         self.assert_multipart_parts()
 
+    def get_pooled_input_manager(self, buffer_size):
+        buffer_pool = mock.Mock(BufferPool)
+        buffer_pool.buffer_size = buffer_size
+        buffer_pool.acquire.side_effect = lambda: bytearray(buffer_size)
+        upload_input_manager = UploadNonSeekableInputManager(
+            self.osutil, self.transfer_coordinator, buffer_pool=buffer_pool)
+        return upload_input_manager, buffer_pool
+
+    def test_releases_part_buffers_once_parts_are_closed(self):
+        self.config.multipart_chunksize = 4
+        upload_input_manager, buffer_pool = self.get_pooled_input_manager(4)
+        part_iterator = upload_input_manager.yield_upload_part_bodies(
+            self.future, self.config.multipart_chunksize)
+        for part_number, body in part_iterator:
+            self.assertEqual(
+                body.read(),
+                self._get_expected_body_for_part(part_number))
+            num_releases = buffer_pool.release.call_count
+            body.close()
+            self.assertEqual(
+                buffer_pool.release.call_count, num_releases + 1)
+        # Every buffer acquired, including the one that the end of the
+        # stream was read into, was released.
+        self.assertEqual(
+            buffer_pool.release.call_count, buffer_pool.acquire.call_count)
+
+    def test_releases_buffers_of_unclosed_parts_if_upload_fails(self):
+        self.config.multipart_chunksize = 4
+        upload_input_manager, buffer_pool = self.get_pooled_input_manager(4)
+        parts = list(upload_input_manager.yield_upload_part_bodies(
+            self.future, self.config.multipart_chunksize))
+        parts[0][1].close()
+        self.transfer_coordinator.set_exception(Exception())
+        self.transfer_coordinator.announce_done()
+        self.assertEqual(
+            buffer_pool.release.call_count, buffer_pool.acquire.call_count)
+        # Closing the parts afterwards does not release their buffers
+        # a second time.
+        for _, body in parts:
+            body.close()
+        self.assertEqual(
+            buffer_pool.release.call_count, buffer_pool.acquire.call_count)
+
+    def test_parts_larger_than_pooled_buffers_are_not_pooled(self):
+        self.config.multipart_chunksize = 4
+        upload_input_manager, buffer_pool = self.get_pooled_input_manager(2)
+        parts = list(upload_input_manager.yield_upload_part_bodies(
+            self.future, self.config.multipart_chunksize))
+        for part_number, body in parts:
+            self.assertEqual(
+                body.read(),
+                self._get_expected_body_for_part(part_number))
+        self.assertFalse(buffer_pool.acquire.called)
+
+    def test_parts_from_initial_data_are_not_copied(self):
+        self.config.multipart_chunksize = 4
+        self.config.multipart_threshold = 8
+        self.assertTrue(
+            self.upload_input_manager.requires_multipart_upload(
+                self.future, self.config))
+        with mock.patch('s3transfer.upload.BufferReader',
+                        wraps=BufferReader) as reader_cls:
+            parts = list(
+                self.upload_input_manager.yield_upload_part_bodies(
+                    self.future, self.config.multipart_chunksize))
+        self.assertEqual(len(parts), 3)
+        # The first two parts are views of the data read to check the
+        # threshold and there is nothing to reuse once they are uploaded.
+        for call in reader_cls.call_args_list[:2]:
+            self.assertIsInstance(call[0][0], memoryview)
+            self.assertEqual(call[1]['close_callbacks'], [])
+        self.assertEqual(
+            len(reader_cls.call_args_list[2][1]['close_callbacks']), 1)
+
+
+class TestUploadBufferInputManager(TestUploadFilenameInputManager):
+    def setUp(self):
+        super(TestUploadBufferInputManager, self).setUp()
+        self.upload_input_manager = UploadBufferInputManager(
+            self.osutil, self.transfer_coordinator)
+        self.buffer = bytearray(self.content)
+        self.call_args = CallArgs(
+            fileobj=self.buffer, subscribers=self.subscribers)
+        self.future = self.get_transfer_future(self.call_args)
+
+    def test_is_compatible_bytes_like_objects(self):
+        for buffer in [b'foo', bytearray(b'foo'), memoryview(b'foo'),
+                       array('B', b'foo')]:
+            self.assertTrue(self.upload_input_manager.is_compatible(buffer))
+
+    def test_not_compatible_for_filelike_obj(self):
+        self.assertFalse(
+            self.upload_input_manager.is_compatible(six.BytesIO(b'foo')))
+        self.assertFalse(self.upload_input_manager.is_compatible(object()))
+
+    def test_parts_are_not_copied(self):
+        self.config.multipart_chunksize = 4
+        self.future.meta.provide_transfer_size(len(self.content))
+        parts = list(
+            self.upload_input_manager.yield_upload_part_bodies(
+                self.future, self.config.multipart_chunksize))
+        # Changes to the buffer show up in the parts because they are
+        # views of it.
+        self.buffer[0:4] = b'abcd'
+        with parts[0][1] as read_file_chunk:
+            self.assertEqual(read_file_chunk.read(), b'abcd')
+
+    def test_yield_upload_part_bodies_of_multibyte_items(self):
+        # Buffers with items larger than a byte are split by byte offsets.
+        buffer = array('H')
+        buffer.frombytes(self.content)
+        self.call_args = CallArgs(fileobj=buffer, subscribers=[])
+        self.future = self.get_transfer_future(self.call_args)
+        self.upload_input_manager.provide_transfer_size(self.future)
+        self.assertEqual(self.future.meta.size, len(self.content))
+        bodies = []
+        for _, read_file_chunk in \
+                self.upload_input_manager.yield_upload_part_bodies(
+                    self.future, 4):
+            with read_file_chunk:
+                bodies.append(read_file_chunk.read())
+        self.assertEqual(bodies, [b'my c', b'onte', b'nt'])
+
 
 class TestUploadSubmissionTask(BaseSubmissionTaskTest):
     def setUp(self):
@@ -556,6 +765,23 @@ class TestUploadSubmissionTask(BaseSubmissionTaskTest):
         # were associated when submitted to the executor
         self.assert_tag_value_for_upload_parts(None)
 
+    def test_submits_no_tag_for_multipart_buffer(self):
+        self.wrap_executor_in_recorder()
+        self.add_multipart_upload_stubbed_responses()
+        self.config.multipart_threshold = 1
+
+        self.use_fileobj_in_call_args(bytearray(self.content))
+        self.submission_task = self.get_task(
+            UploadSubmissionTask, main_kwargs=self.submission_main_kwargs)
+        self.submission_task()
+        self.transfer_future.result()
+        self.stubber.assert_no_pending_responses()
+
+        # The parts are views of the buffer, so they do not count against
+        # the limit of parts held in memory.
+        self.assert_tag_value_for_upload_parts(None)
+        self.assertEqual(b''.join(self.sent_bodies), self.content)
+
     def test_submits_no_tag_for_put_object_fileobj(self):
         self.wrap_executor_in_recorder()
         self.stubber.add_response('put_object', {})
@@ -592,6 +818,122 @@ class TestUploadSubmissionTask(BaseSubmissionTaskTest):
         # have chunks of data stored with them in memory.
         self.assert_tag_value_for_upload_parts(IN_MEMORY_UPLOAD_TAG)
 
+    def test_uses_part_size_planner_for_multipart_upload(self):
+        self.add_multipart_upload_stubbed_responses()
+        self.config.multipart_threshold = 1
+        # Without the planner, the content would be sent as one part.
+        self.config.multipart_chunksize = len(self.content)
+        self.submission_main_kwargs['part_size_planner'] = \
+            UploadPartSizePlanner()
+
+        self.submission_task = self.get_task(
+            UploadSubmissionTask, main_kwargs=self.submission_main_kwargs)
+        self.submission_task()
+        self.transfer_future.result()
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(
+            self.sent_bodies, [b'0' * MIN_UPLOAD_CHUNKSIZE] * 3)
+
+    def test_multipart_chunksize_in_call_args_overrides_planner(self):
+        self.add_multipart_upload_stubbed_responses()
+        self.config.multipart_threshold = 1
+        self.config.multipart_chunksize = len(self.content)
+        self.call_args = self.get_call_args(
+            multipart_chunksize=MIN_UPLOAD_CHUNKSIZE)
+        self.transfer_future = self.get_transfer_future(self.call_args)
+        self.submission_main_kwargs['transfer_future'] = self.transfer_future
+        planner = mock.Mock(UploadPartSizePlanner)
+        self.submission_main_kwargs['part_size_planner'] = planner
+
+        self.submission_task = self.get_task(
+            UploadSubmissionTask, main_kwargs=self.submission_main_kwargs)
+        self.submission_task()
+        self.transfer_future.result()
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(
+            self.sent_bodies, [b'0' * MIN_UPLOAD_CHUNKSIZE] * 3)
+        self.assertFalse(planner.get_part_size.called)
+
+    def test_reads_ahead_while_waiting_for_room_to_upload(self):
+        events = []
+        self.executor = NoRoomExecutor(self.executor, events)
+        self.submission_main_kwargs['request_executor'] = self.executor
+        self.add_multipart_upload_stubbed_responses()
+        self.config.multipart_threshold = 1
+        self.config.max_in_memory_upload_readahead_size = (
+            MIN_UPLOAD_CHUNKSIZE * 2)
+
+        self.use_fileobj_in_call_args(RecordingReader(self.content, events))
+        self.submission_task = self.get_task(
+            UploadSubmissionTask, main_kwargs=self.submission_main_kwargs)
+        self.submission_task()
+        self.transfer_future.result()
+        self.stubber.assert_no_pending_responses()
+
+        # Two parts are read before waiting for room for the first part.
+        # After that, the next part is read while waiting for room for the
+        # part before it.
+        self.assertEqual(
+            events,
+            ['read', 'read', 'read', 'submit part 1', 'read',
+             'submit part 2', 'submit part 3'])
+        self.assertEqual(self.sent_bodies, [
+            self.content[i:i + MIN_UPLOAD_CHUNKSIZE]
+            for i in range(0, len(self.content), MIN_UPLOAD_CHUNKSIZE)])
+
+    def test_submits_parts_right_away_if_there_is_room(self):
+        events = []
+        self.executor = NoRoomExecutor(self.executor, events, has_room=True)
+        self.submission_main_kwargs['request_executor'] = self.executor
+        self.add_multipart_upload_stubbed_responses()
+        self.config.multipart_threshold = 1
+        self.config.max_in_memory_upload_readahead_size = (
+            MIN_UPLOAD_CHUNKSIZE * 2)
+
+        self.use_fileobj_in_call_args(RecordingReader(self.content, events))
+        self.submission_task = self.get_task(
+            UploadSubmissionTask, main_kwargs=self.submission_main_kwargs)
+        self.submission_task()
+        self.transfer_future.result()
+        self.stubber.assert_no_pending_responses()
+
+        self.assertEqual(
+            events,
+            ['read', 'read', 'submit part 1', 'read', 'submit part 2',
+             'read', 'submit part 3'])
+
+
+class RecordingReader(NonSeekableReader):
+    def __init__(self, b, events):
+        super(RecordingReader, self).__init__(b)
+        self._events = events
+
+    def read(self, n=-1):
+        data = super(RecordingReader, self).read(n)
+        if data:
+            self._events.append('read')
+        return data
+
+
+class NoRoomExecutor(object):
+    """Executor that never has room for tagged tasks without blocking"""
+    def __init__(self, executor, events, has_room=False):
+        self._executor = executor
+        self._events = events
+        self._has_room = has_room
+
+    def submit(self, task, tag=None, block=True):
+        if tag is not None and not block and not self._has_room:
+            raise NoResourcesAvailable()
+        future = self._executor.submit(task, tag, block)
+        if tag is not None:
+            self._events.append(
+                'submit part %s' % task._main_kwargs['part_number'])
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown()
+
 
 class TestPutObjectTask(BaseUploadTest):
     def test_main(self):
@@ -652,3 +994,281 @@ class TestUploadPartTask(BaseUploadTest):
             self.stubber.assert_no_pending_responses()
             self.assertEqual(rval, {'ETag': etag, 'PartNumber': part_number})
             self.assertEqual(self.sent_bodies, [self.content])
+
+
+class BaseResumableUploadTest(BaseUploadTest):
+    def setUp(self):
+        super(BaseResumableUploadTest, self).setUp()
+        self.upload_id = 'my-id'
+        self.journal_filename = os.path.join(self.tempdir, 'journal')
+        self.identity = {'bucket': self.bucket, 'key': self.key}
+        self.journal = UploadJournal(
+            self.journal_filename, self.identity, self.osutil, part_size=4)
+
+    def load_journal(self):
+        return UploadJournal.load(
+            self.journal_filename, self.identity, self.osutil)
+
+
+class TestCreateResumableMultipartUploadTask(BaseResumableUploadTest):
+    def get_create_task(self):
+        return self.get_task(
+            CreateResumableMultipartUploadTask,
+            main_kwargs={
+                'client': self.client,
+                'bucket': self.bucket,
+                'key': self.key,
+                'extra_args': {},
+                'list_parts_extra_args': {'RequestPayer': 'requester'},
+                'journal': self.journal
+            }
+        )
+
+    def add_create_multipart_response(self, upload_id='my-id'):
+        self.stubber.add_response(
+            method='create_multipart_upload',
+            service_response={'UploadId': upload_id},
+            expected_params={'Bucket': self.bucket, 'Key': self.key}
+        )
+
+    def test_creates_upload(self):
+        self.add_create_multipart_response()
+        self.assertEqual(self.get_create_task()(), self.upload_id)
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(self.load_journal().upload_id, self.upload_id)
+
+    def test_resumes_upload_with_uploaded_parts(self):
+        self.journal.start(self.upload_id)
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        self.journal.add_part({'ETag': 'etag-2', 'PartNumber': 2})
+        self.stubber.add_response(
+            method='list_parts',
+            service_response={
+                'Parts': [
+                    {'ETag': 'etag-1', 'PartNumber': 1},
+                    # Parts that do not match the journal are not trusted
+                    # and are uploaded again.
+                    {'ETag': 'etag-other', 'PartNumber': 2},
+                    {'ETag': 'etag-3', 'PartNumber': 3},
+                ]
+            },
+            expected_params={
+                'Bucket': self.bucket, 'Key': self.key,
+                'UploadId': self.upload_id, 'RequestPayer': 'requester'
+            }
+        )
+        self.assertEqual(self.get_create_task()(), self.upload_id)
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(
+            self.journal.parts, [{'ETag': 'etag-1', 'PartNumber': 1}])
+        self.assertEqual(
+            self.load_journal().parts, [{'ETag': 'etag-1', 'PartNumber': 1}])
+
+    def test_starts_over_if_upload_no_longer_exists(self):
+        self.journal.start('old-id')
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        self.stubber.add_client_error('list_parts', 'NoSuchUpload')
+        self.add_create_multipart_response()
+        self.assertEqual(self.get_create_task()(), self.upload_id)
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(self.journal.upload_id, self.upload_id)
+        self.assertEqual(self.journal.parts, [])
+
+    def test_propagates_other_list_parts_errors(self):
+        self.journal.start(self.upload_id)
+        self.stubber.add_client_error('list_parts', 'AccessDenied')
+        task = self.get_create_task()
+        task()
+        self.assertEqual(
+            self.transfer_coordinator.exception.response['Error']['Code'],
+            'AccessDenied')
+
+
+class TestUploadResumablePartTask(BaseResumableUploadTest):
+    def get_upload_part_task(self, fileobj):
+        return self.get_task(
+            UploadResumablePartTask,
+            main_kwargs={
+                'client': self.client,
+                'fileobj': fileobj,
+                'bucket': self.bucket,
+                'key': self.key,
+                'upload_id': self.upload_id,
+                'part_number': 1,
+                'extra_args': {},
+                'journal': self.journal
+            }
+        )
+
+    def test_uploads_and_records_part(self):
+        self.journal.start(self.upload_id)
+        self.journal.save()
+        self.stubber.add_response(
+            method='upload_part',
+            service_response={'ETag': 'etag-1'},
+            expected_params={
+                'Body': ANY, 'Bucket': self.bucket, 'Key': self.key,
+                'UploadId': self.upload_id, 'PartNumber': 1
+            }
+        )
+        with open(self.filename, 'rb') as fileobj:
+            rval = self.get_upload_part_task(fileobj)()
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(rval, {'ETag': 'etag-1', 'PartNumber': 1})
+        self.assertEqual(
+            self.load_journal().parts, [{'ETag': 'etag-1', 'PartNumber': 1}])
+
+    def test_skips_uploaded_part(self):
+        self.journal.start(self.upload_id)
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        fileobj = open(self.filename, 'rb')
+        rval = self.get_upload_part_task(fileobj)()
+        # No request should have been made and the body should be closed.
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(self.sent_bodies, [])
+        self.assertTrue(fileobj.closed)
+        self.assertEqual(rval, {'ETag': 'etag-1', 'PartNumber': 1})
+
+
+class TestCompleteResumableMultipartUploadTask(BaseResumableUploadTest):
+    def test_removes_journal(self):
+        parts = [{'ETag': 'etag-1', 'PartNumber': 1}]
+        self.journal.start(self.upload_id)
+        self.journal.save()
+        self.stubber.add_response(
+            method='complete_multipart_upload',
+            service_response={},
+            expected_params={
+                'Bucket': self.bucket, 'Key': self.key,
+                'UploadId': self.upload_id,
+                'MultipartUpload': {'Parts': parts}
+            }
+        )
+        task = self.get_task(
+            CompleteResumableMultipartUploadTask,
+            main_kwargs={
+                'client': self.client,
+                'bucket': self.bucket,
+                'key': self.key,
+                'upload_id': self.upload_id,
+                'parts': parts,
+                'extra_args': {},
+                'journal': self.journal
+            }
+        )
+        task()
+        self.stubber.assert_no_pending_responses()
+        self.assertFalse(os.path.exists(self.journal_filename))
+
+
+class TestUploadJournal(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'journal')
+        self.osutil = OSUtils()
+        self.identity = {'bucket': 'mybucket', 'key': 'mykey', 'size': 10}
+        self.journal = UploadJournal(
+            self.filename, self.identity, self.osutil, part_size=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_load_missing_journal(self):
+        self.assertIsNone(
+            UploadJournal.load(self.filename, self.identity, self.osutil))
+
+    def test_load_corrupt_journal(self):
+        with open(self.filename, 'w') as f:
+            f.write('{')
+        self.assertIsNone(
+            UploadJournal.load(self.filename, self.identity, self.osutil))
+
+    def test_save(self):
+        self.journal.start('my-id')
+        self.journal.add_part({'ETag': 'etag-2', 'PartNumber': 2})
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        self.journal.save()
+        journal = UploadJournal.load(
+            self.filename, self.identity, self.osutil)
+        self.assertEqual(journal.upload_id, 'my-id')
+        self.assertEqual(journal.part_size, 4)
+        self.assertEqual(
+            journal.parts,
+            [{'ETag': 'etag-1', 'PartNumber': 1},
+             {'ETag': 'etag-2', 'PartNumber': 2}])
+        # Only the journal itself should have been left behind.
+        self.assertEqual(os.listdir(self.tempdir), ['journal'])
+
+    def test_add_part_appends_to_saved_journal(self):
+        self.journal.start('my-id')
+        self.journal.save()
+        self.journal.add_part({'ETag': 'etag-2', 'PartNumber': 2})
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        with open(self.filename) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+        journal = UploadJournal.load(
+            self.filename, self.identity, self.osutil)
+        self.assertEqual(journal.upload_id, 'my-id')
+        self.assertEqual(
+            journal.parts,
+            [{'ETag': 'etag-1', 'PartNumber': 1},
+             {'ETag': 'etag-2', 'PartNumber': 2}])
+
+    def test_load_ignores_partially_appended_part(self):
+        self.journal.start('my-id')
+        self.journal.save()
+        with open(self.filename, 'a') as f:
+            f.write('\n{"ETag": "etag-1", "Par')
+        self.journal.add_part({'ETag': 'etag-2', 'PartNumber': 2})
+        journal = UploadJournal.load(
+            self.filename, self.identity, self.osutil)
+        self.assertEqual(
+            journal.parts, [{'ETag': 'etag-2', 'PartNumber': 2}])
+
+    def test_save_compacts_appended_parts(self):
+        self.journal.start('my-id')
+        self.journal.save()
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        self.journal.add_part({'ETag': 'etag-1-again', 'PartNumber': 1})
+        self.journal.save()
+        with open(self.filename) as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+        journal = UploadJournal.load(
+            self.filename, self.identity, self.osutil)
+        self.assertEqual(
+            journal.parts, [{'ETag': 'etag-1-again', 'PartNumber': 1}])
+
+    def test_load_journal_for_different_file(self):
+        self.journal.save()
+        identity = dict(self.identity, size=11)
+        self.assertIsNone(
+            UploadJournal.load(self.filename, identity, self.osutil))
+
+    def test_get_part(self):
+        part = {'ETag': 'etag-1', 'PartNumber': 1}
+        self.journal.add_part(part)
+        self.assertEqual(self.journal.get_part(1), part)
+        self.assertIsNone(self.journal.get_part(2))
+
+    def test_start_forgets_parts(self):
+        self.journal.start('old-id')
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        self.journal.start('my-id')
+        self.assertEqual(self.journal.upload_id, 'my-id')
+        self.assertEqual(self.journal.parts, [])
+
+    def test_retain_parts(self):
+        self.journal.add_part({'ETag': 'etag-1', 'PartNumber': 1})
+        self.journal.add_part({'ETag': 'etag-2', 'PartNumber': 2})
+        self.journal.retain_parts([
+            {'ETag': 'etag-1', 'PartNumber': 1},
+            {'ETag': 'etag-other', 'PartNumber': 2},
+            {'ETag': 'etag-3', 'PartNumber': 3},
+        ])
+        self.assertEqual(
+            self.journal.parts, [{'ETag': 'etag-1', 'PartNumber': 1}])
+
+    def test_remove(self):
+        self.journal.save()
+        self.journal.remove()
+        self.assertFalse(os.path.exists(self.filename))
@@ -14,6 +14,8 @@ import os.path
 import shutil
 import tempfile
 import threading
+import mmap
+import hashlib
 import random
 import time
 import io
@@ -36,14 +38,24 @@ from s3transfer.utils import FunctionContainer
 from s3transfer.utils import CountCallbackInvoker
 from s3transfer.utils import OSUtils
 from s3transfer.utils import DeferredOpenFile
+from s3transfer.utils import MappedFile
+from s3transfer.utils import SharedFile
 from s3transfer.utils import ReadFileChunk
 from s3transfer.utils import StreamReaderProgress
 from s3transfer.utils import TaskSemaphore
 from s3transfer.utils import SlidingWindowSemaphore
 from s3transfer.utils import NoResourcesAvailable
 from s3transfer.utils import ChunksizeAdjuster
+from s3transfer.utils import BufferPool
+from s3transfer.utils import BufferReader
+from s3transfer.utils import DownloadPartSizePlanner
+from s3transfer.utils import UploadPartSizePlanner
+from s3transfer.utils import ETagCalculator
+from s3transfer.utils import DownloadWindowPlanner
+from s3transfer.utils import MIN_DOWNLOAD_PART_SIZE, MAX_DOWNLOAD_PART_SIZE
 from s3transfer.utils import MIN_UPLOAD_CHUNKSIZE, MAX_SINGLE_UPLOAD_SIZE
 from s3transfer.utils import MAX_PARTS
+from s3transfer.utils import MAX_PLANNED_UPLOAD_PART_SIZE
 
 
 class TestGetCallbacks(unittest.TestCase):
@@ -278,6 +290,93 @@ class TestOSUtils(BaseUtilsTest):
         self.assertFalse(os.path.exists(self.filename))
         self.assertTrue(os.path.exists(new_filename))
 
+    def test_allocate(self):
+        with open(self.filename, 'wb') as f:
+            OSUtils().allocate(f, 10)
+        self.assertEqual(os.path.getsize(self.filename), 10)
+
+    @mock.patch('s3transfer.utils.posix_fallocate', None)
+    def test_allocate_falls_back_to_truncate(self):
+        with open(self.filename, 'wb') as f:
+            OSUtils().allocate(f, 10)
+        self.assertEqual(os.path.getsize(self.filename), 10)
+
+    @mock.patch('s3transfer.utils.sync_file_range')
+    @mock.patch('s3transfer.utils.posix_fadvise')
+    def test_release_written_pages_is_opt_in(self, fadvise, sync_range):
+        with open(self.filename, 'rb') as f:
+            OSUtils().release_written_pages(f, 0, 10)
+        self.assertFalse(fadvise.called)
+        self.assertFalse(sync_range.called)
+
+    @mock.patch('s3transfer.utils.sync_file_range')
+    @mock.patch('s3transfer.utils.posix_fadvise')
+    def test_release_written_pages(self, fadvise, sync_range):
+        osutil = OSUtils(drop_written_pages=True)
+        with open(self.filename, 'rb') as f:
+            osutil.release_written_pages(f, 5, 10)
+            fadvise.assert_called_once_with(
+                f.fileno(), 5, 10, os.POSIX_FADV_DONTNEED)
+        self.assertFalse(sync_range.called)
+
+    @mock.patch('s3transfer.utils.sync_file_range')
+    @mock.patch('s3transfer.utils.posix_fadvise')
+    def test_release_written_pages_syncs_first(self, fadvise, sync_range):
+        calls = mock.Mock()
+        calls.attach_mock(fadvise, 'fadvise')
+        calls.attach_mock(sync_range, 'sync_file_range')
+        osutil = OSUtils(drop_written_pages=True, sync_written_pages=True)
+        with open(self.filename, 'rb') as f:
+            osutil.release_written_pages(f, 5, 10)
+            self.assertEqual(
+                calls.mock_calls,
+                [mock.call.sync_file_range(f.fileno(), 5, 10),
+                 mock.call.fadvise(
+                     f.fileno(), 5, 10, os.POSIX_FADV_DONTNEED)])
+
+    @mock.patch('s3transfer.utils.posix_fadvise', None)
+    def test_release_written_pages_without_fadvise_support(self):
+        osutil = OSUtils(drop_written_pages=True, sync_written_pages=True)
+        with open(self.filename, 'rb') as f:
+            # Without support for fadvise, this should do nothing.
+            osutil.release_written_pages(f, 0, 10)
+
+    @mock.patch('s3transfer.utils.posix_fadvise')
+    def test_readahead_pages_is_opt_in(self, fadvise):
+        with open(self.filename, 'rb') as f:
+            OSUtils().readahead_pages(f, 0, 10)
+        self.assertFalse(fadvise.called)
+
+    @mock.patch('s3transfer.utils.sync_file_range')
+    @mock.patch('s3transfer.utils.posix_fadvise')
+    def test_page_cache_policy_defaults_for_subclass_without_init(
+            self, fadvise, sync_range):
+        class OSUtilsWithoutInit(OSUtils):
+            def __init__(self):
+                pass
+
+        osutil = OSUtilsWithoutInit()
+        with open(self.filename, 'rb') as f:
+            osutil.release_written_pages(f, 0, 10)
+            osutil.readahead_pages(f, 0, 10)
+        self.assertFalse(fadvise.called)
+        self.assertFalse(sync_range.called)
+
+    @mock.patch('s3transfer.utils.posix_fadvise')
+    def test_readahead_pages(self, fadvise):
+        osutil = OSUtils(readahead_read_pages=True)
+        with open(self.filename, 'rb') as f:
+            osutil.readahead_pages(f, 5, 10)
+            self.assertEqual(
+                fadvise.call_args_list,
+                [mock.call(f.fileno(), 5, 10, os.POSIX_FADV_SEQUENTIAL),
+                 mock.call(f.fileno(), 5, 10, os.POSIX_FADV_WILLNEED)])
+
+    def test_open_mapped_file(self):
+        mapped_file = OSUtils().open_mapped_file(self.filename, 10)
+        self.assertIsInstance(mapped_file, MappedFile)
+        mapped_file.close()
+
     def test_is_special_file_for_normal_file(self):
         self.assertFalse(OSUtils().is_special_file(self.filename))
 
@@ -325,6 +424,11 @@ class TestDeferredOpenFile(BaseUtilsTest):
         self.assertEqual(content, self.contents[2:4])
         self.assertEqual(len(self.open_call_args), 1)
 
+    def test_fileno(self):
+        fileno = self.deferred_open_file.fileno()
+        self.assertEqual(len(self.open_call_args), 1)
+        self.assertEqual(os.fstat(fileno).st_size, len(self.contents))
+
     def test_write(self):
         self.deferred_open_file = DeferredOpenFile(
             self.filename, mode='wb',
@@ -340,6 +444,50 @@ class TestDeferredOpenFile(BaseUtilsTest):
         # Open should have only been called once.
         self.assertEqual(len(self.open_call_args), 1)
 
+    def test_pwrite(self):
+        self.deferred_open_file = DeferredOpenFile(
+            self.filename, mode='wb',
+            open_function=self.recording_open_function)
+
+        # Write out of order to make sure the writes land at their offsets.
+        self.deferred_open_file.pwrite(b'bar', 3)
+        self.deferred_open_file.pwrite(b'foo', 0)
+        self.deferred_open_file.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+        self.assertEqual(len(self.open_call_args), 1)
+
+    def test_pwrite_falls_back_to_seek_and_write(self):
+        fileobj = six.BytesIO()
+        self.deferred_open_file = DeferredOpenFile(
+            self.filename, mode='wb',
+            open_function=lambda filename, mode: fileobj)
+        with mock.patch('s3transfer.utils.pwrite', None):
+            self.deferred_open_file.pwrite(b'bar', 3)
+            self.deferred_open_file.pwrite(b'foo', 0)
+        self.assertEqual(fileobj.getvalue(), b'foobar')
+
+    def test_pwritev(self):
+        self.deferred_open_file = DeferredOpenFile(
+            self.filename, mode='wb',
+            open_function=self.recording_open_function)
+
+        self.deferred_open_file.pwritev([b'ba', b'r'], 3)
+        self.deferred_open_file.pwritev([b'f', b'oo'], 0)
+        self.deferred_open_file.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+        self.assertEqual(len(self.open_call_args), 1)
+
+    def test_pwritev_falls_back_to_pwrite(self):
+        self.deferred_open_file = DeferredOpenFile(
+            self.filename, mode='wb')
+        with mock.patch('s3transfer.utils.pwritev', None):
+            with mock.patch.object(self.deferred_open_file, 'pwrite') as m:
+                self.deferred_open_file.pwritev([b'ba', b'r'], 3)
+        self.assertEqual(
+            m.call_args_list, [mock.call(b'ba', 3), mock.call(b'r', 5)])
+
     def test_seek(self):
         self.deferred_open_file.seek(2)
         content = self.deferred_open_file.read(2)
@@ -391,6 +539,159 @@ class TestDeferredOpenFile(BaseUtilsTest):
             self.assertEqual(len(self.open_call_args), 1)
 
 
+class TestSharedFile(BaseUtilsTest):
+    def setUp(self):
+        super(TestSharedFile, self).setUp()
+        self.content = b'my contents'
+        with open(self.filename, 'wb') as f:
+            f.write(self.content)
+        self.opened_files = []
+        self.shared_file = SharedFile(
+            self.filename, open_function=self.recording_open_function)
+
+    def tearDown(self):
+        self.shared_file.close()
+        super(TestSharedFile, self).tearDown()
+
+    def recording_open_function(self, filename, mode):
+        fileobj = open(filename, mode)
+        self.opened_files.append(fileobj)
+        return fileobj
+
+    def test_name(self):
+        self.assertEqual(self.shared_file.name, self.filename)
+        self.assertEqual(self.shared_file.get_reader().name, self.filename)
+
+    def test_get_reader_does_not_open_file(self):
+        self.shared_file.get_reader()
+        self.assertEqual(self.opened_files, [])
+
+    def test_readers_share_one_file(self):
+        first = self.shared_file.get_reader(0)
+        second = self.shared_file.get_reader(3)
+        self.assertEqual(second.read(2), self.content[3:5])
+        self.assertEqual(first.read(2), self.content[0:2])
+        self.assertEqual(second.read(2), self.content[5:7])
+        self.assertEqual(len(self.opened_files), 1)
+
+    def test_read_rest_of_file(self):
+        reader = self.shared_file.get_reader(3)
+        self.assertEqual(reader.read(), self.content[3:])
+
+    def test_seek_and_tell(self):
+        reader = self.shared_file.get_reader(3)
+        self.assertEqual(reader.tell(), 3)
+        reader.read(2)
+        self.assertEqual(reader.tell(), 5)
+        reader.seek(1)
+        self.assertEqual(reader.read(2), self.content[1:3])
+
+    def test_closes_file_once_all_readers_are_closed(self):
+        first = self.shared_file.get_reader(0)
+        second = self.shared_file.get_reader(3)
+        first.read(1)
+        first.close()
+        self.assertFalse(self.opened_files[0].closed)
+        second.close()
+        self.assertTrue(self.opened_files[0].closed)
+
+    def test_closing_reader_twice_only_releases_once(self):
+        first = self.shared_file.get_reader(0)
+        second = self.shared_file.get_reader(3)
+        first.read(1)
+        first.close()
+        first.close()
+        self.assertFalse(self.opened_files[0].closed)
+        second.close()
+
+    def test_reopens_file_for_new_readers(self):
+        with self.shared_file.get_reader(0) as reader:
+            reader.read(1)
+        with self.shared_file.get_reader(3) as reader:
+            self.assertEqual(reader.read(2), self.content[3:5])
+        self.assertEqual(len(self.opened_files), 2)
+
+    def test_close(self):
+        reader = self.shared_file.get_reader(0)
+        reader.read(1)
+        self.shared_file.close()
+        self.assertTrue(self.opened_files[0].closed)
+
+    def test_reads_ahead_before_first_read(self):
+        readahead = mock.Mock()
+        shared_file = SharedFile(self.filename, readahead_function=readahead)
+        with shared_file.get_reader(3, 4) as reader:
+            reader.read(2)
+            reader.read(2)
+        readahead.assert_called_once_with(mock.ANY, 3, 4)
+
+    def test_falls_back_to_seek_and_read(self):
+        with mock.patch('s3transfer.utils.pread', None):
+            first = self.shared_file.get_reader(0)
+            second = self.shared_file.get_reader(3)
+            self.assertEqual(second.read(2), self.content[3:5])
+            self.assertEqual(first.read(2), self.content[0:2])
+
+
+class TestMappedFile(BaseUtilsTest):
+    def test_from_filename_allocates_file(self):
+        mapped_file = MappedFile.from_filename(self.filename, 10, OSUtils())
+        mapped_file.close()
+        self.assertEqual(mapped_file.name, self.filename)
+        self.assertEqual(os.path.getsize(self.filename), 10)
+
+    def test_get_buffer(self):
+        mapped_file = MappedFile.from_filename(self.filename, 6, OSUtils())
+        buffer = mapped_file.get_buffer(3)
+        self.assertEqual(len(buffer), 3)
+        buffer[:] = b'bar'
+        mapped_file.get_buffer(0)[:3] = b'foo'
+        del buffer
+        mapped_file.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_pwrite(self):
+        mapped_file = MappedFile.from_filename(self.filename, 6, OSUtils())
+        mapped_file.pwrite(b'bar', 3)
+        mapped_file.pwrite(b'foo', 0)
+        mapped_file.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_pwritev(self):
+        mapped_file = MappedFile.from_filename(self.filename, 6, OSUtils())
+        mapped_file.pwritev([b'ba', b'r'], 3)
+        mapped_file.pwritev([b'f', b'oo'], 0)
+        mapped_file.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_close_flushes_map(self):
+        mapped = mock.Mock(mmap.mmap)
+        mapped_file = MappedFile(self.filename, mapped)
+        mapped_file.close()
+        self.assertEqual(
+            mapped.method_calls, [mock.call.flush(), mock.call.close()])
+
+    def test_close_with_referenced_buffer(self):
+        mapped_file = MappedFile.from_filename(self.filename, 6, OSUtils())
+        buffer = mapped_file.get_buffer(0)
+        # Closing should not fail even if a buffer is still referenced.
+        with mock.patch('s3transfer.utils.logger') as logger:
+            mapped_file.close()
+        self.assertTrue(logger.warning.called)
+        buffer[:] = b'foobar'
+        del buffer
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'foobar')
+
+    def test_close_is_idempotent(self):
+        mapped_file = MappedFile.from_filename(self.filename, 6, OSUtils())
+        mapped_file.close()
+        mapped_file.close()
+
+
 class TestReadFileChunk(BaseUtilsTest):
     def test_read_entire_chunk(self):
         filename = os.path.join(self.tempdir, 'foo')
@@ -577,6 +878,39 @@ class TestReadFileChunk(BaseUtilsTest):
             )
 
 
+class TestBufferReader(unittest.TestCase):
+    def test_read(self):
+        reader = BufferReader(bytearray(b'foobar'))
+        self.assertEqual(reader.read(2), b'fo')
+        self.assertEqual(reader.read(), b'obar')
+        self.assertEqual(reader.read(2), b'')
+
+    def test_reads_views_of_buffer(self):
+        buffer = bytearray(b'foobar')
+        reader = BufferReader(memoryview(buffer)[3:])
+        data = reader.read(3)
+        self.assertIsInstance(data, memoryview)
+        self.assertEqual(data, b'bar')
+        # The data read is not copied out of the buffer.
+        buffer[3:] = b'baz'
+        self.assertEqual(data, b'baz')
+
+    def test_seek_and_tell(self):
+        reader = BufferReader(b'foobar')
+        reader.read(4)
+        self.assertEqual(reader.tell(), 4)
+        reader.seek(1)
+        self.assertEqual(reader.read(2), b'oo')
+
+    def test_close_callbacks_called_once(self):
+        callback = mock.Mock()
+        reader = BufferReader(b'foo', close_callbacks=[callback])
+        with reader:
+            pass
+        reader.close()
+        callback.assert_called_once_with()
+
+
 class TestStreamReaderProgress(BaseUtilsTest):
     def test_proxies_to_wrapped_stream(self):
         original_stream = six.StringIO('foobarbaz')
@@ -590,6 +924,14 @@ class TestStreamReaderProgress(BaseUtilsTest):
         self.assertEqual(wrapped.read(), 'foobarbaz')
         self.assertEqual(self.amounts_seen, [9, 9])
 
+    def test_readinto(self):
+        original_stream = six.BytesIO(b'foobarbaz')
+        wrapped = StreamReaderProgress(original_stream, [self.callback])
+        buffer = bytearray(6)
+        self.assertEqual(wrapped.readinto(buffer), 6)
+        self.assertEqual(buffer, b'foobar')
+        self.assertEqual(self.amounts_seen, [6])
+
 
 class TestTaskSemaphore(unittest.TestCase):
     def setUp(self):
@@ -763,6 +1105,48 @@ class TestSlidingWindowSemaphore(unittest.TestCase):
         sem.release('a', 0)
         self.assertEqual(sem.current_count(), 2)
 
+    def test_resize_up(self):
+        sem = SlidingWindowSemaphore(1)
+        sem.acquire('a', blocking=False)
+        sem.resize(2)
+        self.assertEqual(sem.current_count(), 1)
+        self.assertEqual(sem.acquire('a', blocking=False), 1)
+
+    def test_resize_down(self):
+        sem = SlidingWindowSemaphore(3)
+        sem.acquire('a', blocking=False)
+        sem.resize(1)
+        self.assertEqual(sem.current_count(), 0)
+        with self.assertRaises(NoResourcesAvailable):
+            sem.acquire('a', blocking=False)
+
+    def test_resize_below_acquired_count(self):
+        sem = SlidingWindowSemaphore(3)
+        sem.acquire('a', blocking=False)
+        sem.acquire('a', blocking=False)
+        sem.acquire('a', blocking=False)
+        sem.resize(1)
+        sem.release('a', 0)
+        sem.release('a', 1)
+        # Both released acquires are still over the new count.
+        with self.assertRaises(NoResourcesAvailable):
+            sem.acquire('a', blocking=False)
+        sem.release('a', 2)
+        self.assertEqual(sem.current_count(), 1)
+        self.assertEqual(sem.acquire('a', blocking=False), 3)
+
+    def test_resize_wakes_up_blocked_acquires(self):
+        sem = SlidingWindowSemaphore(1)
+        sem.acquire('a', blocking=False)
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(sem.acquire('a')))
+        thread.start()
+        sem.resize(2)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(acquired, [1])
+
 
 class TestThreadingPropertiesForSlidingWindowSemaphore(unittest.TestCase):
     # These tests focus on mutithreaded properties of the range
@@ -842,6 +1226,57 @@ class TestThreadingPropertiesForSlidingWindowSemaphore(unittest.TestCase):
                          num_threads * num_iterations)
 
 
+class TestBufferPool(unittest.TestCase):
+    def setUp(self):
+        self.buffer_pool = BufferPool(buffer_size=3, max_buffers=2)
+
+    def test_buffer_size(self):
+        self.assertEqual(self.buffer_pool.buffer_size, 3)
+
+    def test_acquire(self):
+        buffer = self.buffer_pool.acquire()
+        self.assertIsInstance(buffer, bytearray)
+        self.assertEqual(len(buffer), 3)
+
+    def test_reuses_released_buffers(self):
+        buffer = self.buffer_pool.acquire()
+        self.buffer_pool.release(buffer)
+        self.assertIs(self.buffer_pool.acquire(), buffer)
+
+    def test_max_buffers(self):
+        self.buffer_pool.acquire()
+        self.buffer_pool.acquire()
+        with self.assertRaises(NoResourcesAvailable):
+            self.buffer_pool.acquire(blocking=False)
+
+    def test_release_makes_buffer_available(self):
+        buffer = self.buffer_pool.acquire()
+        self.buffer_pool.acquire()
+        self.buffer_pool.release(buffer)
+        self.assertIs(self.buffer_pool.acquire(blocking=False), buffer)
+
+    def test_blocks_until_buffer_released(self):
+        buffer = self.buffer_pool.acquire()
+        self.buffer_pool.acquire()
+        acquired = []
+
+        def acquire():
+            acquired.append(self.buffer_pool.acquire())
+
+        t = threading.Thread(target=acquire)
+        t.start()
+        self.buffer_pool.release(buffer)
+        t.join(5)
+        self.assertEqual(acquired, [buffer])
+
+    def test_unbounded(self):
+        buffer_pool = BufferPool(buffer_size=3)
+        buffers = [buffer_pool.acquire(blocking=False) for _ in range(5)]
+        self.assertEqual(len(set(id(buffer) for buffer in buffers)), 5)
+        buffer_pool.release(buffers[0])
+        self.assertIs(buffer_pool.acquire(blocking=False), buffers[0])
+
+
 class TestAdjustChunksize(unittest.TestCase):
     def setUp(self):
         self.adjuster = ChunksizeAdjuster()
@@ -888,3 +1323,277 @@ class TestAdjustChunksize(unittest.TestCase):
         chunksize = MAX_SINGLE_UPLOAD_SIZE + 1
         new_size = self.adjuster.adjust_chunksize(chunksize)
         self.assertEqual(new_size, MAX_SINGLE_UPLOAD_SIZE)
+
+
+class TestDownloadPartSizePlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = DownloadPartSizePlanner(
+            min_size=1, max_size=1000, parts_per_request_slot=4,
+            min_part_duration=0.5)
+
+    def test_default_bounds(self):
+        planner = DownloadPartSizePlanner()
+        self.assertEqual(planner.min_size, MIN_DOWNLOAD_PART_SIZE)
+        self.assertEqual(planner.max_size, MAX_DOWNLOAD_PART_SIZE)
+
+    def test_splits_into_parts_per_request_slot(self):
+        # 4 parts for each of the 10 concurrent requests.
+        self.assertEqual(self.planner.get_part_size(4000, 10), 100)
+
+    def test_rounds_part_size_up(self):
+        self.assertEqual(self.planner.get_part_size(4001, 10), 101)
+
+    def test_respects_min_size(self):
+        self.planner.min_size = 50
+        self.assertEqual(self.planner.get_part_size(400, 10), 50)
+
+    def test_respects_max_size(self):
+        self.assertEqual(self.planner.get_part_size(10 ** 9, 10), 1000)
+
+    def test_no_throughput_by_default(self):
+        self.assertIsNone(self.planner.throughput)
+
+    def test_record_throughput(self):
+        self.planner.record_throughput(100, 2)
+        self.assertEqual(self.planner.throughput, 50)
+
+    def test_record_throughput_ignores_zero_duration(self):
+        self.planner.record_throughput(100, 0)
+        self.assertIsNone(self.planner.throughput)
+
+    def test_record_throughput_weighs_new_observations(self):
+        self.planner.throughput_weight = 0.5
+        self.planner.record_throughput(100, 1)
+        self.planner.record_throughput(200, 1)
+        self.assertEqual(self.planner.throughput, 150)
+
+    def test_throughput_raises_part_size(self):
+        self.planner.record_throughput(400, 1)
+        # At 400 bytes per second, a part should be at least 200 bytes to
+        # take half a second.
+        self.assertEqual(self.planner.get_part_size(4000, 10), 200)
+
+    def test_throughput_does_not_lower_part_size(self):
+        self.planner.record_throughput(10, 1)
+        self.assertEqual(self.planner.get_part_size(4000, 10), 100)
+
+    def test_throughput_does_not_exceed_max_size(self):
+        self.planner.record_throughput(10 ** 6, 1)
+        self.assertEqual(self.planner.get_part_size(4000, 10), 1000)
+
+
+class TestUploadPartSizePlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = UploadPartSizePlanner(
+            min_size=1, max_size=1000, parts_per_request_slot=4)
+
+    def test_default_bounds(self):
+        planner = UploadPartSizePlanner()
+        self.assertEqual(planner.min_size, MIN_UPLOAD_CHUNKSIZE)
+        self.assertEqual(planner.max_size, MAX_PLANNED_UPLOAD_PART_SIZE)
+
+    def test_splits_into_parts_per_request_slot(self):
+        # 4 parts for each of the 10 concurrent requests.
+        self.assertEqual(self.planner.get_part_size(4000, 10), 100)
+
+    def test_rounds_part_size_up(self):
+        self.assertEqual(self.planner.get_part_size(4001, 10), 101)
+
+    def test_respects_min_size(self):
+        self.planner.min_size = 50
+        self.assertEqual(self.planner.get_part_size(400, 10), 50)
+
+    def test_respects_max_size(self):
+        self.assertEqual(self.planner.get_part_size(10 ** 9, 10), 1000)
+
+    def test_fewer_concurrent_requests_means_larger_parts(self):
+        self.assertEqual(self.planner.get_part_size(4000, 1), 1000)
+
+
+class TestDownloadWindowPlanner(unittest.TestCase):
+    def setUp(self):
+        self.semaphore = SlidingWindowSemaphore(10)
+        self.planner = DownloadWindowPlanner(
+            self.semaphore, max_size=1000, measurement_weight=0.5)
+
+    def test_not_resized_without_measurements(self):
+        self.assertIsNone(self.planner.count)
+        self.assertEqual(self.semaphore.current_count(), 10)
+
+    def test_not_resized_without_drain_rate(self):
+        self.planner.record_request(100, 1)
+        self.assertIsNone(self.planner.count)
+
+    def test_not_resized_without_requests(self):
+        self.planner.record_drain(100, 1)
+        self.assertIsNone(self.planner.count)
+
+    def test_resizes_to_cover_request_duration(self):
+        # 200 bytes are drained in the second it takes to download a
+        # 100 byte part, so two parts are needed plus the one being
+        # drained.
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(200, 1)
+        self.assertEqual(self.planner.count, 3)
+        self.assertEqual(self.semaphore.current_count(), 3)
+
+    def test_rounds_count_up(self):
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(150, 1)
+        self.assertEqual(self.planner.count, 3)
+
+    def test_slow_drain_shrinks_window(self):
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(1, 1)
+        self.assertEqual(self.planner.count, 2)
+
+    def test_respects_min_count(self):
+        self.planner.min_count = 4
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(1, 1)
+        self.assertEqual(self.planner.count, 4)
+
+    def test_respects_max_size(self):
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(10 ** 6, 1)
+        self.assertEqual(self.planner.count, 10)
+
+    def test_max_size_allows_more_parts_when_parts_are_smaller(self):
+        self.planner.record_request(50, 1)
+        self.planner.record_drain(10 ** 6, 1)
+        self.assertEqual(self.planner.count, 20)
+        self.assertEqual(self.semaphore.current_count(), 20)
+
+    def test_never_below_min_count_for_large_parts(self):
+        self.planner.record_request(2000, 1)
+        self.planner.record_drain(10 ** 6, 1)
+        self.assertEqual(self.planner.count, 1)
+
+    def test_weighs_new_measurements(self):
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(200, 1)
+        self.planner.record_drain(600, 1)
+        # The drain rate is averaged to 400 bytes per second.
+        self.assertEqual(self.planner.count, 5)
+
+    def test_ignores_zero_duration(self):
+        self.planner.record_request(100, 0)
+        self.planner.record_drain(100, 0)
+        self.planner.record_request(100, 1)
+        self.planner.record_drain(200, 1)
+        self.assertEqual(self.planner.count, 3)
+
+
+class TestETagCalculator(unittest.TestCase):
+    def setUp(self):
+        self.content = b'0123456789abcdefghij'
+
+    def get_multipart_etag(self, content, part_size):
+        digests = [
+            hashlib.md5(content[i:i + part_size]).digest()
+            for i in range(0, len(content), part_size)
+        ]
+        return '%s-%s' % (
+            hashlib.md5(b''.join(digests)).hexdigest(), len(digests))
+
+    def test_single_part(self):
+        calculator = ETagCalculator(len(self.content))
+        calculator.update(0, self.content[:7])
+        calculator.update(7, self.content[7:])
+        self.assertEqual(
+            calculator.get_etag(), hashlib.md5(self.content).hexdigest())
+
+    def test_out_of_order(self):
+        calculator = ETagCalculator(len(self.content))
+        calculator.update(10, bytearray(self.content[10:]))
+        calculator.update(5, memoryview(self.content)[5:10])
+        calculator.update(0, self.content[:5])
+        self.assertEqual(
+            calculator.get_etag(), hashlib.md5(self.content).hexdigest())
+
+    def test_out_of_order_content_is_copied(self):
+        calculator = ETagCalculator(len(self.content))
+        buffer = bytearray(self.content[10:])
+        calculator.update(10, memoryview(buffer))
+        # The buffer gets reused before the content before it is provided.
+        buffer[:] = b'x' * len(buffer)
+        calculator.update(0, self.content[:10])
+        self.assertEqual(
+            calculator.get_etag(), hashlib.md5(self.content).hexdigest())
+
+    def test_content_provided_again_is_hashed_once(self):
+        calculator = ETagCalculator(len(self.content))
+        calculator.update(0, self.content[:8])
+        calculator.update(12, self.content[12:])
+        calculator.update(12, self.content[12:])
+        calculator.update(0, self.content[:10])
+        calculator.update(10, self.content[10:14])
+        self.assertEqual(
+            calculator.get_etag(), hashlib.md5(self.content).hexdigest())
+
+    def test_multipart(self):
+        calculator = ETagCalculator(len(self.content), part_size=8)
+        calculator.update(0, self.content[:3])
+        calculator.update(3, self.content[3:17])
+        calculator.update(17, self.content[17:])
+        self.assertEqual(
+            calculator.get_etag(), self.get_multipart_etag(self.content, 8))
+
+    def test_multipart_with_last_part_full(self):
+        calculator = ETagCalculator(len(self.content), part_size=10)
+        calculator.update(0, self.content)
+        self.assertEqual(
+            calculator.get_etag(), self.get_multipart_etag(self.content, 10))
+
+    def test_empty(self):
+        self.assertEqual(
+            ETagCalculator(0).get_etag(), hashlib.md5(b'').hexdigest())
+
+    def test_missing_content(self):
+        calculator = ETagCalculator(len(self.content))
+        calculator.update(0, self.content[:5])
+        calculator.update(10, self.content[10:])
+        with self.assertRaises(ValueError):
+            calculator.get_etag()
+
+    def test_parts_are_hashed_without_holding_content(self):
+        spill_file_factory = mock.Mock()
+        calculator = ETagCalculator(
+            len(self.content), part_size=8, max_in_memory_size=0,
+            spill_file_factory=spill_file_factory)
+        calculator.update(16, self.content[16:])
+        calculator.update(8, self.content[8:16])
+        calculator.update(0, self.content[:8])
+        self.assertEqual(
+            calculator.get_etag(), self.get_multipart_etag(self.content, 8))
+        # The content of each part came in order, so none of it was held.
+        self.assertFalse(spill_file_factory.called)
+
+    def test_spills_held_content(self):
+        spill_files = []
+
+        def spill_file_factory():
+            spill_files.append(six.BytesIO())
+            return spill_files[-1]
+
+        calculator = ETagCalculator(
+            len(self.content), max_in_memory_size=5,
+            spill_file_factory=spill_file_factory)
+        calculator.update(15, self.content[15:])
+        calculator.update(5, self.content[5:15])
+        calculator.update(0, self.content[:5])
+        self.assertEqual(
+            calculator.get_etag(), hashlib.md5(self.content).hexdigest())
+        # Only the content past the limit was spilled and the file is
+        # closed once all of it has been read back.
+        self.assertEqual(len(spill_files), 1)
+        self.assertTrue(spill_files[0].closed)
+
+    def test_close_discards_spilled_content(self):
+        spill_file = six.BytesIO()
+        calculator = ETagCalculator(
+            len(self.content), max_in_memory_size=0,
+            spill_file_factory=lambda: spill_file)
+        calculator.update(10, self.content[10:])
+        calculator.close()
+        self.assertTrue(spill_file.closed)